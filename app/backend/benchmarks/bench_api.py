@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import secrets
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from http.client import HTTPConnection
+
+import typer
+
+from benchmarks.common import AsgiClient, HttpClient, run_concurrently, seed_catalog, stopwatch, summarize, temporary_database
+
+from django.contrib.auth.models import User
+from my_course.models import Course
+from rest_framework.authtoken.models import Token
+
+app = typer.Typer(help="BENCH | Load test of the main API endpoints, saved for baseline comparisons")
+
+"""
+Seeds a synthetic catalog (courses, students, enrollments) and replays each scenario at each concurrency:
+    - list, detail, categories: anonymous catalog reads (detail on random courses);
+    - login: a known user with a real password, hashed with the configured PASSWORD_HASHER;
+    - enroll, my_enrollments: random students with their API token.
+The app is driven in-process through its ASGI entry point (`--server inprocess`), or over HTTP against a
+    local uvicorn started on the seeded database (`--server uvicorn`, `--workers` processes).
+Per scenario: throughput, p50/p95/p99 latency and SQL queries per request, the latter read from the
+    request metrics (/metrics with uvicorn, single worker only since each worker counts its own).
+Rate limits and load shedding (my_course.throttling) are off unless `--limits`: one client replaying logins
+    is exactly what they refuse.
+`run --output` saves the results with the run settings; `compare` prints the changes against a baseline.
+    [CMD: python -m benchmarks.bench_api run --concurrency 1 --concurrency 32 --output baseline.json]
+    [CMD: python -m benchmarks.bench_api compare baseline.json current.json]
+"""
+
+SCENARIOS = ["list", "detail", "categories", "login", "enroll", "my_enrollments"]
+LOGIN_USER, PASSWORD = "bench-login", "bench-login-password"
+METRIC_LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def build_requests(scenario, count, course_ids, tokens, rng):
+    """(method, url, headers, body, expected statuses) for `count` requests of a scenario."""
+    def student():
+        return {"Authorization": f"Token {rng.choice(tokens)}"}
+
+    if scenario == "list":
+        return [("GET", "/api/courses/?page_size=20", {}, b"", (200,))] * count
+    if scenario == "detail":
+        return [("GET", f"/api/courses/{rng.choice(course_ids)}/", {}, b"", (200,)) for _ in range(count)]
+    if scenario == "categories":
+        return [("GET", "/api/courses/categories/", {}, b"", (200,))] * count
+    if scenario == "login":
+        body = json.dumps({"username": LOGIN_USER, "password": PASSWORD}).encode()
+        return [("POST", "/api/users/login/", {}, body, (200,))] * count
+    if scenario == "enroll":
+        return [("POST", f"/api/courses/{rng.choice(course_ids)}/enroll/", student(), b"", (200,)) for _ in range(count)]
+    if scenario == "my_enrollments":
+        return [("GET", "/api/courses/my_enrollments/?page_size=20", student(), b"", (200,)) for _ in range(count)]
+    raise typer.BadParameter(f"Unknown scenario {scenario}, one of {', '.join(SCENARIOS)}")
+
+
+def read_totals(text):
+    """(requests, SQL queries) summed over the API routes of a /metrics page."""
+    requests = queries = 0
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if not match or 'route="metrics"' in match.group(2):
+            continue
+        if match.group(1) == "http_request_duration_seconds_count":
+            requests += int(float(match.group(3)))
+        elif match.group(1) == "http_request_db_queries_total":
+            queries += int(float(match.group(3)))
+    return requests, queries
+
+
+NO_LIMITS = {
+    "THROTTLE_LOGIN_RATE": "", "THROTTLE_SIGNUP_RATE": "", "THROTTLE_ENROLL_RATE": "",
+    "LOAD_SHED_MAX_EXPENSIVE": "0", "LOAD_SHED_MAX_IN_FLIGHT": "0",
+}
+
+
+class InProcess:
+    def __init__(self, concurrency, limits):
+        from django.conf import settings
+
+        if not limits:
+            settings.THROTTLE_RATES = {}
+            settings.LOAD_SHED_MAX_EXPENSIVE = settings.LOAD_SHED_MAX_IN_FLIGHT = 0
+        self.client = AsgiClient()
+
+    def metrics(self):
+        from my_course.metrics import registry
+
+        return registry.render()
+
+    def close(self):
+        pass
+
+
+class Uvicorn:
+    """A uvicorn serving learning_hub on the benchmark database, stopped by close()."""
+
+    def __init__(self, concurrency, database, port, workers, limits):
+        self.port, self.workers = port, workers
+        self.token = secrets.token_hex(16)
+        env = {**os.environ, "POSTGRES_DB": database, "METRICS_ENABLED": "1", "METRICS_TOKEN": self.token}
+        if not limits:
+            env.update(NO_LIMITS)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "learning_hub.asgi:application", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            env=env,
+        )
+        self.wait_ready()
+        self.client = HttpClient(f"http://127.0.0.1:{port}", concurrency)
+
+    def wait_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {self.process.returncode}")
+            try:
+                self.metrics()
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.close()
+        raise RuntimeError(f"uvicorn did not answer on port {self.port} within {timeout}s")
+
+    def metrics(self):
+        # Each worker keeps its own counters, a scrape only sees the one that answers
+        if self.workers > 1:
+            return ""
+        connection = HTTPConnection("127.0.0.1", self.port, timeout=10)
+        try:
+            connection.request("GET", "/metrics", headers={"Authorization": f"Bearer {self.token}"})
+            return connection.getresponse().read().decode()
+        finally:
+            connection.close()
+
+    def close(self):
+        if getattr(self, "client", None):
+            self.client.close()
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def seed(courses, users, enrollments):
+    """Seed the catalog and return the course ids and the students' tokens."""
+    seed_catalog(courses, max(users, 1), enrollments)
+    User.objects.create_user(username=LOGIN_USER, password=PASSWORD)
+    students = User.objects.filter(username__startswith="bench-student-").values_list("id", flat=True)
+    Token.objects.bulk_create([Token(key=Token.generate_key(), user_id=user_id) for user_id in students], ignore_conflicts=True)
+    course_ids = list(Course.objects.values_list("id", flat=True))
+    tokens = list(Token.objects.filter(user__username__startswith="bench-student-").values_list("key", flat=True))
+    return course_ids, tokens
+
+
+def measure(server, requests, concurrency):
+    asyncio.run(run_concurrently(server.client, requests[:min(50, len(requests))], concurrency))  # warm-up
+    before = read_totals(server.metrics())
+    started = time.perf_counter()
+    latencies = asyncio.run(run_concurrently(server.client, requests, concurrency))
+    elapsed = time.perf_counter() - started
+    after = read_totals(server.metrics())
+    served, queries = after[0] - before[0], after[1] - before[1]
+    return {
+        **summarize(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "queries_per_request": round(queries / served, 2) if served else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@app.command()
+def run(
+    scenario: list[str] = typer.Option(SCENARIOS, help="Scenarios to replay, all by default"),
+    concurrency: list[int] = typer.Option([1, 16], help="Concurrent clients, one pass per value"),
+    requests: int = typer.Option(1000, help="Requests per scenario and concurrency"),
+    courses: int = 10000,
+    users: int = 1000,
+    enrollments: int = 20000,
+    server: str = typer.Option("inprocess", help="inprocess (ASGI app in this process) or uvicorn"),
+    port: int = 8765,
+    workers: int = typer.Option(1, help="uvicorn worker processes"),
+    seed_value: int = typer.Option(42, "--seed", help="Seed of the catalog and of the request mix"),
+    limits: bool = typer.Option(False, help="Keep the rate limits and load shedding on"),
+    output: str = "",
+):
+    if server not in ("inprocess", "uvicorn"):
+        raise typer.BadParameter("--server is inprocess or uvicorn")
+    results = {}
+    with temporary_database() as database:
+        with stopwatch(f"seeding {courses} courses, {users} users, {enrollments} enrollments"):
+            course_ids, tokens = seed(courses, users, enrollments)
+        for clients in concurrency:
+            if server == "inprocess":
+                target = InProcess(clients, limits)
+            else:
+                target = Uvicorn(clients, database, port, workers, limits)
+            try:
+                for name in scenario:
+                    rng = random.Random(f"{seed_value}:{name}")
+                    batch = build_requests(name, requests, course_ids, tokens, rng)
+                    with stopwatch(f"{name}: {requests} requests, {clients} clients"):
+                        results[f"{name}:{clients}"] = measure(target, batch, clients)
+            finally:
+                target.close()
+
+    typer.echo(f"\n{'Scenario':<15} | {'Clients':>7} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'queries':>7}")
+    typer.echo("-" * 82)
+    for key, stats in results.items():
+        name, clients = key.split(":")
+        queries = "-" if stats["queries_per_request"] is None else stats["queries_per_request"]
+        typer.echo(
+            f"{name:<15} | {clients:>7} | {stats['rps']:>8} | {stats['p50_ms']:>8} | {stats['p95_ms']:>8} | "
+            f"{stats['p99_ms']:>8} | {queries:>7}"
+        )
+    if output:
+        meta = {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "server": server,
+            "workers": workers if server == "uvicorn" else None,
+            "courses": courses,
+            "users": users,
+            "enrollments": enrollments,
+            "requests": requests,
+            "seed": seed_value,
+            "limits": limits,
+            "python": platform.python_version(),
+        }
+        with open(output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+def change(before, after):
+    if not before or after is None:
+        return "-"
+    return f"{(after / before - 1) * 100:+.1f}%"
+
+
+@app.command()
+def compare(
+    baseline: str,
+    current: str,
+    tolerance: float = typer.Option(10.0, help="Slowdown (%) of req/s or p95 reported as a regression"),
+):
+    """Per scenario changes between two `run --output` files; exits with 1 on a regression."""
+    with open(baseline) as f:
+        before = json.load(f)
+    with open(current) as f:
+        after = json.load(f)
+    for field in ("server", "workers", "courses", "users", "enrollments"):
+        if before["meta"].get(field) != after["meta"].get(field):
+            typer.echo(f"⚠️  {field} differs: {before['meta'].get(field)} vs {after['meta'].get(field)}")
+
+    typer.echo(f"\n{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    typer.echo(f"{'Scenario':<22} | {'req/s':>8} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'queries':>9} |")
+    typer.echo("-" * 82)
+    regressions = []
+    for key, new in after["results"].items():
+        old = before["results"].get(key)
+        if old is None:
+            typer.echo(f"{key:<22} | {'new':>8} |")
+            continue
+        slower = (
+            new["rps"] < old["rps"] * (1 - tolerance / 100)
+            or new["p95_ms"] > old["p95_ms"] * (1 + tolerance / 100)
+            or (new["queries_per_request"] or 0) > (old["queries_per_request"] or 0)
+        )
+        if slower:
+            regressions.append(key)
+        queries = "-" if None in (old["queries_per_request"], new["queries_per_request"]) else f"{old['queries_per_request']}->{new['queries_per_request']}"
+        typer.echo(
+            f"{key:<22} | {change(old['rps'], new['rps']):>8} | {change(old['p50_ms'], new['p50_ms']):>8} | "
+            f"{change(old['p95_ms'], new['p95_ms']):>8} | {change(old['p99_ms'], new['p99_ms']):>8} | {queries:>9} |"
+            f"{' ❌' if slower else ''}"
+        )
+    if regressions:
+        typer.echo(f"❌ {len(regressions)} regression(s) beyond {tolerance}%: {', '.join(regressions)}")
+        raise typer.Exit(1)
+    typer.echo("✅ No regression")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import time
+
+import typer
+
+from benchmarks.common import AsgiClient, create_token_user, run_concurrently, seed_catalog, stopwatch, summarize, temporary_database
+
+from my_course.models import Course
+
+app = typer.Typer(help="BENCH | Sync DRF views against the async /api/async/ views under ASGI")
+
+"""
+Replays the same authenticated reads through the ASGI app against /api/courses/ (sync DRF, one thread per
+    request) and /api/async/courses/ (async ORM), at each concurrency level, and reports throughput and latency.
+Authenticated requests are used so the anonymous response cache does not hide the database work.
+    [CMD: python -m benchmarks.bench_async --requests 500 --concurrency 1 --concurrency 16 --concurrency 64]
+"""
+
+ENDPOINTS = {
+    "list": "courses/?page_size={page_size}",
+    "detail": "courses/{pk}/",
+    "categories": "courses/categories/",
+    "my_enrollments": "courses/my_enrollments/?page_size={page_size}",
+}
+
+
+async def measure(client, url, headers, requests, concurrency):
+    await run_concurrently(client, [("GET", url, headers, b"", (200,))] * 20, concurrency)  # warm-up
+    started = time.perf_counter()
+    latencies = await run_concurrently(client, [("GET", url, headers, b"", (200,))] * requests, concurrency)
+    elapsed = time.perf_counter() - started
+    return {**summarize(latencies), "requests_per_s": round(requests / elapsed, 1)}
+
+
+@app.command()
+def main(
+    requests: int = 500,
+    concurrency: list[int] = typer.Option([1, 16, 64]),
+    courses: int = 2000,
+    users: int = 500,
+    enrollments: int = 10000,
+    page_size: int = 20,
+    output: str = "",
+):
+    results = {}
+    with temporary_database():
+        with stopwatch(f"Seeded {courses} courses, {users} users, {enrollments} enrollments"):
+            seed_catalog(courses, users, enrollments)
+        user, token = create_token_user()
+        user.enrolled_courses.add(*Course.objects.order_by("?")[:page_size * 2])
+        pk = Course.objects.order_by("id").values_list("id", flat=True).first()
+
+        client = AsgiClient()
+        headers = {"Authorization": f"Token {token}"}
+        for name, path in ENDPOINTS.items():
+            path = path.format(page_size=page_size, pk=pk)
+            for level in concurrency:
+                for flavour, prefix in (("sync", "/api/"), ("async", "/api/async/")):
+                    stats = asyncio.run(measure(client, prefix + path, headers, requests, level))
+                    results[f"{name}:{flavour}:c{level}"] = stats
+
+    typer.echo(f"\n{'Endpoint':<16} | {'Mode':<6} | {'Conc.':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p99 ms':>8}")
+    typer.echo("-" * 66)
+    for key, stats in results.items():
+        name, flavour, level = key.split(":")
+        typer.echo(
+            f"{name:<16} | {flavour:<6} | {level[1:]:>5} | {stats['requests_per_s']:>8} "
+            f"| {stats['p50_ms']:>8} | {stats['p99_ms']:>8}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
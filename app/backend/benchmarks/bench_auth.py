@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+import json
+
+import typer
+
+from benchmarks.common import AsgiClient, create_token_user, seed_catalog, summarize, temporary_database, timed_requests
+
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from my_course.api_views import CourseViewSet, UserViewSet
+from my_course.authentication import CachedTokenAuthentication, local_tokens
+from my_course.models import Course
+
+app = typer.Typer(help="BENCH | Authenticated requests with DRF's TokenAuthentication and the cached one")
+
+"""
+Replays authenticated requests through the ASGI app with each authentication class and reports the
+    queries spent on authentication and role checks plus the latency. The cached class runs with its
+    in-process tier on for `--ttl` seconds (AUTH_TOKEN_CACHE_TTL, off by default).
+    [CMD: python -m benchmarks.bench_auth --requests 1000]
+"""
+
+BACKENDS = {"drf": TokenAuthentication, "cached": CachedTokenAuthentication}
+URLS = ["/api/courses/my_enrollments/?page_size=10", "/api/courses/my_courses/?page_size=10", "/api/users/me/"]
+
+
+def auth_queries(url, headers):
+    client = Client(headers=headers, SERVER_NAME="localhost")
+    client.get(url)  # warm the token cache
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    tables = ("authtoken_token", "auth_group")
+    return len(ctx.captured_queries), sum(any(t in q["sql"] for t in tables) for q in ctx.captured_queries)
+
+
+@app.command()
+def main(requests: int = 1000, concurrency: int = 1, courses: int = 1000, ttl: int = 30, output: str = ""):
+    results = {}
+    local_tokens.ttl = ttl
+    with temporary_database():
+        seed_catalog(courses)
+        user, token = create_token_user()
+        user.enrolled_courses.add(*Course.objects.all()[:10])
+        user.groups.add(Group.objects.get_or_create(name="Mentor")[0])
+        headers = {"Authorization": f"Token {token}"}
+        client = AsgiClient()
+
+        for name, backend in BACKENDS.items():
+            CourseViewSet.authentication_classes = UserViewSet.authentication_classes = [backend]
+            local_tokens.clear()
+            for url in URLS:
+                total, auth = auth_queries(url, headers)
+                timed_requests(client, url, 20, concurrency, **headers)  # warm-up
+                stats = summarize(timed_requests(client, url, requests, concurrency, **headers))
+                results[f"{name}:{url}"] = {**stats, "queries": total, "auth_queries": auth}
+
+    typer.echo(f"\n{'Auth':<7} | {'URL':<42} | {'queries':>7} | {'auth q.':>7} | {'p50 ms':>8} | {'p99 ms':>8}")
+    typer.echo("-" * 94)
+    for key, stats in results.items():
+        name, url = key.split(":", 1)
+        typer.echo(
+            f"{name:<7} | {url:<42} | {stats['queries']:>7} | {stats['auth_queries']:>7} "
+            f"| {stats['p50_ms']:>8} | {stats['p99_ms']:>8}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
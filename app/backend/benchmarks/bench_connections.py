@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+import json
+import os
+import subprocess
+import sys
+
+import typer
+
+from benchmarks.common import (
+    AsgiClient, create_token_user, seed_catalog, stopwatch, summarize, temporary_database, timed_requests
+)
+
+app = typer.Typer(help="BENCH | /api/courses/ latency with and without connection reuse")
+
+"""
+Runs the same authenticated /api/courses/ requests through the ASGI app under each connection mode,
+    each in its own process so the POSTGRES_* settings are read exactly as in production:
+    - off:        POSTGRES_CONN_MAX_AGE=0, a new connection per request (previous behaviour).
+    - persistent: POSTGRES_CONN_MAX_AGE=60 with health checks.
+    - pool:       POSTGRES_POOL=1, psycopg's pool (skipped when psycopg>=3 is not installed).
+    [CMD: python -m benchmarks.bench_connections run --requests 500]
+"""
+
+MODES = {
+    "off": {"POSTGRES_CONN_MAX_AGE": "0", "POSTGRES_POOL": "0"},
+    "persistent": {"POSTGRES_CONN_MAX_AGE": "60", "POSTGRES_CONN_HEALTH_CHECKS": "1", "POSTGRES_POOL": "0"},
+    "pool": {"POSTGRES_POOL": "1"},
+}
+
+
+def pool_available():
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@app.command()
+def run(requests: int = 500, courses: int = 200, page_size: int = 20, concurrency: int = 4, output: str = ""):
+    results = {}
+    with temporary_database() as database:
+        seed_catalog(courses)
+        _, token = create_token_user()
+
+        for mode, overrides in MODES.items():
+            if mode == "pool" and not pool_available():
+                typer.echo("⚠️  pool: skipped, psycopg[pool] is not installed")
+                continue
+            env = {**os.environ, **overrides, "POSTGRES_DB": database, "BENCH_TOKEN": token}
+            with stopwatch(f"{mode}: {requests} requests"):
+                worker = subprocess.run(
+                    [
+                        sys.executable, "-m", "benchmarks.bench_connections", "worker",
+                        str(requests), str(page_size), str(concurrency),
+                    ],
+                    env=env, capture_output=True, text=True, check=True,
+                )
+            results[mode] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    typer.echo(f"\n{'Mode':<12} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'mean ms':>8}")
+    typer.echo("-" * 56)
+    for mode, stats in results.items():
+        typer.echo(f"{mode:<12} | {stats['p50_ms']:>8} | {stats['p95_ms']:>8} | {stats['p99_ms']:>8} | {stats['mean_ms']:>8}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+@app.command(hidden=True)
+def worker(requests: int, page_size: int, concurrency: int):
+    client = AsgiClient()
+    url = f"/api/courses/?page_size={page_size}"
+    headers = {"Authorization": f"Token {os.environ['BENCH_TOKEN']}"}
+    timed_requests(client, url, 20, concurrency, **headers)  # warm-up: imports, pool start, first connection
+    typer.echo(json.dumps(summarize(timed_requests(client, url, requests, concurrency, **headers))))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import typer
+
+from benchmarks.common import AsgiClient, seed_catalog, stopwatch, temporary_database
+
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from my_course.enrollment import recount_all
+from my_course.models import Course
+
+app = typer.Typer(help="BENCH | Peak memory of the course exports as the catalog grows")
+
+"""
+Grows a synthetic catalog step by step and runs an export in a child process at each size,
+    reading the child's peak RSS. A flat peak means memory does not depend on the number of rows.
+    - run: `cli.py list-courses --save`; the previous implementation (whole list in memory, then
+      json.dump) is replayed as a baseline.
+      [CMD: python -m benchmarks.bench_export run --sizes 10000 --sizes 100000 --sizes 1000000]
+    - api: /api/export/enrollments/ streamed through the ASGI app, the body is counted and dropped.
+      [CMD: python -m benchmarks.bench_export api --sizes 100000 --sizes 3000000]
+"""
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(command, env):
+    """Run `command` and return (seconds, peak RSS in MB) of that process."""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, cwd=BACKEND, stdout=subprocess.DEVNULL)
+    _, code, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(code)
+    if process.returncode:
+        raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+    return time.perf_counter() - started, usage.ru_maxrss / 1024
+
+
+@app.command()
+def run(sizes: list[int] = typer.Option([10_000, 100_000, 1_000_000]), format: str = "jsonl", legacy: bool = True, output: str = ""):
+    results = {}
+    with temporary_database() as database, tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "POSTGRES_DB": database}
+        seeded = 0
+        for size in sorted(sizes):
+            with stopwatch(f"Seeded {size - seeded} more courses"):
+                seed_catalog(size - seeded)
+            seeded = Course.objects.count()
+
+            target = os.path.join(directory, f"export.{format}")
+            seconds, rss = measure(
+                [sys.executable, "cli/cli.py", "list-courses", "--save", "--quiet", "--format", format, "--output", target],
+                env,
+            )
+            results[f"stream:{size}"] = {"seconds": round(seconds, 2), "rows_per_s": round(size / seconds), "peak_rss_mb": round(rss, 1)}
+            if legacy:
+                seconds, rss = measure([sys.executable, "-m", "benchmarks.bench_export", "legacy", target], env)
+                results[f"legacy:{size}"] = {"seconds": round(seconds, 2), "rows_per_s": round(size / seconds), "peak_rss_mb": round(rss, 1)}
+
+    report(results, output)
+
+
+def report(results, output):
+    typer.echo(f"\n{'Mode':<8} | {'Rows':>9} | {'Seconds':>8} | {'rows/s':>8} | {'Peak RSS MB':>11}")
+    typer.echo("-" * 56)
+    for key, stats in results.items():
+        mode, size = key.split(":")
+        typer.echo(f"{mode:<8} | {size:>9} | {stats['seconds']:>8} | {stats['rows_per_s']:>8} | {stats['peak_rss_mb']:>11}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+@app.command()
+def api(sizes: list[int] = typer.Option([100_000, 1_000_000]), courses: int = 20_000, users: int = 20_000, output: str = ""):
+    results = {}
+    with temporary_database() as database:
+        seed_catalog(courses, users)
+        admin = User.objects.create_superuser(username="bench-admin", password="!")
+        env = {**os.environ, "POSTGRES_DB": database, "BENCH_TOKEN": Token.objects.create(user=admin).key}
+        for size in sorted(sizes):
+            with stopwatch(f"Seeded up to {size} enrollments"):
+                seed_enrollments(size)
+            seconds, rss = measure([sys.executable, "-m", "benchmarks.bench_export", "api-worker"], env)
+            results[f"ndjson:{size}"] = {"seconds": round(seconds, 2), "rows_per_s": round(size / seconds), "peak_rss_mb": round(rss, 1)}
+    report(results, output)
+
+
+def seed_enrollments(total, batch_size=50_000):
+    """Fill the enrollment table up to `total` distinct pairs, walking the (course, user) grid."""
+    Through = Course.students.through
+    course_ids = list(Course.objects.order_by("id").values_list("id", flat=True))
+    user_ids = list(User.objects.filter(username__startswith="bench-student-").order_by("id").values_list("id", flat=True))
+    for start in range(Through.objects.count(), total, batch_size):
+        Through.objects.bulk_create(
+            [
+                Through(course_id=course_ids[i % len(course_ids)], user_id=user_ids[i // len(course_ids)])
+                for i in range(start, min(start + batch_size, total))
+            ],
+            batch_size=5000,
+        )
+    recount_all()
+
+
+@app.command(hidden=True)
+def api_worker():
+    received = []
+    status, _ = asyncio.run(AsgiClient().request(
+        "GET", "/api/export/enrollments/", {"Authorization": f"Token {os.environ['BENCH_TOKEN']}"},
+        on_body=lambda chunk: received.append(len(chunk)),
+    ))
+    if status != 200:
+        raise RuntimeError(f"export answered {status}")
+    typer.echo(f"{sum(received)} bytes in {len(received)} chunks")
+
+
+@app.command(hidden=True)
+def legacy(target: str):
+    """The export as it was: every course in a list, owners fetched one by one, a single json.dump."""
+    course_list = []
+    courses = Course.objects.all().order_by("-post_date")
+    for course in courses:
+        course_list.append({
+            "id": course.id,
+            "title": course.course_title,
+            "category": course.category,
+            "school": course.school_name,
+            "description": course.description,
+            "price": float(course.price),
+            "available_until": course.available_until.isoformat(),
+            "post_date": course.post_date.isoformat(),
+            "user": course.user.username,
+            "author": course.author,
+        })
+    with open(target, "w") as f:
+        json.dump(course_list, f, indent=2)
+
+
+if __name__ == "__main__":
+    app()
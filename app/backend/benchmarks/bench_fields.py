@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import statistics
+import time
+
+import typer
+
+from benchmarks.common import AsgiClient, create_token_user, run_concurrently, seed_catalog, summarize, temporary_database
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from my_course.models import Course
+from my_course.serializers import CourseSerializer
+
+app = typer.Typer(help="BENCH | Payload size and serialization time of sparse course fieldsets")
+
+"""
+Compares a page of /api/courses/ rendered in full with sparse fieldsets (?fields=, ?omit=):
+    - bytes per page, and the time to fetch the page rows and to serialize them, measured on the serializer;
+    - end-to-end p50/p99 of the same requests through the ASGI app (authenticated, so never from the cache).
+Seeded descriptions run to about 1.5 KB; real ones (fixtures/course.json) are longer still.
+    [CMD: python -m benchmarks.bench_fields --courses 100000 --page-size 100]
+"""
+
+MODES = {
+    "full": {},
+    "omit": {"omit": "description"},
+    "card": {"fields": "id,course_title,school_name,price"},
+}
+
+
+def measure_page(query, page_size, user):
+    """(fetch seconds, serialize seconds, bytes) of the first page for `query`."""
+    request = Request(APIRequestFactory().get("/api/courses/", {**query, "page_size": page_size}))
+    request.user = user
+    context = {"request": request}
+    started = time.perf_counter()
+    queryset = CourseSerializer(context=context).listing(Course.objects.all(), user)
+    rows = list(queryset.order_by("-post_date", "-id")[:page_size])
+    fetched = time.perf_counter()
+    body = JSONRenderer().render(CourseSerializer(rows, many=True, context=context).data)
+    return fetched - started, time.perf_counter() - fetched, len(body)
+
+
+@app.command()
+def main(courses: int = 20000, page_size: int = 100, requests: int = 500, concurrency: int = 4, output: str = ""):
+    results = {}
+    with temporary_database():
+        seed_catalog(courses)
+        user, token = create_token_user()
+        client = AsgiClient()
+        headers = {"Authorization": f"Token {token}"}
+
+        for mode, query in MODES.items():
+            samples = [measure_page(query, page_size, user) for _ in range(50)]
+            params = "&".join(f"{name}={value}" for name, value in query.items())
+            url = f"/api/courses/?page_size={page_size}" + (f"&{params}" if params else "")
+            batch = [("GET", url, headers, b"", (200,))] * requests
+            asyncio.run(run_concurrently(client, batch[:50], concurrency))  # warm-up
+            results[mode] = {
+                **summarize(asyncio.run(run_concurrently(client, batch, concurrency))),
+                "bytes": samples[0][2],
+                "fetch_ms": round(statistics.median(fetch for fetch, _, _ in samples) * 1000, 3),
+                "serialize_ms": round(statistics.median(serialize for _, serialize, _ in samples) * 1000, 3),
+            }
+
+    typer.echo(f"\n{page_size} courses per page")
+    typer.echo(f"{'Mode':<5} | {'bytes':>9} | {'fetch ms':>9} | {'serialize ms':>12} | {'p50 ms':>8} | {'p99 ms':>8}")
+    typer.echo("-" * 68)
+    for mode, stats in results.items():
+        typer.echo(
+            f"{mode:<5} | {stats['bytes']:>9} | {stats['fetch_ms']:>9} | {stats['serialize_ms']:>12} | "
+            f"{stats['p50_ms']:>8} | {stats['p99_ms']:>8}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
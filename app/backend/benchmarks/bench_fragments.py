@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+import json
+import time
+
+import typer
+
+from benchmarks.common import create_token_user, seed_catalog, temporary_database
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from my_course.cache import get_cache
+from my_course.fragments import STAMP_COLUMNS, course_fragments
+from my_course.models import Course
+from my_course.renderers import FragmentJSONRenderer
+from my_course.serializers import CourseSerializer
+
+app = typer.Typer(help="BENCH | Course list serialization with and without the fragment cache")
+
+"""
+Serializes the whole catalog as one list, like a page of /api/courses/ would be, for an authenticated user:
+    - serializer: CourseSerializer(many=True) and JSONRenderer over full rows (the previous path);
+    - cold: fragment cache empty, every course rendered and stored (one extra query for the full rows);
+    - warm: fragments from the cache, only is_enrolled spliced in per course.
+Rows are fetched before the clock starts, so the times are serialization only (cold includes its query).
+The cache is the configured COURSE_CACHE_ALIAS, locmem unless DJANGO_CACHE_BACKEND says otherwise.
+    [CMD: python -m benchmarks.bench_fragments --courses 10000]
+"""
+
+
+def timed(function, repeat):
+    """Best wall time of `repeat` calls in ms, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 1), result
+
+
+@app.command()
+def main(courses: int = 10000, repeat: int = 5, output: str = ""):
+    results = {}
+    with temporary_database():
+        seed_catalog(courses, users=courses // 10, enrollments=courses * 2)
+        user, _ = create_token_user()
+        request = Request(APIRequestFactory().get("/api/courses/"))
+        request.user = user
+        context = {"request": request}
+        renderer = FragmentJSONRenderer()
+
+        rows = CourseSerializer(context=context).listing(Course.objects.all(), user)
+        full = list(rows.order_by("-post_date", "-id"))
+        stamps = list(rows.select_related(None).only(*STAMP_COLUMNS).order_by("-post_date", "-id"))
+
+        def serializer():
+            return renderer.render({"results": CourseSerializer(full, many=True, context=context).data})
+
+        def fragments():
+            return renderer.render({"results": course_fragments(stamps, rows, CourseSerializer, context)})
+
+        ms, expected = timed(serializer, repeat)
+        results["serializer"] = {"ms": ms, "bytes": len(expected)}
+        cold = []
+        for _ in range(repeat):
+            get_cache().clear()
+            cold.append(timed(fragments, 1)[0])
+        results["cold"] = {"ms": min(cold), "bytes": len(fragments())}
+        ms, body = timed(fragments, repeat)
+        results["warm"] = {"ms": ms, "bytes": len(body)}
+        if json.loads(body) != json.loads(expected):
+            raise RuntimeError("Assembled fragments differ from the serializer output")
+
+    typer.echo(f"\n{courses} courses, best of {repeat}")
+    typer.echo(f"{'Path':<10} | {'ms':>9} | {'bytes':>11} | {'speed-up':>8}")
+    typer.echo("-" * 48)
+    for path, stats in results.items():
+        typer.echo(
+            f"{path:<10} | {stats['ms']:>9} | {stats['bytes']:>11} | "
+            f"{results['serializer']['ms'] / stats['ms']:>7.1f}x"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
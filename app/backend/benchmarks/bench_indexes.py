@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import re
+import time
+
+import typer
+
+from benchmarks.common import seed_catalog, stopwatch, temporary_database
+
+from my_course.models import Course
+from my_course.pagination import KeysetPagination
+
+app = typer.Typer(help="BENCH | Query plans of the course list, category filter and search")
+
+"""
+Seeds a synthetic catalog and EXPLAIN ANALYZEs the catalog queries served by CourseViewSet.
+Each query is checked for the index it is expected to use. The deep keyset page, a cursor near the end of
+    the catalog seeked with the paginator's own filter, must also be an index condition on post_date that
+    discards at most MAX_ROWS_REMOVED rows: a filter-only index scan reads the whole catalog up to the cursor.
+    [CMD: python -m benchmarks.bench_indexes --courses 100000]
+"""
+
+PAGE_SIZE = 50
+MAX_ROWS_REMOVED = 100
+
+
+def queries(courses):
+    ordering = KeysetPagination.ordering
+    first_page = Course.objects.order_by(*ordering)
+    last = first_page[max(0, courses - 2 * PAGE_SIZE)]
+    deep_page = first_page.filter(KeysetPagination()._seek_filter(ordering, [last.post_date, last.id]))
+    return [
+        ("category filter", Course.objects.in_category("python"), "course_category_lower_idx", False),
+        ("first page (post_date, id)", first_page[:PAGE_SIZE], "course_post_date_id_idx", False),
+        ("deep keyset page", deep_page[:PAGE_SIZE], "course_post_date_id_idx", True),
+        ("full-text search", Course.objects.search("kubernetes terraform").order_by("-search_rank", "-id")[:PAGE_SIZE], "course_search_idx", False),
+    ]
+
+
+def seeks(plan):
+    """Whether the plan seeks post_date in the index and filters out few rows."""
+    seeked = any("Index Cond" in line and "post_date" in line for line in plan.splitlines())
+    removed = sum(int(rows) for rows in re.findall(r"Rows Removed by Filter: (\d+)", plan))
+    return seeked and removed <= MAX_ROWS_REMOVED
+
+
+@app.command()
+def main(courses: int = 100_000, verbose: bool = False):
+    with temporary_database():
+        with stopwatch(f"Seeded {courses} courses"):
+            seed_catalog(courses)
+
+        failures = 0
+        for label, queryset, index, seek in queries(courses):
+            started = time.perf_counter()
+            plan = queryset.explain(analyze=True)
+            elapsed = (time.perf_counter() - started) * 1000
+            used = index in plan and (not seek or seeks(plan))
+            failures += not used
+            typer.echo(f"{'✅' if used else '❌'} {label:<28} | {index:<26} | {elapsed:8.2f} ms")
+            if verbose or not used:
+                typer.echo(plan + "\n")
+
+    if failures:
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
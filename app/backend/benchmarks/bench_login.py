@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import typer
+
+from benchmarks.common import AsgiClient, create_token_user, run_concurrently, seed_catalog, summarize, temporary_database
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from my_course import hashers
+
+app = typer.Typer(help="BENCH | Latency of course reads during a flood of logins")
+
+"""
+Replays authenticated `/api/courses/` reads through the ASGI app, first alone, then while `--logins`
+    concurrent clients log in non-stop, once per hashing pool size. The pool caps how many cores the
+    login flood can take: the read p99 shows what is left for everyone else.
+Passwords are hashed with the configured PASSWORD_HASHER and its cost parameters. Rate limits and load
+    shedding (my_course.throttling) are turned off: the flood is what they would refuse.
+    [CMD: python -m benchmarks.bench_login --reads 2000 --workers 32 --workers 2]
+"""
+
+READ_URL = "/api/courses/?page_size=20"
+LOGIN_URL = "/api/users/login/"
+PASSWORD = "bench-login-password"
+
+
+async def login_storm(client, reads, read_concurrency, logins):
+    """Read latencies while `logins` clients keep logging in, and the number of logins done meanwhile."""
+    done = asyncio.Event()
+    answered = []
+    body = json.dumps({"username": "bench-login", "password": PASSWORD}).encode()
+
+    async def flood():
+        while not done.is_set():
+            status, _ = await client.request("POST", LOGIN_URL, {"Content-Type": "application/json"}, body)
+            if status != 200:
+                raise RuntimeError(f"login answered {status}")
+            answered.append(status)
+
+    flooders = [asyncio.create_task(flood()) for _ in range(logins)]
+    await asyncio.sleep(0.5)  # let the flood build up
+    try:
+        latencies = await run_concurrently(client, reads, read_concurrency)
+    finally:
+        done.set()
+        await asyncio.gather(*flooders)
+    return latencies, len(answered)
+
+
+@app.command()
+def main(
+    reads: int = 2000,
+    concurrency: int = 8,
+    logins: int = 32,
+    workers: list[int] = typer.Option([32, settings.PASSWORD_HASH_WORKERS], help="Hashing pool sizes to compare"),
+    courses: int = 1000,
+    output: str = "",
+):
+    results = {}
+    settings.THROTTLE_RATES = {}
+    settings.LOAD_SHED_MAX_EXPENSIVE = settings.LOAD_SHED_MAX_IN_FLIGHT = 0
+    with temporary_database():
+        seed_catalog(courses)
+        _, token = create_token_user()
+        User.objects.create_user(username="bench-login", password=PASSWORD)
+        client = AsgiClient()
+        requests = [("GET", READ_URL, {"Authorization": f"Token {token}"}, b"", (200,))] * reads
+
+        asyncio.run(run_concurrently(client, requests[:50], concurrency))  # warm-up
+        results["idle:-"] = {**summarize(asyncio.run(run_concurrently(client, requests, concurrency))), "logins_per_s": 0}
+        for count in workers:
+            hashers.executor().shutdown()
+            hashers._executor = ThreadPoolExecutor(count, thread_name_prefix="password-hash")
+            started = time.perf_counter()
+            latencies, answered = asyncio.run(login_storm(client, requests, concurrency, logins))
+            stats = summarize(latencies)
+            results[f"storm:{count}"] = {**stats, "logins_per_s": round(answered / (time.perf_counter() - started), 1)}
+
+    typer.echo(f"\n{settings.PASSWORD_HASHERS[0].rsplit('.', 1)[1]}, {logins} clients logging in")
+    typer.echo(f"{'Mode':<6} | {'Hash threads':>12} | {'p50 ms':>8} | {'p99 ms':>8} | {'logins/s':>8}")
+    typer.echo("-" * 56)
+    for key, stats in results.items():
+        mode, count = key.split(":")
+        typer.echo(f"{mode:<6} | {count:>12} | {stats['p50_ms']:>8} | {stats['p99_ms']:>8} | {stats['logins_per_s']:>8}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
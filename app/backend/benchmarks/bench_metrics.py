@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+import json
+import os
+import subprocess
+import sys
+
+import typer
+
+from benchmarks.common import (
+    AsgiClient, create_token_user, seed_catalog, stopwatch, summarize, temporary_database, timed_requests
+)
+
+app = typer.Typer(help="BENCH | Overhead of the request metrics middleware")
+
+"""
+Runs the same authenticated requests through the ASGI app under each metrics mode, each in its own
+    process so the METRICS_* settings are read exactly as in production:
+    - off: METRICS_ENABLED=0, no middleware (the SQL recorder stays installed and idles).
+    - on:  latency histogram, query count/time and response size per route (the default).
+    - sql: on, plus every query kept for the slow request log (threshold never reached here).
+The list and detail endpoints are both replayed, a few queries each, where the relative cost shows most.
+    [CMD: python -m benchmarks.bench_metrics run --requests 2000]
+"""
+
+MODES = {
+    "off": {"METRICS_ENABLED": "0"},
+    "on": {"METRICS_ENABLED": "1", "METRICS_SLOW_REQUEST_MS": "0"},
+    "sql": {"METRICS_ENABLED": "1", "METRICS_SLOW_REQUEST_MS": "60000"},
+}
+
+
+@app.command()
+def run(requests: int = 2000, courses: int = 200, concurrency: int = 4, output: str = ""):
+    results = {}
+    with temporary_database() as database:
+        seed_catalog(courses)
+        _, token = create_token_user()
+        env = {**os.environ, "POSTGRES_DB": database, "BENCH_TOKEN": token}
+
+        for mode, overrides in MODES.items():
+            with stopwatch(f"{mode}: {requests} requests per URL"):
+                worker = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_metrics", "worker", str(requests), str(concurrency)],
+                    env={**env, **overrides}, capture_output=True, text=True, check=True,
+                )
+            for url, stats in json.loads(worker.stdout.strip().splitlines()[-1]).items():
+                results[f"{mode}:{url}"] = stats
+
+    typer.echo(f"\n{'Mode':<5} | {'URL':<30} | {'p50 ms':>8} | {'p99 ms':>8} | {'mean ms':>8} | {'vs off':>7}")
+    typer.echo("-" * 80)
+    for key, stats in results.items():
+        mode, url = key.split(":", 1)
+        baseline = results[f"off:{url}"]["mean_ms"]
+        overhead = f"{(stats['mean_ms'] / baseline - 1) * 100:+.1f}%" if baseline else "-"
+        typer.echo(
+            f"{mode:<5} | {url:<30} | {stats['p50_ms']:>8} | {stats['p99_ms']:>8} | {stats['mean_ms']:>8} | {overhead:>7}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+@app.command(hidden=True)
+def worker(requests: int, concurrency: int):
+    from my_course.models import Course
+
+    client = AsgiClient()
+    headers = {"Authorization": f"Token {os.environ['BENCH_TOKEN']}"}
+    urls = ["/api/courses/?page_size=20", f"/api/courses/{Course.objects.order_by('id').values_list('id', flat=True).first()}/"]
+    results = {}
+    for url in urls:
+        timed_requests(client, url, 50, concurrency, **headers)  # warm-up
+        results[url] = summarize(timed_requests(client, url, requests, concurrency, **headers))
+    typer.echo(json.dumps(results))
+
+
+if __name__ == "__main__":
+    app()
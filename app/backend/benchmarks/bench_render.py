@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+import asyncio
+import json
+import time
+
+import typer
+
+from benchmarks.common import AsgiClient, run_concurrently, seed_catalog, summarize, temporary_database
+
+from django.conf import settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from my_course.compression import available_encodings, compress
+from my_course.models import Course
+from my_course.pagination import KeysetPagination
+from my_course.renderers import FragmentJSONRenderer, ORJSONRenderer, orjson
+from my_course.serializers import CourseSerializer
+
+app = typer.Typer(help="BENCH | Render time and bytes on the wire of a large course list")
+
+"""
+A large course list (`--courses` rows, CourseSerializer output, anonymous) measured three ways:
+    - render: DRF's JSONRenderer (stdlib json) against ORJSONRenderer, same document;
+    - compression: bytes and time of the rendered list as is, gzip and brotli (COMPRESSION_* settings);
+    - end to end: the largest page of /api/courses/ (max_page_size) through the ASGI app for each
+      Accept-Encoding, p50/p99 and bytes as received. The anonymous list is cached: this is mostly compression.
+brotli and orjson are optional (`poetry add brotli orjson`), their rows are skipped when missing.
+    [CMD: python -m benchmarks.bench_render --courses 1000]
+"""
+
+
+def timed(function, repeat):
+    """Best wall time of `repeat` calls in ms, and the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 2), result
+
+
+@app.command()
+def main(courses: int = 1000, repeat: int = 20, requests: int = 200, concurrency: int = 4, output: str = ""):
+    results = {"render": {}, "compression": {}, "http": {}}
+    with temporary_database():
+        seed_catalog(courses)
+        request = Request(APIRequestFactory().get("/api/courses/"))
+        rows = CourseSerializer(context={"request": request}).listing(Course.objects.all())
+        data = {"results": CourseSerializer(list(rows), many=True, context={"request": request}).data}
+
+        renderers = {"json": FragmentJSONRenderer()}
+        if orjson:
+            renderers["orjson"] = ORJSONRenderer()
+        bodies = {}
+        for name, renderer in renderers.items():
+            ms, bodies[name] = timed(lambda: renderer.render(data), repeat)
+            results["render"][name] = {"ms": ms, "bytes": len(bodies[name])}
+        if len({json.dumps(json.loads(body)) for body in bodies.values()}) > 1:
+            raise RuntimeError("orjson and json render different documents")
+        body = bodies["json"]
+
+        results["compression"]["identity"] = {"ms": 0.0, "bytes": len(body)}
+        for encoding in available_encodings():
+            ms, compressed = timed(lambda: compress(body, encoding), repeat)
+            results["compression"][encoding] = {"ms": ms, "bytes": len(compressed)}
+
+        client = AsgiClient()
+        url = f"/api/courses/?page_size={min(courses, KeysetPagination.max_page_size)}"
+        for encoding in ["identity", *available_encodings()]:
+            headers = {"Accept-Encoding": encoding}
+            _, received = asyncio.run(client.get(url, headers))
+            batch = [("GET", url, headers, b"", (200,))] * requests
+            asyncio.run(run_concurrently(client, batch[:20], concurrency))  # warm-up
+            results["http"][encoding] = {
+                **summarize(asyncio.run(run_concurrently(client, batch, concurrency))),
+                "bytes": len(received),
+            }
+
+    typer.echo(f"\n{courses} courses, best of {repeat} (gzip level {settings.COMPRESSION_GZIP_LEVEL}, "
+               f"brotli quality {settings.COMPRESSION_BROTLI_QUALITY})")
+    typer.echo(f"{'Render':<10} | {'ms':>9} | {'bytes':>11}")
+    typer.echo("-" * 36)
+    for name, stats in results["render"].items():
+        typer.echo(f"{name:<10} | {stats['ms']:>9} | {stats['bytes']:>11}")
+    typer.echo(
+        f"\n{'Encoding':<10} | {'ms':>9} | {'bytes':>11} | {'ratio':>6} | "
+        f"{'page bytes':>11} | {'p50 ms':>8} | {'p99 ms':>8}"
+    )
+    typer.echo("-" * 80)
+    identity = results["compression"]["identity"]["bytes"]
+    for encoding, stats in results["compression"].items():
+        http = results["http"][encoding]
+        typer.echo(
+            f"{encoding:<10} | {stats['ms']:>9} | {stats['bytes']:>11} | {identity / stats['bytes']:>5.1f}x | "
+            f"{http['bytes']:>11} | {http['p50_ms']:>8} | {http['p99_ms']:>8}"
+        )
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        typer.echo(f"✅ Json saved to: {output}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,264 @@
+import asyncio
+import http.client
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import django
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "learning_hub.settings")
+django.setup()
+
+import typer
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+from my_course.categories import sync_categories
+from my_course.enrollment import recount_all
+from my_course.models import Course
+
+"""
+Shared helpers for the benchmark scripts.
+    - Every benchmark runs against a throw-away `test_<POSTGRES_DB>` database, never the real one.
+    - Synthetic catalogs are seeded with bulk inserts so 100k+ rows load in seconds.
+"""
+
+User = get_user_model()
+
+WORDS = [
+    "python", "django", "kubernetes", "terraform", "data", "design", "marketing", "finance",
+    "cooking", "music", "photography", "security", "cloud", "network", "biology", "history",
+    "language", "writing", "drawing", "statistics", "robotics", "chemistry", "physics", "law",
+]
+# Filler vocabulary so descriptions are long but only mention a couple of topics, like real ones
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "sa", "do", "fu"]
+FILLER = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+SCHOOLS = ["Bananas School", "Open Academy", "Night Campus", "Code Lab", "Studio 42", "Remote U"]
+
+
+@contextmanager
+def temporary_database(keepdb=False):
+    """Create the Django test database, point the default connection at it, and drop it afterwards."""
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection.settings_dict["NAME"]
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def seed_catalog(courses, users=0, enrollments=0, batch_size=5000, seed=42):
+    """Insert `courses` courses, `users` students and about `enrollments` enrollment rows."""
+    rng = random.Random(seed)
+    mentor, _ = User.objects.get_or_create(username="bench-mentor")
+    start = timezone.now() - timedelta(days=365)
+
+    for offset in range(0, courses, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, courses)):
+            topic, other = rng.sample(WORDS, 2)
+            batch.append(Course(
+                course_title=f"{topic.title()} {other} {i}",
+                category=rng.choice(WORDS[:12]).title(),
+                school_name=rng.choice(SCHOOLS),
+                description=f"Learn {topic} and {other}. " + " ".join(rng.choices(FILLER, k=rng.randint(20, 200))),
+                price=rng.randint(0, 50000) / 100,
+                available_until=date.today() + timedelta(days=rng.randint(1, 700)),
+                author=f"Author {i % 997}",
+                user=mentor,
+            ))
+        Course.objects.bulk_create(batch)
+    # auto_now_add stamps every row with the same instant; spread them out like a real catalog
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {Course._meta.db_table} SET post_date = %s + (id %% 525600) * interval '1 minute'",
+            [start],
+        )
+    sync_categories()
+
+    if users:
+        User.objects.bulk_create(
+            [User(username=f"bench-student-{i}", password="!") for i in range(users)],
+            batch_size=batch_size,
+        )
+    if enrollments and users:
+        course_ids = list(Course.objects.values_list("id", flat=True))
+        user_ids = list(User.objects.filter(username__startswith="bench-student-").values_list("id", flat=True))
+        Through = Course.students.through
+        pairs = {(rng.choice(course_ids), rng.choice(user_ids)) for _ in range(enrollments)}
+        Through.objects.bulk_create(
+            [Through(course_id=course_id, user_id=user_id) for course_id, user_id in pairs],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        recount_all(batch_size)
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def create_token_user(username="bench-reader"):
+    """A student with an API token, for authenticated requests that bypass the anonymous cache."""
+    from rest_framework.authtoken.models import Token
+
+    user, _ = User.objects.get_or_create(username=username)
+    token, _ = Token.objects.get_or_create(user=user)
+    return user, token.key
+
+
+class AsgiClient:
+    """
+    Drives learning_hub's ASGI application in-process, like uvicorn would.
+    Unlike django.test.Client it keeps Django's request_started/request_finished connection handling,
+    so CONN_MAX_AGE and pooling behave as in production.
+    """
+
+    def __init__(self, application=None):
+        if application is None:
+            from learning_hub.asgi import application
+        self.application = application
+
+    async def request(self, method, url, headers=None, body=b"", on_body=None):
+        """Returns (status, body); with `on_body` the body chunks are handed to it instead of kept."""
+        path, _, query = url.partition("?")
+        raw_headers = [(b"host", b"localhost")]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+        if body:
+            raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 40000),
+            "server": ("localhost", 8000),
+        }
+        pending = [{"type": "http.request", "body": body, "more_body": False}]
+        disconnected = asyncio.Event()
+        response = {"status": None, "headers": [], "body": []}
+
+        async def receive():
+            if pending:
+                return pending.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body" and on_body:
+                on_body(message.get("body", b""))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.application(scope, receive, send)
+        disconnected.set()
+        return response["status"], b"".join(response["body"])
+
+    async def get(self, url, headers=None):
+        return await self.request("GET", url, headers)
+
+
+class HttpClient:
+    """
+    Same interface as AsgiClient against a running server (e.g. a local uvicorn), over keep-alive
+    HTTP/1.1 connections: one per thread of a `concurrency` sized pool.
+    """
+
+    def __init__(self, base_url, concurrency=64):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.pool = ThreadPoolExecutor(concurrency, thread_name_prefix="bench-http")
+        self.local = threading.local()
+
+    def send(self, method, url, headers, body):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        headers = dict(headers or {})
+        if body:
+            headers["Content-Type"] = "application/json"
+        try:
+            connection.request(method, url, body=body or None, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+
+    async def request(self, method, url, headers=None, body=b""):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self.send, method, url, headers, body)
+
+    async def get(self, url, headers=None):
+        return await self.request("GET", url, headers)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+async def run_concurrently(client, requests, concurrency):
+    """
+    Replay `requests` (method, url, headers, body, expected statuses) with `concurrency` workers.
+    Returns the latency of each request in milliseconds.
+    """
+    queue = list(reversed(requests))
+    latencies = []
+
+    async def worker():
+        while queue:
+            method, url, headers, body, expected = queue.pop()
+            started = time.perf_counter()
+            status, _ = await client.request(method, url, headers, body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status not in expected:
+                raise RuntimeError(f"{method} {url} answered {status}")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def timed_requests(client, url, count, concurrency=1, **headers):
+    """Issue `count` GETs through an AsgiClient and return the latency of each one in milliseconds."""
+    requests = [("GET", url, headers, b"", (200,))] * count
+    return asyncio.run(run_concurrently(client, requests, concurrency))
+
+
+def summarize(latencies_ms):
+    total = sum(latencies_ms)
+    return {
+        "requests": len(latencies_ms),
+        "mean_ms": round(total / len(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@contextmanager
+def stopwatch(label):
+    started = time.perf_counter()
+    yield
+    typer.echo(f"⏱️  {label}: {time.perf_counter() - started:.2f}s")
@@ -5,7 +5,8 @@ import os
 import django
 import sys
 from django.contrib.auth import get_user_model
-import json
+import gzip
+import time
 
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -13,6 +14,9 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "learning_hub.settings")
 django.setup()
 
 from django.contrib.auth.models import Group
+from my_course.export import WRITERS, JsonLinesWriter, course_record, export_courses
+from my_course.importer import BATCH_SIZE, READERS, import_courses as import_rows
+from my_course import provisioning
 from my_course.models import Course
 
 app = typer.Typer(help="ADMIN | CLI for Admins only")
@@ -27,7 +31,9 @@ CLI Commands for Admin use only.
     - Set any existing group to a user. For mentors.
     - Remove any assigned group from a user.
     - List all existing course, in a regular or short print.
-        Can be saved to a Json if needed.
+        Can be saved to a Json, Json Lines or CSV file (optionally gzipped), streamed in chunks.
+    - Import courses from a Json, Json Lines or CSV file (optionally gzipped), upserted in batches.
+    - Create a cohort of users from a CSV file, passwords hashed in parallel.
 """
 
 
@@ -131,62 +137,167 @@ def reset_group(username: str = typer.Argument(...)):
 
 
 @app.command()
-def list_courses(short: bool = False, long: bool = False, save: bool = False):
+def list_courses(
+    short: bool = False,
+    long: bool = False,
+    save: bool = False,
+    format: str = typer.Option("json", help="Export format with --save: json, jsonl or csv"),
+    gzip_output: bool = typer.Option(False, "--gzip", help="Compress the export with gzip"),
+    output: str = typer.Option("", help="Export file name, defaults to <date>_list_course.<format>"),
+    quiet: bool = typer.Option(False, help="Do not print the table, only the export progress"),
+    chunk_size: int = 2000,
+):
     """
     List courses of E-HUB
     [CMD: list-course]
     """
-    courses = Course.objects.all().order_by('-post_date')
+    courses = Course.objects.all().order_by('-post_date', '-id')
     
     if not courses.exists():
         typer.echo("❌ No courses found!")
         return
+    if save and format not in WRITERS:
+        typer.echo(f"❌ Unknown format {format}, use one of: {', '.join(WRITERS)}", err=True)
+        raise typer.Exit(1)
+
+    export = None
     try:
-        if short:
+        if not quiet:
             typer.echo("\n📚 Course available at E-HUB")
-            typer.echo("-" * 75)
-            typer.echo(f"{'Title':<50} | {'School':<18}")
-            typer.echo("-" * 75)
-    
-            for course in courses:
+            if short:
+                typer.echo("-" * 75)
+                typer.echo(f"{'Title':<50} | {'School':<18}")
+                typer.echo("-" * 75)
+            else:
+                typer.echo("-" * 120)
+                typer.echo(f"{'ID':<5} | {'Title':<50} | {'Category':<18} | {'School':<18} | {'Price':<8}")
+                typer.echo("-" * 120)
+        if save:
+            filename = output or f"{datetime.now()}_list_course.{WRITERS[format].extension}"
+            if gzip_output and not filename.endswith(".gz"):
+                filename += ".gz"
+            export = open_export(filename, format, gzip_output)
+            total = courses.count()
+
+        # A single streamed pass: rows are printed and exported as they arrive, chunk by chunk
+        written = 0
+        for course in export_courses(courses).iterator(chunk_size=chunk_size):
+            if not quiet and short:
                 typer.echo(f"{course.course_title:<50} | {course.school_name:<18}")
-            typer.echo("\n")
-        else:
-            typer.echo("\n📚 Course available at E-HUB")
-            typer.echo("-" * 120)
-            typer.echo(f"{'ID':<5} | {'Title':<50} | {'Category':<18} | {'School':<18} | {'Price':<8}")
-            typer.echo("-" * 120)
-
-            for course in courses:
+            elif not quiet:
                 typer.echo(f"{course.id:<5} | {course.course_title:<50} | {course.category:<18} | {course.school_name:<18} | {course.price:<8}€")
+            if export:
+                export.write(course_record(course))
+                written += 1
+                if written % (chunk_size * 25) == 0:
+                    typer.echo(f"⏳ {written}/{total} courses exported", err=True)
+        if not quiet:
             typer.echo("\n")
-        if save:
-            date_time = datetime.now()
-            json_filename = (f"{date_time}_list_course.json")
-            course_list = []
-            for course in courses:
-                course_list.append({
-                    "id": course.id,
-                    "title": course.course_title,
-                    "category": course.category,
-                    "school": course.school_name,
-                    "description": course.description,
-                    "price": float(course.price),
-                    "available_until": course.available_until.isoformat(),
-                    "post_date": course.post_date.isoformat(),
-                    "user": course.user.username,
-                    "author": course.author,
-                })
-            with open(json_filename, 'w') as f:
-                json.dump(course_list, f, indent=2)
-            typer.echo(f"✅ Json saved to: {json_filename}")
+        if export:
+            export.close()
+            export.stream.close()
+            typer.echo(f"✅ {format.upper()} saved to: {filename} ({written} courses)")
     except Exception as e:
+        if export:
+            export.stream.close()
         typer.echo(f"{e}")
         raise
 
+
+def open_export(filename, format, compress=False):
+    """Open an export writer on `filename`, gzip compressed if asked."""
+    if compress:
+        stream = gzip.open(filename, "wt", encoding="utf-8", newline="")
+    else:
+        stream = open(filename, "w", encoding="utf-8", newline="")
+    writer = WRITERS[format](stream)
+    writer.open()
+    return writer
+
+
+@app.command()
+def import_courses(
+    path: str = typer.Argument(...),
+    format: str = typer.Option("", help="Input format: json, jsonl or csv, guessed from the file name by default"),
+    errors: str = typer.Option("", help="Rejected rows file (Json Lines), defaults to <path>.errors.jsonl"),
+    batch_size: int = BATCH_SIZE,
+):
+    """
+    Import courses from a file, existing ids are updated
+    [CMD: import-courses <path>]
+    """
+    format = format or path.removesuffix(".gz").rpartition(".")[2]
+    if format not in READERS:
+        typer.echo(f"❌ Unknown format {format}, use one of: {', '.join(READERS)}", err=True)
+        raise typer.Exit(1)
+    if not os.path.exists(path):
+        typer.echo(f"❌ File {path} not found!", err=True)
+        raise typer.Exit(1)
+
+    errors = errors or f"{path.removesuffix('.gz')}.errors.jsonl"
+    opener = gzip.open if path.endswith(".gz") else open
+    start = time.perf_counter()
+
+    def progress(imported, rejected):
+        if (imported + rejected) % (batch_size * 25):
+            return
+        seconds = time.perf_counter() - start
+        typer.echo(f"⏳ {imported} courses imported, {rejected} rejected ({(imported + rejected) / seconds:.0f} rows/s)", err=True)
+
+    with opener(path, "rt", encoding="utf-8", newline="") as stream, open(errors, "w", encoding="utf-8") as error_stream:
+        imported, rejected = import_rows(READERS[format](stream), JsonLinesWriter(error_stream), batch_size, progress)
+
+    seconds = time.perf_counter() - start
+    typer.echo(f"✅ {imported} courses imported in {seconds:.1f}s ({(imported + rejected) / seconds:.0f} rows/s)")
+    if rejected:
+        typer.echo(f"⚠️  {rejected} rows rejected, saved to: {errors}")
+    else:
+        os.remove(errors)
+
     
 
 
+@app.command()
+def bulk_users(
+    path: str = typer.Argument(...),
+    group: list[str] = typer.Option([provisioning.STUDENT], help="Group(s) of the rows without a groups column value"),
+    tokens: bool = typer.Option(False, help="Also create an API token for every user"),
+    errors: str = typer.Option("", help="Rejected rows file (Json Lines), defaults to <path>.errors.jsonl"),
+    processes: int = typer.Option(0, help="Password hashing processes, defaults to the number of CPUs"),
+    batch_size: int = provisioning.BATCH_SIZE,
+):
+    """
+    Create users from a CSV file (username, email, password, first_name, last_name, groups)
+    [CMD: bulk-users <path>]
+    """
+    if not os.path.exists(path):
+        typer.echo(f"❌ File {path} not found!", err=True)
+        raise typer.Exit(1)
+
+    errors = errors or f"{path.removesuffix('.gz')}.errors.jsonl"
+    opener = gzip.open if path.endswith(".gz") else open
+    hasher = provisioning.PasswordHasher(processes or None)
+    start = time.perf_counter()
+
+    def progress(created, existing, rejected):
+        seconds = time.perf_counter() - start
+        typer.echo(f"⏳ {created} users created, {existing} already there, {rejected} rejected ({created / seconds:.0f} users/s)", err=True)
+
+    try:
+        with opener(path, "rt", encoding="utf-8", newline="") as stream, open(errors, "w", encoding="utf-8") as error_stream:
+            created, existing, rejected = provisioning.provision_users(
+                provisioning.read_users(stream), JsonLinesWriter(error_stream), hasher, group, tokens, batch_size, progress,
+            )
+    finally:
+        hasher.close()
+
+    seconds = time.perf_counter() - start
+    typer.echo(f"✅ {created} users created in {seconds:.1f}s ({created / seconds:.0f} users/s), {existing} already there")
+    if rejected:
+        typer.echo(f"⚠️  {rejected} rows rejected, saved to: {errors}")
+    else:
+        os.remove(errors)
+
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,6 +85,29 @@ WSGI_APPLICATION = "learning_hub.wsgi.application"
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
 
+def env_flag(name, default="False"):
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
+
+# Connection reuse:
+#   - POSTGRES_POOL uses psycopg's native pool (needs `poetry add "psycopg[binary,pool]"`, psycopg>=3).
+#     "auto" (default) enables it whenever psycopg_pool is installed. This is the option that works
+#     under ASGI: Django handles every ASGI request in its own thread, so per-thread persistent
+#     connections are not reused there. Django requires CONN_MAX_AGE = 0 with a pool.
+#   - POSTGRES_CONN_MAX_AGE keeps a connection open across requests (seconds), for WSGI and
+#     management commands. Leave it at 0 under uvicorn without a pool.
+#   - POSTGRES_CONN_HEALTH_CHECKS pings a reused connection before a request uses it.
+def psycopg_pool_installed():
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+POSTGRES_POOL = os.getenv("POSTGRES_POOL", "auto").lower()
+POSTGRES_POOL = psycopg_pool_installed() if POSTGRES_POOL == "auto" else env_flag("POSTGRES_POOL")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -92,8 +116,115 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
         "HOST": os.getenv("POSTGRES_HOST", "localhost"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": 0 if POSTGRES_POOL else int(os.getenv("POSTGRES_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": env_flag("POSTGRES_CONN_HEALTH_CHECKS", "True"),
+        "OPTIONS": {},
+    }
+}
+
+if POSTGRES_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("POSTGRES_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("POSTGRES_POOL_TIMEOUT", "10")),
+    }
+
+# Read replicas (my_course.replicas): POSTGRES_REPLICAS lists their host[:port], comma separated, with the
+# primary's database, user and password; they become the aliases replica1, replica2... Safe requests of the
+# course and user endpoints read from one of them, drawn by POSTGRES_REPLICA_WEIGHTS (1 each by default)
+# among those answering and at most REPLICA_MAX_LAG_SECONDS behind (checked every REPLICA_HEALTH_INTERVAL
+# seconds). A user's writes pin their reads to the primary for READ_YOUR_WRITES_SECONDS (0 to disable).
+# Under test the replicas mirror `default`: POSTGRES_REPLICAS=localhost stands one in locally.
+POSTGRES_REPLICAS = [address.strip() for address in os.getenv("POSTGRES_REPLICAS", "").split(",") if address.strip()]
+POSTGRES_REPLICA_WEIGHTS = [
+    int(weight) for weight in os.getenv("POSTGRES_REPLICA_WEIGHTS", "").split(",") if weight.strip()
+]
+DATABASE_REPLICAS = {}
+for index, address in enumerate(POSTGRES_REPLICAS, 1):
+    host, _, port = address.partition(":")
+    alias = f"replica{index}"
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    # A replica that is down costs the requests checking it at most this long
+    DATABASES[alias]["OPTIONS"]["connect_timeout"] = int(os.getenv("POSTGRES_REPLICA_CONNECT_TIMEOUT", "2"))
+    DATABASE_REPLICAS[alias] = POSTGRES_REPLICA_WEIGHTS[index - 1] if index <= len(POSTGRES_REPLICA_WEIGHTS) else 1
+
+DATABASE_ROUTERS = ["my_course.replicas.PrimaryReplicaRouter"]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory by default; set a shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+# when running more than one worker so catalog invalidations reach every process. With local memory
+# and several workers, the other workers serve cached anonymous responses up to COURSE_CACHE_TIMEOUT
+# seconds after a write: terraform caps it (backend_unshared_cache_timeout) unless backend_cache_url is set.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "learning-hub"),
     }
 }
+if CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    # Room for one rendered fragment per course (my_course.fragments), locmem keeps 300 entries by default
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("DJANGO_CACHE_MAX_ENTRIES", "50000"))}
+
+COURSE_CACHE_ALIAS = os.getenv("COURSE_CACHE_ALIAS", "default")
+COURSE_CACHE_TIMEOUT = int(os.getenv("COURSE_CACHE_TIMEOUT", "600"))
+# Seconds a rendered course stays in the list fragment cache (my_course.fragments), 0 to disable
+COURSE_FRAGMENT_CACHE_TIMEOUT = int(os.getenv("COURSE_FRAGMENT_CACHE_TIMEOUT", "3600"))
+# Seconds a user's group names stay cached across requests (0: resolved once per request only)
+ROLE_CACHE_TIMEOUT = int(os.getenv("ROLE_CACHE_TIMEOUT", "0"))
+
+# Token -> user resolution (my_course.authentication): in-process LRU size and TTL in seconds,
+# plus an optional shared tier (a CACHES alias, empty to disable) and its timeout.
+# The in-process tier is opt-in (TTL 0: off): a logout, deactivation or group change evicts the token in the
+# worker serving it and in the shared tier only, the other workers would accept their local copy for up to
+# AUTH_TOKEN_CACHE_TTL seconds. Set it with a single worker, or where that revocation window is acceptable.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "0"))
+AUTH_TOKEN_CACHE_ALIAS = os.getenv("AUTH_TOKEN_CACHE_ALIAS", "")
+AUTH_TOKEN_SHARED_CACHE_TIMEOUT = int(os.getenv("AUTH_TOKEN_SHARED_CACHE_TIMEOUT", "300"))
+
+
+# Response compression (my_course.compression) of the API's JSON, NDJSON and CSV responses to GET, negotiated
+# with Accept-Encoding: brotli (needs `poetry add brotli`, skipped when missing) and gzip, in
+# COMPRESSION_ENCODINGS order. Bodies under COMPRESSION_MIN_SIZE bytes are sent as they are; streamed exports
+# are compressed chunk by chunk. Brotli quality 4-5 is the usual trade-off for dynamic responses.
+def brotli_installed():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+COMPRESSION_ENABLED = env_flag("COMPRESSION_ENABLED", "True")
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if encoding.strip()
+]
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+if COMPRESSION_ENABLED:
+    MIDDLEWARE.insert(0, "my_course.compression.CompressionMiddleware")
+
+
+# Request metrics (my_course.metrics), scraped at /metrics in the Prometheus text format.
+# METRICS_SLOW_REQUEST_MS > 0 logs slower requests with their SQL; METRICS_TOKEN protects /metrics.
+METRICS_ENABLED = env_flag("METRICS_ENABLED", "True")
+METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "0"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if METRICS_ENABLED:
+    # Outermost, so the other middleware (compression included) are part of the timing and sizes
+    MIDDLEWARE.insert(0, "my_course.metrics.MetricsMiddleware")
 
 
 # Password validation
@@ -115,6 +246,62 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (my_course.hashers)
+# PASSWORD_HASHER picks the hasher of new passwords: argon2 (needs `poetry add argon2-cffi`), scrypt or
+# pbkdf2. "auto" (default) is argon2 when argon2-cffi is installed, scrypt otherwise. The other hashers
+# still verify existing hashes, which are upgraded on the next successful login, as are hashes made with
+# other cost parameters. Hashing runs on PASSWORD_HASH_WORKERS threads (default: half the CPUs).
+def argon2_installed():
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+HASHERS = {
+    "argon2": "my_course.hashers.Argon2PasswordHasher",
+    "scrypt": "my_course.hashers.ScryptPasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "auto").lower()
+PASSWORD_HASHER = ("argon2" if argon2_installed() else "scrypt") if PASSWORD_HASHER == "auto" else PASSWORD_HASHER
+PASSWORD_HASHERS = [HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in HASHERS.items() if name != PASSWORD_HASHER
+] + ["django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher"]
+
+# Argon2id: passes, memory in KiB and lanes; scrypt: n, r and p (memory is 128 * n * r bytes)
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "19456"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", str(2 ** 14)))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv("PASSWORD_SCRYPT_BLOCK_SIZE", "8"))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv("PASSWORD_SCRYPT_PARALLELISM", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+# Abuse and overload protection (my_course.throttling)
+# THROTTLE_<SCOPE>_RATE: token bucket per client (user, else IP) of login, signup and enroll/unenroll,
+# "<capacity>/<period>" (s, min, hour, day): the bucket holds `capacity` requests and refills at that rate,
+# empty for no limit. Buckets are in the course cache, shared between workers with Redis.
+# LOAD_SHED_MAX_EXPENSIVE / LOAD_SHED_MAX_IN_FLIGHT: concurrent login/signup/enroll requests, and requests
+# of any kind, per process past which a request gets a 503 with Retry-After: LOAD_SHED_RETRY_AFTER seconds
+# (0 for no limit). Logins and signups only use PASSWORD_HASH_WORKERS threads, more of them only queue.
+THROTTLE_RATES = {
+    scope: os.getenv(f"THROTTLE_{scope.upper()}_RATE", default)
+    for scope, default in [("login", "20/min"), ("signup", "10/min"), ("enroll", "30/min")]
+}
+LOAD_SHED_ENABLED = env_flag("LOAD_SHED_ENABLED", "True")
+LOAD_SHED_MAX_EXPENSIVE = int(os.getenv("LOAD_SHED_MAX_EXPENSIVE", str(PASSWORD_HASH_WORKERS * 4)))
+LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "256"))
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", "1"))
+if LOAD_SHED_ENABLED:
+    # Inside metrics and compression, ahead of everything that costs (sessions, authentication)
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware"), "my_course.throttling.LoadSheddingMiddleware"
+    )
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -145,12 +332,48 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGIN_REDIRECT_URL = '/course'
 
 LOGOUT_REDIRECT_URL = '/'
+
+
+# API JSON (my_course.renderers): API_JSON = orjson (needs `poetry add orjson`) or json (DRF's encoder and
+# parser). "auto" (default) is orjson when it is installed. Both write the same bytes.
+def orjson_installed():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+JSON_CLASSES = {
+    "orjson": ("my_course.renderers.ORJSONRenderer", "my_course.renderers.ORJSONParser"),
+    "json": ("my_course.renderers.FragmentJSONRenderer", "rest_framework.parsers.JSONParser"),
+}
+API_JSON = os.getenv("API_JSON", "auto").lower()
+API_JSON = ("orjson" if orjson_installed() else "json") if API_JSON == "auto" else API_JSON
+JSON_RENDERER, JSON_PARSER = JSON_CLASSES[API_JSON]
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'my_course.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # JSON renderers also assemble course lists from cached fragments (my_course.fragments)
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Keyset pagination ordered by (post_date, id); override the size per request with ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'my_course.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv("API_PAGE_SIZE", "50")),
+    # Reverse proxies in front of the API: throttles read the client IP from X-Forwarded-For at this depth.
+    # 0 uses the socket address, X-Forwarded-For being the client's to forge; set it behind nginx (terraform: 1)
+    'NUM_PROXIES': int(os.getenv("API_NUM_PROXIES", "0")),
 }
\ No newline at end of file
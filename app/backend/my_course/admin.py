@@ -23,7 +23,17 @@ class CourseAdmin(admin.ModelAdmin):
         logger.warning(f"Course deleted - {obj.course_title}{request.user}")
 
 
+class CategoryAdmin(admin.ModelAdmin):
+    # Maintained from the courses (see categories.py), read only here
+    list_display = ("id", "name", "course_count", "update_date")
+    search_fields = ("name",)
 
+    def has_add_permission(self, request):
+        return False
 
+    def has_change_permission(self, request, obj=None):
+        return False
 
-admin.site.register(Course, CourseAdmin)
\ No newline at end of file
+
+admin.site.register(Course, CourseAdmin)
+admin.site.register(Category, CategoryAdmin)
\ No newline at end of file
@@ -1,16 +1,40 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User, Group
-from django.shortcuts import get_object_or_404
-from my_course.models import Course
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from my_course.cache import cache_anonymous_response
+from my_course.conditional import catalog_validator, conditional_course_response
+from my_course.enrollment import Enrollment, batches, enroll_users, unenroll_users
+from my_course.export import (
+    COURSE_COLUMNS,
+    COURSE_FIELDS,
+    ENROLLMENT_FIELDS,
+    CSVRenderer,
+    ExportStream,
+    NDJSONRenderer,
+    course_values,
+    enrollment_values
+)
+from my_course.fragments import STAMP_COLUMNS, course_fragments
+from my_course.fragments import enabled as fragments_enabled
+from my_course.hashers import dummy_hash, verify_password
+from my_course.models import Category, Course
+from my_course.pagination import COURSE_ORDERINGS, ROSTER_ORDERING, SEARCH_ORDERING
+from my_course.renderers import FragmentJSONRenderer
+from my_course.replicas import ReplicaReadMixin, pin_to_primary
+from my_course.roles import is_admin, is_mentor
 from my_course.serializers import (
     UserSerializer, 
     UserCreateSerializer, 
     CourseSerializer,
-    CourseDetailSerializer
+    CourseDetailSerializer,
+    BulkEnrollmentSerializer
 )
+from my_course.throttling import EnrollThrottle, LoginThrottle, SignupThrottle, shed_under_load
 import logging
 
 
@@ -18,12 +42,23 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def category_id_param(params):
+    """?category_id= of the course lists, None when absent."""
+    value = params.get('category_id')
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({'category_id': 'A valid integer is required.'})
+
+
 class IsMentorOrReadOnly(permissions.BasePermission):
     """Only mentors can create/update courses."""
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return request.user and request.user.is_authenticated and request.user.groups.filter(name='Mentor').exists()
+        return request.user and request.user.is_authenticated and is_mentor(request)
 
 
 class IsOwnerMentorOrAdmin(permissions.BasePermission):
@@ -33,28 +68,36 @@ class IsOwnerMentorOrAdmin(permissions.BasePermission):
             return True
         
         # Admins can do anything
-        if request.user and request.user.is_superuser:
+        if is_admin(request):
             return True
         
         # Mentors can only modify their own courses (compare by ID)
-        if request.user and request.user.groups.filter(name='Mentor').exists():
+        if is_mentor(request):
             return obj.user_id == request.user.id
         
         return False
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class IsAdmin(permissions.BasePermission):
+    """Admins (superusers) only."""
+    def has_permission(self, request, view):
+        return is_admin(request)
+
+
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """API endpoint for user management and authentication."""
     
     queryset = User.objects.all()
     permission_classes = [permissions.AllowAny]
+    keyset_ordering = ('-date_joined', '-id')
     
     def get_serializer_class(self):
         if self.action == 'create':
             return UserCreateSerializer
         return UserSerializer
     
-    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny], throttle_classes=[SignupThrottle])
+    @shed_under_load
     def signup(self, request):
         """Register a new user."""
         serializer = UserCreateSerializer(data=request.data)
@@ -65,6 +108,7 @@ class UserViewSet(viewsets.ModelViewSet):
             user.groups.add(student_group)
             
             token, _ = Token.objects.get_or_create(user=user)
+            pin_to_primary(user)
             logger.info(f"New user registered: {user.username}")
             return Response({
                 'user': UserSerializer(user).data,
@@ -72,7 +116,8 @@ class UserViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny], throttle_classes=[LoginThrottle])
+    @shed_under_load
     def login(self, request):
         """Login user and return authentication token."""
         username = request.data.get('username')
@@ -84,9 +129,13 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user = get_object_or_404(User, username=username)
-        if user.check_password(password):
+        # Unknown usernames get the same hashing cost and answer as a wrong password
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            dummy_hash(password)
+        elif verify_password(user, password):
             token, _ = Token.objects.get_or_create(user=user)
+            pin_to_primary(user)
             logger.info(f"User logged in: {username}")
             return Response({
                 'user': UserSerializer(user).data,
@@ -112,7 +161,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """API endpoint for course management."""
     
     queryset = Course.objects.all()
@@ -120,7 +169,7 @@ class CourseViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Set permission classes based on action."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'bulk_enrollment']:
             return [permissions.IsAuthenticated(), IsOwnerMentorOrAdmin()]
         elif self.action in ['enroll', 'unenroll', 'my_enrollments', 'my_courses']:
             return [permissions.IsAuthenticated()]
@@ -133,79 +182,208 @@ class CourseViewSet(viewsets.ModelViewSet):
         return CourseSerializer
     
     def get_queryset(self):
-        """Filter courses by category if provided."""
-        queryset = Course.objects.all()
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category__iexact=category)
-        return queryset
+        """Filter courses by category (?category=, ?category_id=) and full-text search (?q=), ordered by ?ordering= if provided."""
+        if self.action in ['enroll', 'unenroll', 'bulk_enrollment', 'students']:
+            # Enrollment writes and the roster only need the course row
+            return Course.objects.all()
+        # Joins, subqueries, prefetches and columns of the fields rendered (?fields=, ?omit=)
+        queryset = self.get_serializer().listing(Course.objects.all(), self.request.user)
+        return self.filter_catalog(queryset)
+    
+    def filter_catalog(self, queryset):
+        params = self.request.query_params
+        terms = params.get('q', '').strip() if self.action == 'list' else ''
+        if params.get('ordering') in COURSE_ORDERINGS:
+            # e.g. ?ordering=-enrolled_count, most popular first
+            self.keyset_ordering = COURSE_ORDERINGS[params['ordering']]
+        elif terms:
+            # Ranked by relevance; the rank becomes the leading keyset column
+            self.keyset_ordering = SEARCH_ORDERING
+        return queryset.filter_catalog(params.get('category'), terms, category_id_param(params))
+    
+    def _list_validators(self, request, *args, **kwargs):
+        return catalog_validator(self.filter_catalog(Course.objects.all())), None
+    
+    def _detail_validators(self, request, pk=None, **kwargs):
+        try:
+            update_date = Course.objects.filter(pk=pk).values_list('update_date', flat=True).first()
+        except (TypeError, ValueError):
+            return None
+        if update_date is None:
+            return None
+        return update_date.isoformat(), update_date
+    
+    def _categories_validators(self, request, *args, **kwargs):
+        # Every course count change moves its category's update_date
+        return catalog_validator(Category.objects.all()), None
+    
+    def paginated_courses(self, queryset):
+        """
+        A page of `queryset` (a CourseSerializer listing) as JSON assembled from the course fragment cache,
+        or serialized row by row for sparse fieldsets, other renderers or with the cache off.
+        """
+        context = self.get_serializer_context()
+        if (
+            CourseSerializer(context=context).sparse
+            or not fragments_enabled()
+            or not isinstance(self.request.accepted_renderer, FragmentJSONRenderer)
+        ):
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(CourseSerializer(page, many=True, context=context).data)
+        page = self.paginate_queryset(queryset.select_related(None).only(*STAMP_COLUMNS))
+        return self.get_paginated_response(course_fragments(page, queryset, CourseSerializer, context))
+    
+    @conditional_course_response('list', _list_validators)
+    @cache_anonymous_response('list')
+    def list(self, request, *args, **kwargs):
+        return self.paginated_courses(self.filter_queryset(self.get_queryset()))
+    
+    @conditional_course_response('retrieve', _detail_validators)
+    @cache_anonymous_response('retrieve')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         """Set the course creator to current user (must be mentor)."""
-        if self.request.user.groups.filter(name='Mentor').exists() or self.request.user.is_superuser:
+        if is_mentor(self.request) or is_admin(self.request):
             serializer.save(user=self.request.user)
             logger.info(f"Course created by {self.request.user.username}: {serializer.instance.course_title}")
         else:
-            raise permissions.PermissionDenied("Only mentors can create courses")
+            raise PermissionDenied("Only mentors can create courses")
     
     def perform_destroy(self, instance):
         """Only admins or mentor owner can delete courses."""
         if instance.user_id == self.request.user.id:
             logger.info(f"Course deleted by {self.request.user.username}: {instance.course_title}")
             instance.delete()
-        elif self.request.user.is_superuser:
+        elif is_admin(self.request):
             logger.info(f"Course deleted by admin {self.request.user.username}: {instance.course_title}")
             instance.delete()
         else:
-            raise permissions.PermissionDenied("You can only delete your own courses")
+            raise PermissionDenied("You can only delete your own courses")
     
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated], throttle_classes=[EnrollThrottle])
+    @shed_under_load
     def enroll(self, request, pk=None):
         """Enroll current user to a course."""
         course = self.get_object()
-        if request.user not in course.students.all():
-            course.students.add(request.user)
+        if enroll_users(course, [request.user.pk]):
             logger.info(f"{request.user.username} enrolled to {course.course_title}")
-            return Response({'message': 'Enrolled successfully'}, status=status.HTTP_200_OK)
+            return Response({'message': 'Enrolled successfully', 'changed': True}, status=status.HTTP_200_OK)
         return Response(
-            {'message': 'Already enrolled'},
+            {'message': 'Already enrolled', 'changed': False},
             status=status.HTTP_200_OK
         )
     
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated], throttle_classes=[EnrollThrottle])
+    @shed_under_load
     def unenroll(self, request, pk=None):
         """Unenroll current user from a course."""
         course = self.get_object()
-        if request.user in course.students.all():
-            course.students.remove(request.user)
+        if unenroll_users(course, [request.user.pk]):
             logger.info(f"{request.user.username} unenrolled from {course.course_title}")
-            return Response({'message': 'Unenrolled successfully'}, status=status.HTTP_200_OK)
+            return Response({'message': 'Unenrolled successfully', 'changed': True}, status=status.HTTP_200_OK)
         return Response(
-            {'message': 'Not enrolled'},
+            {'message': 'Not enrolled', 'changed': False},
             status=status.HTTP_200_OK
         )
     
+    @action(detail=True, methods=['post'], url_path='bulk_enrollment')
+    def bulk_enrollment(self, request, pk=None):
+        """Enroll or unenroll many users at once (course mentor or admin)."""
+        course = self.get_object()
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        known_ids, known_names = set(), {}
+        for batch in batches(data['user_ids']):
+            known_ids.update(User.objects.filter(pk__in=batch).values_list('pk', flat=True))
+        for batch in batches(data['usernames']):
+            known_names.update(User.objects.filter(username__in=batch).values_list('username', 'pk'))
+        user_ids = known_ids | set(known_names.values())
+        
+        apply = enroll_users if data['action'] == 'enroll' else unenroll_users
+        changed = apply(course, user_ids)
+        logger.info(f"{request.user.username} bulk {data['action']}: {len(changed)} users changed on {course.course_title}")
+        return Response({
+            'action': data['action'],
+            'changed': len(changed),
+            'unchanged': len(user_ids) - len(changed),
+            'unknown_user_ids': sorted(set(data['user_ids']) - known_ids),
+            'unknown_usernames': sorted(set(data['usernames']) - known_names.keys()),
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['get'])
+    @conditional_course_response('students', _detail_validators)
+    @cache_anonymous_response('students')
+    def students(self, request, pk=None):
+        """Students enrolled in a course by username, keyset paginated, filtered with ?search=."""
+        course = self.get_object()
+        students = User.objects.filter(enrolled_courses=course).prefetch_related('groups')
+        search = request.query_params.get('search', '').strip()
+        if search:
+            students = students.filter(username__icontains=search)
+        self.keyset_ordering = ROSTER_ORDERING
+        page = self.paginate_queryset(students)
+        serializer = UserSerializer(page, many=True, context={'request': request})
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_enrollments(self, request):
         """Get courses user is enrolled in."""
-        enrolled_courses = request.user.enrolled_courses.all()
-        serializer = CourseSerializer(enrolled_courses, many=True, context={'request': request})
-        return Response(serializer.data)
+        serializer = CourseSerializer(context={'request': request})
+        enrolled_courses = serializer.listing(Course.objects.filter(students=request.user), request.user)
+        return self.paginated_courses(enrolled_courses)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_courses(self, request):
         """Get courses created by current user (mentor only)."""
-        if request.user.groups.filter(name='Mentor').exists():
-            mentor_courses = Course.objects.filter(user=request.user)
-            serializer = CourseDetailSerializer(mentor_courses, many=True, context={'request': request})
-            return Response(serializer.data)
+        if is_mentor(request):
+            serializer = CourseDetailSerializer(context={'request': request})
+            mentor_courses = serializer.listing(Course.objects.filter(user=request.user), request.user)
+            page = self.paginate_queryset(mentor_courses)
+            serializer = CourseDetailSerializer(page, many=True, context={'request': request})
+            return self.get_paginated_response(serializer.data)
         return Response(
             {'error': 'Only mentors have courses'},
             status=status.HTTP_403_FORBIDDEN
         )
     
     @action(detail=False, methods=['get'])
+    @conditional_course_response('categories', _categories_validators)
+    @cache_anonymous_response('categories')
     def categories(self, request):
-        """Get all available course categories."""
-        categories = Course.objects.values_list('category', flat=True).distinct()
+        """Get all course categories with their number of courses (filter the list with ?category_id=)."""
+        categories = Category.objects.filter(course_count__gt=0).values('id', 'name', 'course_count')
         return Response({'categories': list(categories)})
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """Streamed bulk exports for analytics jobs (admins only), as NDJSON (default) or CSV."""
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    chunk_size = 2000
+    
+    def stream(self, request, name, queryset, columns, to_record, fields):
+        renderer = request.accepted_renderer
+        stream = ExportStream(queryset, columns, to_record, renderer.writer_class, fields, self.chunk_size)
+        # Async iteration under ASGI, Django would otherwise load a sync iterator whole before sending it
+        content = aiter(stream) if isinstance(request._request, ASGIRequest) else iter(stream)
+        response = StreamingHttpResponse(content, content_type=f"{renderer.media_type}; charset=utf-8")
+        response['Content-Disposition'] = f'attachment; filename="{name}.{renderer.format}"'
+        logger.info(f"{request.user.username} exported {name} as {renderer.format}")
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def courses(self, request):
+        """Every course, with its owner's username."""
+        queryset = Course.objects.order_by('id')
+        return self.stream(request, 'courses', queryset, COURSE_COLUMNS.values(), course_values, COURSE_FIELDS)
+    
+    @action(detail=False, methods=['get'])
+    def enrollments(self, request):
+        """Every (course_id, user_id) enrollment pair."""
+        queryset = Enrollment.objects.order_by('course_id', 'user_id')
+        return self.stream(request, 'enrollments', queryset, ENROLLMENT_FIELDS, enrollment_values, ENROLLMENT_FIELDS)
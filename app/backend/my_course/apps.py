@@ -13,4 +13,6 @@ class MyCourseConfig(AppConfig):
     name = "my_course"
 
     def ready(self):
+        from my_course import signals  # noqa: F401 - registers the cache invalidation handlers
+        from my_course import metrics  # noqa: F401 - installs the SQL recorder on new connections
         logger.info("APP started")
\ No newline at end of file
@@ -0,0 +1,123 @@
+from functools import wraps
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound, ValidationError
+from my_course.api_views import category_id_param
+from my_course.models import Category, Course
+from my_course.pagination import COURSE_ORDERINGS, SEARCH_ORDERING, KeysetPagination
+from my_course.renderers import json_renderer
+from my_course.serializers import CourseDetailSerializer, CourseSerializer
+import logging
+
+"""
+Async-native read endpoints for the ASGI deployment (/api/async/...).
+They mirror the payloads of CourseViewSet's list, retrieve, categories and my_enrollments, but run on the
+    event loop: rows are fetched with Django's async ORM and a waiting request holds no worker thread.
+Serializers only read annotated/prefetched attributes here, any lazy query would raise SynchronousOnlyOperation.
+Writes, caching and conditional GETs stay on the DRF endpoints under /api/courses/.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(json_renderer().render(data), status=status_code, content_type="application/json")
+
+
+async def authenticate(request):
+    """Async counterpart of DRF's TokenAuthentication. Returns None when the token is invalid."""
+    header = request.headers.get("Authorization", "").split()
+    if not header or header[0].lower() != "token":
+        return AnonymousUser()
+    if len(header) != 2:
+        return None
+    try:
+        token = await Token.objects.select_related("user").aget(key=header[1])
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    return token.user
+
+
+def authenticated(view):
+    """Resolve request.user from the token; invalid tokens get a 401 like the DRF views."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await authenticate(request)
+        if user is None:
+            return json_response({"detail": "Invalid token."}, status.HTTP_401_UNAUTHORIZED)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def sparse_listing(request, serializer_class, queryset):
+    """serializer_class.listing() of `queryset` for the request's ?fields=/?omit=; raises ValidationError."""
+    return serializer_class(context={"request": request}).listing(queryset, request.user)
+
+
+async def paginated_courses(request, queryset, ordering=None):
+    paginator = KeysetPagination()
+    if ordering:
+        paginator.ordering = ordering
+    try:
+        page = await paginator.apaginate_queryset(sparse_listing(request, CourseSerializer, queryset), request)
+    except NotFound as e:
+        return json_response({"detail": str(e.detail)}, status.HTTP_404_NOT_FOUND)
+    except ValidationError as e:
+        return json_response(e.detail, status.HTTP_400_BAD_REQUEST)
+    serializer = CourseSerializer(page, many=True, context={"request": request})
+    return json_response(paginator.get_paginated_data(serializer.data))
+
+
+@require_GET
+@authenticated
+async def course_list(request):
+    """Async list of courses, with the same ?category=, ?category_id=, ?q=, ?ordering= and cursor parameters as /api/courses/."""
+    terms = request.GET.get("q", "").strip()
+    try:
+        category_id = category_id_param(request.GET)
+    except ValidationError as e:
+        return json_response(e.detail, status.HTTP_400_BAD_REQUEST)
+    queryset = Course.objects.filter_catalog(request.GET.get("category"), terms, category_id)
+    ordering = COURSE_ORDERINGS.get(request.GET.get("ordering")) or (SEARCH_ORDERING if terms else None)
+    return await paginated_courses(request, queryset, ordering)
+
+
+@require_GET
+@authenticated
+async def course_detail(request, pk):
+    """Async course detail, students and their groups prefetched."""
+    try:
+        course = await sparse_listing(request, CourseDetailSerializer, Course.objects.all()).aget(pk=pk)
+    except ValidationError as e:
+        return json_response(e.detail, status.HTTP_400_BAD_REQUEST)
+    except Course.DoesNotExist:
+        return json_response({"detail": "No Course matches the given query."}, status.HTTP_404_NOT_FOUND)
+    return json_response(CourseDetailSerializer(course, context={"request": request}).data)
+
+
+@require_GET
+@authenticated
+async def course_categories(request):
+    """Async list of the course categories with their number of courses."""
+    queryset = Category.objects.filter(course_count__gt=0).values("id", "name", "course_count")
+    categories = [category async for category in queryset]
+    return json_response({"categories": categories})
+
+
+@require_GET
+@authenticated
+async def my_enrollments(request):
+    """Async list of the courses the current user is enrolled in."""
+    if not request.user.is_authenticated:
+        return json_response(
+            {"detail": "Authentication credentials were not provided."}, status.HTTP_401_UNAUTHORIZED
+        )
+    queryset = Course.objects.filter(students=request.user)
+    return await paginated_courses(request, queryset)
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from threading import Lock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+import logging
+import time
+
+"""
+Token authentication with the token -> user resolution cached.
+DRF's TokenAuthentication joins Token and User on every authenticated request; here the user's fields
+    and group names are kept in two tiers:
+    - an opt-in bounded in-process LRU whose entries expire after AUTH_TOKEN_CACHE_TTL seconds (0: off),
+    - an optional shared cache (AUTH_TOKEN_CACHE_ALIAS), read on a local miss.
+A hit rebuilds a fresh User without touching the database; the password hash is never cached and is
+    loaded on demand if something needs it.
+Signals (see signals.py) evict entries when a token is deleted (logout, user deletion), a user is saved
+    or their groups change. Eviction reaches this process and the shared tier at once, not the local tier of
+    other processes: that tier is off by default so a revoked token is refused by every worker right away.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+USER_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != "password"]
+
+
+class TokenCache:
+    """Thread-safe LRU of token key -> cached entry, bounded to `maxsize` entries living `ttl` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def pop_users(self, user_ids):
+        with self.lock:
+            for key in [key for key, (_, entry) in self.entries.items() if entry["user"]["id"] in user_ids]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+local_tokens = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def shared_tokens():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS] if settings.AUTH_TOKEN_CACHE_ALIAS else None
+
+
+def shared_key(key):
+    return f"course-api:token:{key}"
+
+
+def lookup_token(key):
+    entry = local_tokens.get(key)
+    if entry is None and (shared := shared_tokens()) is not None:
+        entry = shared.get(shared_key(key))
+        if entry is not None:
+            local_tokens.set(key, entry)
+    return entry
+
+
+def store_token(key, entry):
+    local_tokens.set(key, entry)
+    if (shared := shared_tokens()) is not None:
+        shared.set(shared_key(key), entry, settings.AUTH_TOKEN_SHARED_CACHE_TIMEOUT)
+
+
+def evict_tokens(keys):
+    for key in keys:
+        local_tokens.pop(key)
+    if keys and (shared := shared_tokens()) is not None:
+        shared.delete_many([shared_key(key) for key in keys])
+
+
+def evict_users(user_ids):
+    """Evict every cached token of `user_ids`."""
+    from rest_framework.authtoken.models import Token
+
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    local_tokens.pop_users(user_ids)
+    if shared_tokens() is not None:
+        evict_tokens(list(Token.objects.filter(user_id__in=user_ids).values_list("key", flat=True)))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication answering from the token cache, the database is only read on a miss.
+    A revoked token (logout, deactivated user, changed groups) is refused at once by every worker, unless
+        the local tier is turned on: other workers then accept it for up to AUTH_TOKEN_CACHE_TTL seconds more.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = lookup_token(key)
+        if entry is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related("user").get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            entry = {
+                "user": {name: getattr(token.user, name) for name in USER_FIELDS},
+                "roles": frozenset(token.user.groups.values_list("name", flat=True)),
+                "created": token.created,
+            }
+            store_token(key, entry)
+
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, [entry["user"][name] for name in USER_FIELDS])
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        # Read by my_course.roles, the permission checks need no group query either
+        user._role_names = entry["roles"]
+
+        token = self.get_model().from_db(DEFAULT_DB_ALIAS, ["key", "user_id", "created"], [key, user.pk, entry["created"]])
+        token.user = user  # also caches user.auth_token, used by logout
+        return (user, token)
@@ -0,0 +1,98 @@
+from functools import wraps
+from hashlib import md5
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+import logging
+import time
+
+"""
+Versioned response cache for the anonymous catalog endpoints.
+Every key embeds the current catalog version. Signals (see signals.py) bump that version whenever a
+    course or an enrollment changes, so stale entries are never read again and simply age out.
+The default local-memory backend is per process: with several workers or pods point
+    DJANGO_CACHE_BACKEND at a shared backend (Redis, Memcached) so a bump reaches every worker.
+Only reads from the primary are stored: a replica lagging behind a write would file the catalog before
+    it under the version that write bumped (see replicas.py).
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "course-api:catalog-version"
+
+
+def get_cache():
+    return caches[settings.COURSE_CACHE_ALIAS]
+
+
+def cache_is_shared():
+    """Whether the course cache is shared between workers, so a version bump reaches all of them."""
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def get_catalog_version():
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so a lost/evicted counter never restarts on a version already used
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    cache = get_cache()
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+        return cache.get(CATALOG_VERSION_KEY)
+
+
+def reading_from_primary():
+    # Imported here, replicas.py reads its pins through this module
+    from my_course.replicas import read_alias
+
+    return read_alias.get() is None
+
+
+def response_cache_key(endpoint, request):
+    # The absolute URI covers the query string (filters, cursor) and the host used in pagination links
+    digest = md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"course-api:{get_catalog_version()}:{endpoint}:{digest}"
+
+
+def cached_for_request(name, request, compute):
+    """Memoize `compute()` for this request URI and catalog version; None results and replica reads are not stored."""
+    cache = get_cache()
+    key = response_cache_key(name, request)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None and reading_from_primary():
+            cache.set(key, value, settings.COURSE_CACHE_TIMEOUT)
+    return value
+
+
+def cache_anonymous_response(endpoint):
+    """Serve a viewset action from the cache for anonymous users; authenticated responses are per user."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            key = response_cache_key(endpoint, request)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200 and reading_from_primary():
+                cache.set(key, response.data, settings.COURSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
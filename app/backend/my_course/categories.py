@@ -0,0 +1,104 @@
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from my_course.cache import bump_catalog_version
+from my_course.models import Category, Course
+import re
+
+"""
+Category index: one Category row per normalized course category, with its live course count.
+Course.category stays the free text typed by mentors; its key (whitespace collapsed, lower case) picks the
+    Category, named after the first spelling seen. Course.category_ref points at it.
+Course saves and deletions move the counts through signals.py (an F() update, no lost update under
+    concurrency). Bulk writes around the ORM (import-courses, benchmark seeds) call sync_categories(),
+    which also backs `manage.py sync_categories`.
+The SQL key below must stay the same as category_key(): rows written by either are matched by the other.
+Relinked courses get a new `update_date` and the catalog version is bumped: their category_id is part of
+    the cached fragments, responses and ETags.
+"""
+
+WHITESPACE = re.compile(r"[ \t\n\r\f\v]+")
+
+SQL_NAME = "btrim(regexp_replace({column}, '[ \\t\\n\\r\\f\\v]+', ' ', 'g'))"
+SQL_KEY = f"lower({SQL_NAME})"
+
+CATEGORY_TABLE = Category._meta.db_table
+COURSE_TABLE = Course._meta.db_table
+
+CREATE_SQL = (
+    f"INSERT INTO {CATEGORY_TABLE} (key, name, course_count, update_date) "
+    f"SELECT key, MIN(name), 0, NOW() FROM ("
+    f"SELECT {SQL_KEY.format(column='category')} AS key, {SQL_NAME.format(column='category')} AS name "
+    f"FROM {COURSE_TABLE} WHERE %s::bigint[] IS NULL OR id = ANY(%s)"
+    f") AS named WHERE key <> '' GROUP BY key ON CONFLICT (key) DO NOTHING"
+)
+# `previous` is the row before this UPDATE, its category_id is the one being replaced. clock_timestamp(), not
+# NOW(): the transaction start would predate the update_date Django stamped on courses written in it
+LINK_SQL = (
+    f"UPDATE {COURSE_TABLE} AS course SET category_id = category.id, update_date = clock_timestamp() "
+    f"FROM {CATEGORY_TABLE} AS category, {COURSE_TABLE} AS previous "
+    f"WHERE previous.id = course.id AND category.key = {SQL_KEY.format(column='course.category')} "
+    f"AND course.category_id IS DISTINCT FROM category.id AND (%s::bigint[] IS NULL OR course.id = ANY(%s)) "
+    f"RETURNING previous.category_id, category.id"
+)
+RECOUNT_SQL = (
+    f"UPDATE {CATEGORY_TABLE} AS category SET course_count = counted.total, update_date = NOW() "
+    f"FROM (SELECT id, (SELECT COUNT(*) FROM {COURSE_TABLE} WHERE category_id = c.id) AS total "
+    f"FROM {CATEGORY_TABLE} AS c WHERE c.id = ANY(%s)) AS counted "
+    f"WHERE category.id = counted.id AND category.course_count <> counted.total RETURNING category.id"
+)
+
+
+def category_name(text):
+    return WHITESPACE.sub(" ", text or "").strip(" ")
+
+
+def category_key(text):
+    return category_name(text).lower()
+
+
+def resolve_category(text, using=None):
+    """Id of the Category of a course category text, created on first use; None when blank."""
+    key = category_key(text)
+    if not key:
+        return None
+    category, _ = Category.objects.using(using).get_or_create(key=key, defaults={"name": category_name(text)})
+    return category.pk
+
+
+def count_courses(category_id, delta, using=None):
+    """Move course_count of a category by `delta` (negative for removals)."""
+    if category_id is not None:
+        Category.objects.using(using).filter(pk=category_id).update(
+            course_count=F("course_count") + delta, update_date=timezone.now()
+        )
+
+
+def recount_categories(category_ids, using=None):
+    """Recompute course_count of `category_ids` from the course table; returns the ids that were off."""
+    using = using or router.db_for_write(Category)
+    with connections[using].cursor() as cursor:
+        cursor.execute(RECOUNT_SQL, [list(category_ids)])
+        return {category_id for category_id, in cursor.fetchall()}
+
+
+def sync_categories(course_ids=None, using=None):
+    """
+    Link courses (all of them, or `course_ids`) to their Category and recount the categories involved.
+    Returns the number of courses that changed category.
+    """
+    using = using or router.db_for_write(Course)
+    course_ids = None if course_ids is None else list(course_ids)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(CREATE_SQL, [course_ids, course_ids])
+        cursor.execute(LINK_SQL, [course_ids, course_ids])
+        moved = cursor.fetchall()
+        if course_ids is None:
+            touched = Category.objects.using(using).values_list("id", flat=True)
+        else:
+            touched = {category_id for pair in moved for category_id in pair if category_id is not None}
+        recount_categories(touched, using)
+        if moved:
+            bump_catalog_version()
+            transaction.on_commit(bump_catalog_version, using=using)
+    return len(moved)
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional, `poetry add brotli`
+    brotli = None
+
+"""
+Response compression negotiated with Accept-Encoding: brotli (when installed) or gzip, in COMPRESSION_ENCODINGS
+    order unless the client's q-values say otherwise.
+Only the API's text formats are compressed (JSON, NDJSON, CSV, plain text), and only for GET and HEAD: HTML
+    pages and POST responses (login returns a token) carry secrets next to user input, which is what BREACH
+    needs. Bodies under COMPRESSION_MIN_SIZE bytes go as they are, the headers would eat the saving.
+Streamed responses (the exports) are compressed chunk by chunk, sync or async, each chunk flushed so the
+    client keeps receiving rows as they are read.
+Vary: Accept-Encoding is set on every compressible response, compressed or not, for caches in front of us.
+"""
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain")
+
+
+def accepted_encodings(header):
+    """{encoding: q-value} of an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(","):
+        name, *params = item.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(header, encodings):
+    """The encoding of `encodings` (by preference) the client wants most, None for none of them."""
+    accepted = accepted_encodings(header)
+    chosen, best = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best:
+            chosen, best = encoding, q
+    return chosen
+
+
+def available_encodings():
+    return [encoding for encoding in settings.COMPRESSION_ENCODINGS if encoding == "gzip" or (encoding == "br" and brotli)]
+
+
+class Compressor:
+    """Incremental gzip or brotli stream: `compress()` each chunk, then `finish()`."""
+
+    def __init__(self, encoding):
+        self.brotli = encoding == "br"
+        if self.brotli:
+            self.engine = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            # wbits 31: gzip container (header and CRC), not raw deflate
+            self.engine = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk, flush=False):
+        if self.brotli:
+            data = self.engine.process(chunk)
+            return data + self.engine.flush() if flush else data
+        data = self.engine.compress(chunk)
+        return data + self.engine.flush(zlib.Z_SYNC_FLUSH) if flush else data
+
+    def finish(self):
+        return self.engine.finish() if self.brotli else self.engine.flush()
+
+
+def compress(content, encoding):
+    compressor = Compressor(encoding)
+    return compressor.compress(content) + compressor.finish()
+
+
+def compress_stream(chunks, encoding):
+    compressor = Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk, flush=True)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    compressor = Compressor(encoding)
+    async for chunk in chunks:
+        data = compressor.compress(chunk, flush=True)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def compressible(request, response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return (
+        request.method in ("GET", "HEAD")
+        and content_type in COMPRESSIBLE_TYPES
+        and not response.has_header("Content-Encoding")
+        and response.status_code not in (204, 304)
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Sync and async capable (MiddlewareMixin), the work is all in process_response."""
+
+    def process_response(self, request, response):
+        if not compressible(request, response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), available_encodings())
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            if response.has_header("Content-Length"):
+                del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The bytes changed: a strong ETag would claim the identity body; If-None-Match compares weakly
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,59 @@
+from functools import wraps
+from hashlib import md5
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from my_course.cache import cache_is_shared, cached_for_request
+
+"""
+Conditional GET (ETag / Last-Modified) for the course endpoints.
+List validators come from one aggregate over the filtered courses: the latest `update_date` and the row count.
+    `update_date` moves on every course save and enrollment change (see signals.py) and the count catches
+    deletions, so an unchanged pair means an unchanged response and a 304 is answered before serializing.
+Validators are themselves cached under the catalog version (see cache.py) when the cache is shared between
+    workers, a warm revalidation then costs no query. A local-memory cache only sees the bumps of its own
+    worker, a write served elsewhere would leave a stale 304: the aggregate runs on every request instead.
+Last-Modified is only sent for a single course: a list can lose a row (deletion, category change)
+    without its latest `update_date` moving, which If-Modified-Since alone would miss.
+"""
+
+
+def catalog_validator(queryset):
+    """ETag source of a list of courses, computed in a single query."""
+    stats = queryset.order_by().aggregate(last_update=Max('update_date'), total=Count('id'))
+    stamp = stats['last_update'].isoformat() if stats['last_update'] else '-'
+    return f"{stamp}:{stats['total']}"
+
+
+def conditional_course_response(endpoint, validators):
+    """
+    Wrap a viewset action with conditional GET handling.
+    `validators(view, request, *args, **kwargs)` returns an (ETag source, last modified or None) pair,
+        or None when the resource does not exist so the action answers with its usual 404.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            compute = lambda: validators(self, request, *args, **kwargs)
+            validated = cached_for_request(f"{endpoint}:validators", request, compute) if cache_is_shared() else compute()
+            if validated is None:
+                return method(self, request, *args, **kwargs)
+            source, last_modified = validated
+            # Responses differ per user (is_enrolled) and per query string (filters, cursor)
+            user_id = request.user.pk if request.user.is_authenticated else 0
+            digest = md5(f"{source}:{user_id}:{request.get_full_path()}".encode()).hexdigest()
+            etag = quote_etag(digest)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+                patch_cache_control(response, no_cache=True)
+                patch_vary_headers(response, ('Authorization',))
+            return response
+        return wrapper
+    return decorator
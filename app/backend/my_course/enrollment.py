@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed
+from my_course.models import Course
+from itertools import islice
+import logging
+
+"""
+Enrollment writes as single SQL statements.
+    - Enroll:   INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING user_id
+    - Unenroll: DELETE ... RETURNING user_id
+Both are idempotent and safe under concurrent calls: the unique (course, user) constraint arbitrates,
+    and the returned ids tell exactly which enrollments changed, without loading the students.
+Unknown user ids are skipped by the SELECT on the user table instead of failing the batch.
+Changes are announced with m2m_changed (post_add/post_remove) like RelatedManager.add()/remove(),
+    so the cache and validator handlers in signals.py keep working.
+Course.enrolled_count moves by the number of returned ids in the same transaction (an F() update, no
+    lost update under concurrency); the signal is flagged `counted` so the handler does not count twice.
+    Other paths (admin, shell, RelatedManager) are counted by that handler: adds by their exact pk_set,
+    removals and clears recounted from the table. recount() also backs `manage.py recount_enrollments`.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+Enrollment = Course.students.through
+
+ENROLL_SQL = (
+    f"INSERT INTO {Enrollment._meta.db_table} (course_id, user_id) "
+    f"SELECT %s, id FROM {User._meta.db_table} WHERE id = ANY(%s) "
+    f"ON CONFLICT (course_id, user_id) DO NOTHING RETURNING user_id"
+)
+UNENROLL_SQL = (
+    f"DELETE FROM {Enrollment._meta.db_table} "
+    f"WHERE course_id = %s AND user_id = ANY(%s) RETURNING user_id"
+)
+RECOUNT_SQL = (
+    f"UPDATE {Course._meta.db_table} AS course SET enrolled_count = counted.total, update_date = NOW() "
+    f"FROM (SELECT id, (SELECT COUNT(*) FROM {Enrollment._meta.db_table} WHERE course_id = c.id) AS total "
+    f"FROM {Course._meta.db_table} AS c WHERE c.id = ANY(%s)) AS counted "
+    f"WHERE course.id = counted.id AND course.enrolled_count <> counted.total RETURNING course.id"
+)
+
+
+def batches(user_ids, size=BATCH_SIZE):
+    user_ids = sorted(set(user_ids))  # a stable lock order between concurrent batches
+    for start in range(0, len(user_ids), size):
+        yield user_ids[start:start + size]
+
+
+def count_enrollments(course_ids, delta, using=None):
+    """Move enrolled_count of `course_ids` by `delta` (negative for removals)."""
+    Course.objects.using(using).filter(pk__in=course_ids).update(enrolled_count=F("enrolled_count") + delta)
+
+
+def recount(course_ids, using=None):
+    """Recompute enrolled_count of `course_ids` from the enrollment table; returns the ids that were off."""
+    using = using or router.db_for_write(Course)
+    with connections[using].cursor() as cursor:
+        cursor.execute(RECOUNT_SQL, [list(course_ids)])
+        return {course_id for course_id, in cursor.fetchall()}
+
+
+def recount_all(batch_size=10000, using=None):
+    """recount() every course, `batch_size` courses per statement; returns how many were off."""
+    using = using or router.db_for_write(Course)
+    course_ids = Course.objects.using(using).order_by("id").values_list("id", flat=True).iterator(chunk_size=batch_size)
+    fixed = 0
+    while batch := list(islice(course_ids, batch_size)):
+        with transaction.atomic(using=using):
+            fixed += len(recount(batch, using))
+    return fixed
+
+
+def _apply(course, user_ids, sql, action):
+    using = router.db_for_write(Enrollment, instance=course)
+    changed = set()
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            for batch in batches(user_ids):
+                cursor.execute(sql, [course.pk, batch])
+                changed.update(user_id for user_id, in cursor.fetchall())
+        if changed:
+            count_enrollments([course.pk], len(changed) if action == "post_add" else -len(changed), using)
+            m2m_changed.send(
+                sender=Enrollment, instance=course, action=action, reverse=False,
+                model=User, pk_set=changed, using=using, counted=True,
+            )
+    return changed
+
+
+def enroll_users(course, user_ids):
+    """Enroll `user_ids` to `course`; returns the ids that were not enrolled before."""
+    return _apply(course, user_ids, ENROLL_SQL, "post_add")
+
+
+def unenroll_users(course, user_ids):
+    """Unenroll `user_ids` from `course`; returns the ids that were enrolled."""
+    return _apply(course, user_ids, UNENROLL_SQL, "post_remove")
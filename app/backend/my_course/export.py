@@ -0,0 +1,200 @@
+from asgiref.sync import sync_to_async
+from io import StringIO
+from itertools import islice
+from rest_framework.renderers import BaseRenderer
+import csv
+import json
+
+"""
+Incremental course export writers, shared by `cli.py list-courses --save` and the /api/export/ endpoints.
+Rows are written one at a time as they come out of `queryset.iterator(chunk_size=...)`, nothing holds
+    the whole catalog: memory stays flat whatever the number of courses.
+    - jsonl: one JSON object per line (served as NDJSON by the API).
+    - csv:   header line, then one row per course.
+    - json:  a JSON array, opened and closed around the rows (the historical --save format).
+ExportStream feeds StreamingHttpResponse straight from a server-side cursor with values_list(): no model
+    or serializer instance per row. Under ASGI it is iterated asynchronously, each chunk fetched and rendered
+    in a thread, so a long export does not hold a worker thread between chunks; under WSGI it is a plain
+    generator.
+"""
+
+COURSE_FIELDS = [
+    "id", "title", "category", "school", "description", "price",
+    "available_until", "post_date", "user", "author",
+]
+# Export field -> ORM lookup, for exports read with values_list()
+COURSE_COLUMNS = dict(zip(COURSE_FIELDS, [
+    "id", "course_title", "category", "school_name", "description", "price",
+    "available_until", "post_date", "user__username", "author",
+]))
+ENROLLMENT_FIELDS = ["course_id", "user_id"]
+
+
+def export_courses(queryset):
+    """Courses with their owner joined, the only columns the export needs."""
+    return queryset.select_related("user").only(
+        "id", "course_title", "category", "school_name", "description", "price",
+        "available_until", "post_date", "author", "user__username",
+    )
+
+
+def course_record(course):
+    return {
+        "id": course.id,
+        "title": course.course_title,
+        "category": course.category,
+        "school": course.school_name,
+        "description": course.description,
+        "price": float(course.price),
+        "available_until": course.available_until.isoformat(),
+        "post_date": course.post_date.isoformat(),
+        # Courses outlive their mentor (on_delete=SET_NULL)
+        "user": course.user.username if course.user_id else None,
+        "author": course.author,
+    }
+
+
+def course_values(values):
+    """Same record as course_record(), from a values_list() row."""
+    record = dict(zip(COURSE_FIELDS, values))
+    record["price"] = float(record["price"])
+    record["available_until"] = record["available_until"].isoformat()
+    record["post_date"] = record["post_date"].isoformat()
+    return record
+
+
+def enrollment_values(values):
+    return dict(zip(ENROLLMENT_FIELDS, values))
+
+
+class ExportWriter:
+    """Writes records to a text stream; `open()` before the first record, `close()` after the last."""
+
+    def __init__(self, stream, fields=COURSE_FIELDS):
+        self.stream = stream
+        self.fields = fields
+
+    def open(self):
+        pass
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonLinesWriter(ExportWriter):
+    extension = "jsonl"
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CsvWriter(ExportWriter):
+    extension = "csv"
+
+    def open(self):
+        self.writer = csv.DictWriter(self.stream, fieldnames=self.fields)
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow(record)
+
+
+class JsonArrayWriter(ExportWriter):
+    extension = "json"
+
+    def open(self):
+        self.stream.write("[")
+        self.separator = "\n"
+
+    def write(self, record):
+        self.stream.write(self.separator + json.dumps(record, ensure_ascii=False))
+        self.separator = ",\n"
+
+    def close(self):
+        self.stream.write("\n]\n")
+
+
+WRITERS = {
+    "jsonl": JsonLinesWriter,
+    "csv": CsvWriter,
+    "json": JsonArrayWriter,
+}
+
+
+class ExportStream:
+    """
+    Text chunks of `queryset` exported through `writer_class`, `flush_rows` rows at a time.
+    `columns` are read with values_list() and turned into records by `to_record`.
+    """
+
+    flush_rows = 500
+
+    def __init__(self, queryset, columns, to_record, writer_class, fields, chunk_size=2000):
+        self.queryset = queryset.values_list(*columns)
+        self.to_record = to_record
+        self.writer_class = writer_class
+        self.fields = fields
+        self.chunk_size = chunk_size
+
+    def start(self):
+        self.buffer = StringIO()
+        self.writer = self.writer_class(self.buffer, self.fields)
+        self.writer.open()
+        return self.queryset.iterator(chunk_size=self.chunk_size)
+
+    def render(self, rows):
+        """Text of the next `flush_rows` rows, empty once they are exhausted."""
+        for values in islice(rows, self.flush_rows):
+            self.writer.write(self.to_record(values))
+        return self.flush()
+
+    def flush(self):
+        chunk = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return chunk
+
+    def finish(self):
+        self.writer.close()
+        return self.flush()
+
+    def __iter__(self):
+        rows = self.start()
+        while chunk := self.render(rows):
+            yield chunk
+        yield self.finish()
+
+    async def __aiter__(self):
+        # QuerySet.aiterator() runs values_list() queries on the event loop, fetch and render in a thread
+        rows = self.start()
+        while chunk := await sync_to_async(self.render)(rows):
+            yield chunk
+        yield self.finish()
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Negotiates the export format (?format= or Accept); the rows themselves are streamed by ExportStream.
+    Only error payloads go through render(), as JSON.
+    """
+
+    charset = "utf-8"
+    writer_class = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    writer_class = JsonLinesWriter
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    writer_class = CsvWriter
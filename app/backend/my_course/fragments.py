@@ -0,0 +1,72 @@
+from django.conf import settings
+from my_course.cache import get_cache
+from my_course.renderers import FragmentList, RawJSON, json_renderer
+import json
+
+"""
+Per-course JSON fragment cache for the course lists.
+Each course is stored once, already rendered, under `course-fragment:<id>` with the `update_date` it was
+    rendered from. update_date moves on every save, enrollment and owner change (see signals.py), so a
+    fragment whose stamp differs from the row is stale and rendered again; deletions drop it.
+A page is fetched as (id, keyset columns, update_date, is_enrolled) only: full rows are loaded and serialized
+    for the courses missing from the cache, and the response is the concatenation of the fragments, with the
+    per-user fields (is_enrolled) spliced in live. The API renderers (see renderers.py) write the fragments as
+    they are.
+COURSE_FRAGMENT_CACHE_TIMEOUT = 0 turns the cache off (every row serialized by CourseSerializer).
+"""
+
+# Fields computed per request, never stored in a fragment; they must come last in the serializer
+PER_USER_FIELDS = ("is_enrolled",)
+# Columns of the page query, the paginator reads the keyset ones from the last row
+STAMP_COLUMNS = ("id", "post_date", "enrolled_count", "update_date")
+
+
+def enabled():
+    return settings.COURSE_FRAGMENT_CACHE_TIMEOUT > 0
+
+
+def fragment_key(course_id):
+    return f"course-fragment:{course_id}"
+
+
+def stamp(course):
+    return course.update_date.isoformat()
+
+
+def forget_fragments(course_ids):
+    get_cache().delete_many([fragment_key(course_id) for course_id in course_ids])
+
+
+def splice(fragment, course):
+    """The cached fragment of `course` closed with its per-user fields."""
+    live = b"".join(
+        b"," + json.dumps(name).encode() + b":" + json.dumps(getattr(course, name)).encode() for name in PER_USER_FIELDS
+    )
+    return RawJSON(fragment[:-1] + live + b"}")
+
+
+def course_fragments(page, rows, serializer_class, context):
+    """
+    FragmentList of the courses of `page` (stamp rows, see STAMP_COLUMNS). Missing or stale fragments are
+    rendered from `rows`, the full listing queryset, in one query and stored.
+    """
+    cache = get_cache()
+    cached = cache.get_many([fragment_key(course.pk) for course in page])
+    fragments = {}
+    for course in page:
+        entry = cached.get(fragment_key(course.pk))
+        if entry is not None and entry[0] == stamp(course):
+            fragments[course.pk] = entry[1]
+
+    missing = [course.pk for course in page if course.pk not in fragments]
+    if missing:
+        renderer = json_renderer()
+        courses = list(rows.filter(pk__in=missing))
+        fresh = {}
+        for course, data in zip(courses, serializer_class(courses, many=True, context=context).data):
+            shared = {name: value for name, value in data.items() if name not in PER_USER_FIELDS}
+            fragments[course.pk] = renderer.render(shared)
+            fresh[fragment_key(course.pk)] = (stamp(course), fragments[course.pk])
+        cache.set_many(fresh, settings.COURSE_FRAGMENT_CACHE_TIMEOUT)
+    # A course deleted between the two queries is left out
+    return FragmentList(splice(fragments[course.pk], course) for course in page if course.pk in fragments)
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import hashers
+import threading
+
+"""
+Password hashing for the login endpoint.
+    - Argon2/Scrypt hashers with their cost parameters taken from settings (PASSWORD_ARGON2_*, PASSWORD_SCRYPT_*).
+      The algorithm names are Django's, so stored hashes stay readable by the stock hashers.
+    - The first of settings.PASSWORD_HASHERS hashes new passwords; a stored hash made by another hasher, or
+      with other parameters, is re-hashed on the next successful login (verify_password()).
+    - Hashing runs on a bounded thread pool (PASSWORD_HASH_WORKERS threads): a login burst saturates those
+      threads, not every core of the worker, and concurrent reads keep their CPU. The hashers release the GIL.
+    - Unknown usernames pay the same hash as known ones (dummy_hash()), so timing does not tell them apart.
+"""
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST
+    parallelism = settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR
+    block_size = settings.PASSWORD_SCRYPT_BLOCK_SIZE
+    parallelism = settings.PASSWORD_SCRYPT_PARALLELISM
+    # scrypt needs 128 * n * r bytes, above OpenSSL's 32 MiB default limit once tuned up
+    maxmem = 2 * 128 * work_factor * block_size
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+
+def offload(function, *args):
+    """Run `function` on the hashing pool and wait for its result."""
+    return executor().submit(function, *args).result()
+
+
+def must_upgrade(encoded):
+    """Whether `encoded` was made by another hasher than the preferred one, or with other parameters."""
+    preferred = hashers.get_hasher("default")
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def verify_password(user, password):
+    """
+    user.check_password() with the hashing offloaded. The upgraded hash is saved from the calling thread,
+    pool threads never touch the database.
+    """
+    if not offload(hashers.check_password, password, user.password):
+        return False
+    if must_upgrade(user.password):
+        user.password = offload(hashers.make_password, password)
+        user.save(update_fields=["password"])
+    return True
+
+
+def dummy_hash(password):
+    """The cost of checking `password` for a user that does not exist."""
+    offload(hashers.make_password, password)
@@ -0,0 +1,198 @@
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from itertools import islice
+from rest_framework.exceptions import ValidationError
+from my_course.cache import bump_catalog_version
+from my_course.categories import sync_categories
+from my_course.models import Course
+from my_course.serializers import CourseSerializer
+from django.contrib.auth.models import User
+import csv
+import json
+import re
+
+"""
+Bulk course import for `cli.py import-courses`, the streamed counterpart of export.py.
+Records are read one at a time from JSON (an array), JSON Lines or CSV, validated with CourseSerializer's
+    field rules and written `batch_size` rows at a time with a single INSERT ... ON CONFLICT (id) DO UPDATE:
+    memory is bounded by one batch, whatever the size of the file.
+    - Keys may be the model's (course_title, school_name...), the export's (title, school...) or a
+      loaddata fixture entry ({"pk": ..., "fields": {...}}), so `--save` exports and fixtures load as is.
+    - `id` upserts: a known id replaces that course (post_date is kept), no id creates a new one.
+    - `user` is the owner, an id (int) or a username (text); empty means no owner.
+Rejected rows are handed to an ExportWriter with their row number and errors, the batch carries on.
+bulk_create() sends no post_save: the catalog cache is invalidated and the batch's courses are linked to their
+    categories (see categories.py) once per written batch.
+"""
+
+BATCH_SIZE = 2000
+
+ALIASES = {"title": "course_title", "school": "school_name"}
+UPDATE_FIELDS = [
+    "course_title", "category", "school_name", "description", "price",
+    "available_until", "author", "user", "update_date",
+]
+
+
+def read_json_lines(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            # Kept as text, rejected by validation with the rest of its batch
+            yield number, line.rstrip("\n")
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+SEPARATORS = re.compile(r"[\s,]*")
+
+
+def read_json_array(stream, read_size=1 << 16):
+    """Objects of a top-level JSON array, decoded one by one from `read_size` reads of `stream`."""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(read_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("JSON input must be an array of objects, use jsonl for one object per line")
+    position, number = 1, 0
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The next object is cut by the end of the buffer: keep its start, read more
+            chunk = stream.read(read_size)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        number += 1
+        yield number, record
+
+
+READERS = {
+    "jsonl": read_json_lines,
+    "csv": read_csv,
+    "json": read_json_array,
+}
+
+
+def normalize(record):
+    """Model field names for a record in any accepted shape."""
+    if not isinstance(record, dict):
+        raise ValidationError({"non_field_errors": ["Expected an object."]})
+    if isinstance(record.get("fields"), dict):
+        record = {"id": record.get("pk"), **record["fields"]}
+    return {ALIASES.get(key, key): value for key, value in record.items()}
+
+
+def parse_id(value):
+    if value in (None, ""):
+        return None
+    try:
+        course_id = int(value)
+    except (TypeError, ValueError):
+        course_id = 0
+    if course_id < 1 or isinstance(value, bool):
+        raise ValidationError({"id": ["A valid positive integer is required."]})
+    return course_id
+
+
+class BatchValidator:
+    """CourseSerializer's field rules, built once and run on every row, and owners resolved per batch."""
+
+    def __init__(self):
+        self.serializer = CourseSerializer()
+
+    def validate(self, rows):
+        """(number, Course) of the valid rows and (number, record, errors) of the others."""
+        valid, rejected = [], []
+        for number, record in rows:
+            try:
+                data = normalize(record)
+                course_id = parse_id(data.get("id"))
+                fields = self.serializer.run_validation(data)
+            except ValidationError as e:
+                rejected.append((number, record, e.detail))
+                continue
+            valid.append((number, record, Course(id=course_id, **fields), data.get("user")))
+        return self.resolve_owners(valid, rejected)
+
+    def resolve_owners(self, valid, rejected):
+        usernames = {owner for *_, owner in valid if type(owner) is str and owner}
+        ids = {owner for *_, owner in valid if type(owner) is int}
+        by_username = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        known_ids = set(User.objects.filter(id__in=ids).values_list("id", flat=True))
+        courses = []
+        for number, record, course, owner in valid:
+            if owner in (None, ""):
+                course.user_id = None
+            elif type(owner) is str and owner in by_username:
+                course.user_id = by_username[owner]
+            elif type(owner) is int and owner in known_ids:
+                course.user_id = owner
+            else:
+                rejected.append((number, record, {"user": [f"Unknown user {owner!r}."]}))
+                continue
+            courses.append((number, course))
+        return courses, rejected
+
+
+def write_courses(courses, using):
+    """Upsert `courses` in one statement; returns whether explicit ids were written."""
+    # ON CONFLICT cannot touch a row twice in one statement: the last row of an id wins
+    unique = {}
+    for course in courses:
+        unique[course.id if course.id is not None else id(course)] = course
+    with transaction.atomic(using=using):
+        Course.objects.using(using).bulk_create(
+            unique.values(),
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=UPDATE_FIELDS,
+        )
+        # Postgres returns the ids of inserted and updated rows alike
+        sync_categories([course.id for course in unique.values()], using)
+    return any(course.id is not None for course in courses)
+
+
+def reset_sequence(using):
+    """Move the id sequence past explicitly imported ids, as loaddata does."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Course]):
+            cursor.execute(sql)
+
+
+def import_courses(rows, rejects, batch_size=BATCH_SIZE, progress=None):
+    """
+    Import (number, record) `rows` from one of READERS, rejected ones written to the `rejects` writer.
+    `progress(imported, rejected)` is called after each batch; returns the final (imported, rejected).
+    """
+    using = router.db_for_write(Course)
+    validator = BatchValidator()
+    imported = rejected = 0
+    explicit_ids = False
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        courses, errors = validator.validate(batch)
+        for number, record, detail in sorted(errors, key=lambda error: error[0]):
+            rejects.write({"row": number, "record": record, "errors": detail})
+        if courses:
+            explicit_ids |= write_courses([course for _, course in courses], using)
+            bump_catalog_version()
+        imported += len(courses)
+        rejected += len(errors)
+        if progress:
+            progress(imported, rejected)
+    if explicit_ids:
+        reset_sequence(using)
+    return imported, rejected
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from my_course.cache import bump_catalog_version
+from my_course.categories import sync_categories
+
+"""
+Repairs the category index from Course.category, e.g. after courses were written in raw SQL or
+    bulk-loaded around the ORM: missing categories are created, courses re-linked and every category
+    recounted (one row each, only the ones that were off are written).
+    [CMD: python manage.py sync_categories]
+"""
+
+
+class Command(BaseCommand):
+    help = "Link every course to its normalized category and recompute the category counts"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        moved = sync_categories()
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {moved} courses re-linked in {time.perf_counter() - started:.1f}s"
+        ))
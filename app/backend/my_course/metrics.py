@@ -0,0 +1,204 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from bisect import bisect_left
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+import hmac
+import logging
+import threading
+import time
+
+"""
+Request metrics for the API, exported in the Prometheus text format at /metrics.
+MetricsMiddleware times every request and files it under its route pattern (not the raw path, so ids do not
+    multiply series), method and status:
+    - latency histogram, SQL query count and time, response size (streamed bodies are not measured).
+SQL is measured by an execute wrapper installed once on every database connection (connection_created),
+    which adds to the stats of the request running in the current context. The context follows sync views
+    into their thread under ASGI, so sync and async views are both covered.
+With METRICS_SLOW_REQUEST_MS > 0, slower requests are logged with their queries and timings.
+Counters live in the process: each worker serves its own, scrape every worker or sum them in Prometheus.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+current_request = ContextVar("current_request", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "sql")
+
+    def __init__(self, keep_sql=False):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.sql = [] if keep_sql else None
+
+
+class QueryRecorder:
+    """Execute wrapper adding each query to the current request's stats; a no-op outside requests."""
+
+    def __call__(self, execute, sql, params, many, context):
+        stats = current_request.get()
+        if stats is None:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.queries += 1
+            stats.db_seconds += elapsed
+            if stats.sql is not None:
+                stats.sql.append((elapsed, sql))
+
+
+recorder = QueryRecorder()
+
+
+@receiver(connection_created)
+def install_recorder(sender, connection, **kwargs):
+    # Pooled and reconnected connections come back through here, the wrapper is installed once
+    if recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(recorder)
+
+
+class Series:
+    __slots__ = ("buckets", "count", "seconds", "queries", "db_seconds", "bytes")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.seconds = self.db_seconds = 0.0
+        self.queries = self.bytes = 0
+
+
+class Registry:
+    """Per (method, route, status) series, updated under a lock at the end of each request."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, labels, seconds, stats, size):
+        index = bisect_left(BUCKETS, seconds)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = Series()
+            if index < len(BUCKETS):
+                series.buckets[index] += 1
+            series.count += 1
+            series.seconds += seconds
+            series.queries += stats.queries
+            series.db_seconds += stats.db_seconds
+            series.bytes += size
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self):
+        with self.lock:
+            snapshot = [(labels, series.buckets[:], series.count, series.seconds, series.queries,
+                         series.db_seconds, series.bytes) for labels, series in sorted(self.series.items())]
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for labels, buckets, count, seconds, *_ in snapshot:
+            label = format_labels(labels)
+            cumulative = 0
+            for bound, hits in zip(BUCKETS, buckets):
+                cumulative += hits
+                lines.append(f'http_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"http_request_duration_seconds_sum{{{label}}} {seconds}")
+            lines.append(f"http_request_duration_seconds_count{{{label}}} {count}")
+        for name, position, help_text in [
+            ("http_request_db_queries_total", 4, "SQL queries run by requests."),
+            ("http_request_db_seconds_total", 5, "Time spent in SQL queries by requests."),
+            ("http_response_size_bytes_total", 6, "Bytes of the (non streamed) response bodies."),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{{{format_labels(row[0])}}} {row[position]}" for row in snapshot)
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    method, route, status = labels
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+registry = Registry()
+
+
+def route_of(request):
+    match = getattr(request, "resolver_match", None)
+    return match.route if match else "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Sync and async capable, so async views are not pushed to a thread by this middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    async def __acall__(self, request):
+        stats, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.finish(request, response, stats, started)
+        return response
+
+    def start(self):
+        stats = RequestStats(keep_sql=settings.METRICS_SLOW_REQUEST_MS > 0)
+        return stats, current_request.set(stats), time.perf_counter()
+
+    def finish(self, request, response, stats, started):
+        seconds = time.perf_counter() - started
+        size = 0 if response.streaming else len(response.content)
+        route = route_of(request)
+        registry.observe((request.method, route, response.status_code), seconds, stats, size)
+        if 0 < settings.METRICS_SLOW_REQUEST_MS <= seconds * 1000:
+            queries = "\n".join(f"    {elapsed * 1000:8.2f} ms  {sql}" for elapsed, sql in stats.sql)
+            logger.warning(
+                f"Slow request {request.method} {request.get_full_path()} ({route}): {seconds * 1000:.1f} ms, "
+                f"{stats.queries} queries in {stats.db_seconds * 1000:.1f} ms\n{queries}"
+            )
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape endpoint; with METRICS_TOKEN set it wants `Authorization: Bearer <token>`."""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("my_course", "0005_course_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="update_date",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+# Backfill from the enrollment table, reversed by dropping the column
+BACKFILL = """
+UPDATE course_list SET enrolled_count = counted.total
+FROM (
+    SELECT course_id, COUNT(*) AS total FROM course_list_students GROUP BY course_id
+) AS counted
+WHERE course_list.id = counted.course_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("my_course", "0006_course_update_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="enrolled_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["enrolled_count", "id"], name="course_enrolled_count_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Backfill from the course categories (same key as my_course.categories), reversed by dropping the table
+BACKFILL = r"""
+INSERT INTO course_category (key, name, course_count, update_date)
+SELECT key, MIN(name), 0, NOW() FROM (
+    SELECT lower(btrim(regexp_replace(category, '[ \t\n\r\f\v]+', ' ', 'g'))) AS key,
+           btrim(regexp_replace(category, '[ \t\n\r\f\v]+', ' ', 'g')) AS name
+    FROM course_list
+) AS named
+WHERE key <> ''
+GROUP BY key;
+
+UPDATE course_list SET category_id = course_category.id
+FROM course_category
+WHERE course_category.key = lower(btrim(regexp_replace(course_list.category, '[ \t\n\r\f\v]+', ' ', 'g')));
+
+UPDATE course_category SET course_count = counted.total
+FROM (
+    SELECT category_id, COUNT(*) AS total FROM course_list WHERE category_id IS NOT NULL GROUP BY category_id
+) AS counted
+WHERE course_category.id = counted.category_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("my_course", "0007_course_enrolled_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.TextField(unique=True)),
+                ("name", models.TextField()),
+                ("course_count", models.PositiveIntegerField(default=0)),
+                ("update_date", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Category",
+                "verbose_name_plural": "Categories",
+                "db_table": "course_category",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="category_ref",
+            field=models.ForeignKey(
+                db_column="category_id",
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="courses",
+                to="my_course.category",
+            ),
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -1,4 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
 from django.db import models
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Cast, Lower
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 
@@ -6,10 +10,86 @@ from django.contrib.auth.models import User
 All variables for the course creation with ID as Big Auto (auto incrementated). 
 Setting all table names with plural and singular names. 
 Post-date is an auto adding variable depending from OS time.
+Update-date is refreshed on every save and on enrollment changes, used as HTTP validator (ETag/Last-Modified).
+Category-ref links the course to its normalized Category (see categories.py), whose course count is kept
+    up to date, so the category list reads one row per category instead of scanning the courses.
+Enrolled-count mirrors the number of students, kept in step with every enrollment change (see enrollment.py),
+    so listings and the popularity ordering read a column instead of counting the enrollment table.
 Student is an hidden variable to store enrolled students, helping to later mentor who is enrolled to
     each mentors course and student enrollment view.
 """
 
+SEARCH_CONFIG = "english"
+
+
+def course_search_vector():
+    """
+    Weighted full-text document of a course. The GIN index in Course.Meta is built on this exact
+    expression, so queries must use it unchanged for Postgres to pick the index.
+    """
+    return (
+        SearchVector("course_title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("school_name", "author", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+class CourseQuerySet(models.QuerySet):
+    """
+    Listing helpers so API views never fall back to per-row enrollment queries (joined by the serializers'
+    listing(), see serializers.py).
+    The student count is the denormalized `enrolled_count` column; `is_enrolled` is a correlated
+    subquery on the enrollment table, which keeps it correct when the queryset is itself filtered
+    through `students`.
+    """
+
+    def with_is_enrolled(self, user):
+        if user is None or not user.is_authenticated:
+            return self.annotate(is_enrolled=Value(False))
+        enrollment = Course.students.through.objects.filter(course_id=OuterRef("pk"), user_id=user.pk)
+        return self.annotate(is_enrolled=Exists(enrollment))
+
+    def in_category(self, category):
+        # Matches the lower(category) functional index, unlike `category__iexact` (UPPER() on Postgres)
+        return self.alias(category_lower=Lower("category")).filter(category_lower=category.lower())
+
+    def search(self, terms):
+        query = SearchQuery(terms, search_type="websearch", config=SEARCH_CONFIG)
+        return (
+            self.alias(search_document=course_search_vector())
+            .filter(search_document=query)
+            # ts_rank() is a float4; as float8 it survives the JSON round trip of a pagination cursor
+            .annotate(search_rank=Cast(SearchRank(course_search_vector(), query), models.FloatField()))
+        )
+
+    def filter_catalog(self, category=None, terms=None, category_id=None):
+        """Category filters and full-text search (?category=, ?category_id=, ?q=) shared by the sync and async views."""
+        queryset = self
+        if category:
+            queryset = queryset.in_category(category)
+        if category_id is not None:
+            queryset = queryset.filter(category_ref_id=category_id)
+        if terms:
+            queryset = queryset.search(terms)
+        return queryset
+
+
+class Category(models.Model):
+    key = models.TextField(unique=True)
+    name = models.TextField()
+    course_count = models.PositiveIntegerField(default=0)
+    update_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "course_category"
+        verbose_name = "Category"
+        verbose_name_plural = "Categories"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
 class Course(models.Model):
     id = models.BigAutoField(primary_key=True)
     course_title = models.TextField(blank=False, max_length=100)
@@ -21,9 +101,22 @@ class Course(models.Model):
     author = models.TextField(blank=False, max_length=100)
     user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True)
     post_date = models.DateTimeField(auto_now_add=True)
+    update_date = models.DateTimeField(auto_now=True)
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False)
+    category_ref = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, editable=False, related_name="courses", db_column="category_id"
+    )
     students = models.ManyToManyField(User, related_name='enrolled_courses', blank=True)
+
+    objects = CourseQuerySet.as_manager()
     
     class Meta:
         db_table = "course_list"
         verbose_name = "Course"
-        verbose_name_plural = "Courses"
\ No newline at end of file
+        verbose_name_plural = "Courses"
+        indexes = [
+            models.Index(Lower("category"), name="course_category_lower_idx"),
+            models.Index(fields=["post_date", "id"], name="course_post_date_id_idx"),
+            models.Index(fields=["enrolled_count", "id"], name="course_enrolled_count_id_idx"),
+            GinIndex(course_search_vector(), name="course_search_idx"),
+        ]
\ No newline at end of file
@@ -0,0 +1,187 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+import json
+import logging
+
+"""
+Keyset (seek) pagination for the API.
+Pages are addressed by an opaque cursor holding the ordering values of the last row served,
+    so page N is fetched with `WHERE (post_date, id) < (...) LIMIT n` instead of an OFFSET scan.
+    The last ordering field must be unique (the primary key) to break ties.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Keyset of ranked search results (?q=), relevance first
+SEARCH_ORDERING = ('-search_rank', '-id')
+# Keyset of a course roster (/api/courses/{id}/students/), usernames being unique
+ROSTER_ORDERING = ('username', 'id')
+# Course list keysets selectable with ?ordering=, each backed by a (column, id) index
+COURSE_ORDERINGS = {
+    'post_date': ('post_date', 'id'),
+    '-post_date': ('-post_date', '-id'),
+    'enrolled_count': ('enrolled_count', 'id'),
+    '-enrolled_count': ('-enrolled_count', '-id'),
+}
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-post_date', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, view):
+        """Views can override the keyset with a `keyset_ordering` attribute."""
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 50
+        value = self._query_params(request).get(self.page_size_query_param)
+        if value:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Same as paginate_queryset() for async views, the page is fetched with `async for`."""
+        return self.finish_page([row async for row in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view=None):
+        """Order and seek `queryset` from the request cursor; the slice holds one extra row to detect a next page."""
+        self.request = request
+        self.ordering = self.get_ordering(view)
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.ordering if not self.reverse else tuple(self._flip(field) for field in self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, self.position))
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.next_position = self.previous_position = None
+        if rows and (has_more if not self.reverse else self.position is not None):
+            self.next_position = self._position(rows[-1])
+        if rows and (has_more if self.reverse else self.position is not None):
+            self.previous_position = self._position(rows[0])
+        return rows
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        token = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = self._query_params(request).get(self.cursor_query_param)
+        if not token:
+            self.base_url = remove_query_param(self.base_url, self.cursor_query_param)
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            raw = payload['p']
+            if len(raw) != len(self.ordering):
+                raise ValueError(token)
+            position = [self._to_python(model, field, value) for field, value in zip(self.ordering, raw)]
+        except Exception:
+            logger.warning(f"Rejected pagination cursor: {token}")
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get('r'))
+
+    def _position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, self._name(field))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def _to_python(self, model, field, value):
+        """Model fields are parsed back from JSON; annotations (e.g. a search rank) are kept as is."""
+        try:
+            return model._meta.get_field(self._name(field)).to_python(value)
+        except FieldDoesNotExist:
+            return value
+
+    def _seek_filter(self, ordering, position):
+        """
+        Lexicographic `(a, b) > (x, y)` expressed as `a >= x AND (a > x OR (a = x AND b > y))`.
+        The redundant bound on the leading column is the index condition: without it Postgres reads
+            the index from its start and filters out every row before the cursor.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            name = self._name(field)
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        leading = ordering[0]
+        bound = Q(**{f"{self._name(leading)}__{'lte' if leading.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    @staticmethod
+    def _query_params(request):
+        # DRF requests expose query_params, plain Django requests (async views) only GET
+        return getattr(request, 'query_params', request.GET)
+
+    @staticmethod
+    def _name(field):
+        return field.lstrip('-')
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+from itertools import islice
+from rest_framework.authtoken.models import Token
+from my_course.roles import STUDENT
+import csv
+import django
+import os
+
+"""
+Bulk user provisioning for `cli.py bulk-users`, to onboard a whole cohort from a CSV file.
+Columns: username (required), email, password, first_name, last_name and groups (names separated by `;`,
+    the command's default group when empty). An empty password leaves the account without a usable one.
+Rows are handled `batch_size` at a time:
+    - passwords of the new users are hashed across a process pool, PBKDF2 being the cost of an account;
+    - users, group memberships and tokens are inserted with bulk_create(ignore_conflicts=True).
+Re-running a file is idempotent: known usernames (in the database or earlier in the file) are kept as
+    they are, only their missing groups and token are added.
+Memberships are announced with one reverse m2m_changed per group and batch, so the role, token and
+    catalog handlers in signals.py keep working.
+"""
+
+BATCH_SIZE = 500
+
+COLUMNS = ["username", "email", "password", "first_name", "last_name", "groups"]
+
+# Checked against the User fields' own validators (format, max_length), a bad row failing alone before bulk_create
+VALIDATED = ["username", "email", "first_name", "last_name"]
+
+
+def init_worker():
+    # Spawned workers start without settings, forked ones have them already
+    django.setup()
+
+
+class PasswordHasher:
+    """make_password() over a process pool, or in this process with `processes` <= 1."""
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count()
+        self.pool = ProcessPoolExecutor(self.processes, initializer=init_worker) if self.processes > 1 else None
+
+    def hash(self, passwords):
+        # Empty passwords become unusable ones without paying for a hash
+        hashed = [make_password(None) if not password else None for password in passwords]
+        todo = [i for i, password in enumerate(passwords) if password]
+        plain = [passwords[i] for i in todo]
+        if self.pool:
+            results = self.pool.map(make_password, plain, chunksize=max(1, len(plain) // (self.processes * 4)))
+        else:
+            results = map(make_password, plain)
+        for i, password in zip(todo, results):
+            hashed[i] = password
+        return hashed
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+
+def read_users(stream):
+    reader = csv.DictReader(stream)
+    if "username" not in (reader.fieldnames or []):
+        raise ValueError("The CSV file needs a username column")
+    for row in reader:
+        yield reader.line_num, row
+
+
+def clean(row, default_groups):
+    """User fields and group names of a CSV row, ValidationError when it cannot be provisioned."""
+    fields = {column: (row.get(column) or "").strip() for column in COLUMNS}
+    errors = {}
+    for name in VALIDATED:
+        try:
+            User._meta.get_field(name).clean(fields[name], None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    groups = [name.strip() for name in fields.pop("groups").split(";") if name.strip()] or default_groups
+    # CSV passwords are taken as is, surrounding spaces included
+    fields["password"] = row.get("password") or ""
+    return fields, groups
+
+
+class Provisioner:
+    """Creates the users of successive batches; groups are looked up (or created) once per name."""
+
+    def __init__(self, hasher, default_groups=(STUDENT,), tokens=False):
+        self.hasher = hasher
+        self.default_groups = list(default_groups)
+        self.tokens = tokens
+        self.groups = {}
+        self.using = router.db_for_write(User)
+
+    def group_id(self, name):
+        if name not in self.groups:
+            self.groups[name] = Group.objects.get_or_create(name=name)[0].pk
+        return self.groups[name]
+
+    def provision(self, rows):
+        """(created, already known, [(number, row, errors)]) for a batch of (number, row)."""
+        rejected, wanted, valid = [], {}, 0
+        for number, row in rows:
+            try:
+                fields, groups = clean(row, self.default_groups)
+            except ValidationError as e:
+                rejected.append((number, row, e.message_dict))
+                continue
+            # The first row of a username wins, as it would in separate runs
+            valid += 1
+            wanted.setdefault(fields["username"], (fields, groups))
+
+        existing = set(User.objects.filter(username__in=wanted).values_list("username", flat=True))
+        new = [fields for username, (fields, _) in wanted.items() if username not in existing]
+        passwords = self.hasher.hash([fields["password"] for fields in new])
+
+        with transaction.atomic(using=self.using):
+            User.objects.bulk_create(
+                [User(**{**fields, "password": password}) for fields, password in zip(new, passwords)],
+                ignore_conflicts=True,
+            )
+            # ignore_conflicts returns no primary keys on Postgres
+            ids = dict(User.objects.filter(username__in=wanted).values_list("username", "id"))
+            members = {}
+            for username, (_, groups) in wanted.items():
+                for name in groups:
+                    members.setdefault(self.group_id(name), set()).add(ids[username])
+            User.groups.through.objects.bulk_create(
+                [User.groups.through(group_id=group_id, user_id=user_id)
+                 for group_id, user_ids in members.items() for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+            if self.tokens:
+                Token.objects.bulk_create(
+                    [Token(key=Token.generate_key(), user_id=user_id) for user_id in ids.values()],
+                    ignore_conflicts=True,
+                )
+            for group_id, user_ids in members.items():
+                m2m_changed.send(
+                    sender=User.groups.through, instance=Group(pk=group_id), action="post_add",
+                    reverse=True, model=User, pk_set=user_ids, using=self.using,
+                )
+        return len(new), valid - len(new), rejected
+
+
+def provision_users(rows, rejects, hasher, default_groups=(STUDENT,), tokens=False, batch_size=BATCH_SIZE, progress=None):
+    """
+    Provision (number, row) `rows` from read_users(), rejected ones written to the `rejects` writer.
+    `progress(created, existing, rejected)` is called after each batch and returns the final counts.
+    """
+    provisioner = Provisioner(hasher, default_groups, tokens)
+    created = existing = rejected = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        batch_created, batch_existing, errors = provisioner.provision(batch)
+        for number, row, detail in errors:
+            record = {column: value for column, value in row.items() if column != "password"}
+            rejects.write({"row": number, "record": record, "errors": detail})
+        created += batch_created
+        existing += batch_existing
+        rejected += len(errors)
+        if progress:
+            progress(created, existing, rejected)
+    return created, existing, rejected
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from collections.abc import Mapping
+import datetime
+import decimal
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:  # Optional, `poetry add orjson`
+    orjson = None
+
+"""
+JSON renderers and parser of the API (REST_FRAMEWORK in settings.py, picked by API_JSON).
+FragmentJSONRenderer is DRF's JSONRenderer, which also writes responses holding a FragmentList (course lists
+    assembled from cached fragments, see fragments.py) by concatenating the fragments.
+ORJSONRenderer does the same with orjson, writing what DRF's encoder writes (large floats aside: 1e16, not
+    1e+16, the same number):
+    - Decimal: serializer DecimalFields already hand over strings ("price": "9.90" under the default
+      COERCE_DECIMAL_TO_STRING); a bare Decimal is a float, as with DRF;
+    - datetime: ISO 8601, UTC as `Z`; date and time: ISO 8601; lazy strings, UUIDs and querysets as DRF.
+    Requests for indented output (`Accept: application/json; indent=4`) and UNICODE_JSON = False go to DRF.
+ORJSONParser reads UTF-8 bodies with orjson, other charsets with DRF's parser.
+Without orjson installed both fall back to DRF's classes.
+"""
+
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class RawJSON(bytes):
+    """Rendered JSON embedded as is by FragmentJSONRenderer."""
+
+
+class FragmentList(list):
+    """A list of RawJSON, marking a response FragmentJSONRenderer assembles itself."""
+
+
+class FragmentJSONRenderer(JSONRenderer):
+    """DRF's JSONRenderer, which also writes responses holding a FragmentList by concatenating its fragments."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or not any(isinstance(value, FragmentList) for value in data.values()):
+            return self.render_json(data, accepted_media_type, renderer_context)
+        members = []
+        for name, value in data.items():
+            if isinstance(value, FragmentList):
+                value = b"[" + b",".join(value) + b"]"
+            else:
+                value = self.render_json(value, accepted_media_type, renderer_context) or b"null"
+            members.append(json.dumps(name).encode() + b":" + value)
+        return b"{" + b",".join(members) + b"}"
+
+    def render_json(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def encode_default(obj):
+    """The types orjson leaves to us, encoded as DRF's JSONEncoder does."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if hasattr(obj, "__iter__"):  # Querysets, sets, generators
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONRenderer(FragmentJSONRenderer):
+
+    def render_json(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render_json(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            rendered = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError as e:
+            raise TypeError(str(e)) from e
+        # Like DRF: U+2028 and U+2029 are valid JSON but end a line in JavaScript
+        if b"\xe2\x80\xa8" in rendered or b"\xe2\x80\xa9" in rendered:
+            rendered = rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return rendered
+
+
+class ORJSONParser(JSONParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
+
+
+def json_renderer():
+    """The configured fragment-aware JSON renderer, for responses built outside DRF's views."""
+    for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES:
+        if issubclass(renderer_class, FragmentJSONRenderer):
+            return renderer_class()
+    return FragmentJSONRenderer()
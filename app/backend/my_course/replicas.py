@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from my_course.cache import get_cache
+import logging
+import random
+import threading
+import time
+
+"""
+Primary/replica routing (DATABASE_ROUTERS in settings.py), the replicas coming from POSTGRES_REPLICAS.
+Writes, migrations and everything outside the routed views use the primary (`default`). ReplicaReadMixin
+    sends the reads of a safe request (GET, HEAD, OPTIONS) to one replica for the whole request, picked by
+    weight among the healthy ones. It does so after authentication and permissions: tokens and roles are
+    read from the primary, so a token made by a login is never looked up on a replica lagging behind it.
+Read-your-writes: a successful write (and a signup or login) pins the user's reads to the primary for
+    READ_YOUR_WRITES_SECONDS, with a key in the course cache, which must be shared between workers as for
+    the catalog invalidations. Replica reads never fill the response and validator caches (cache.py), a
+    pinned user is not answered from what a lagging replica read.
+A replica is healthy when it answers and replays within REPLICA_MAX_LAG_SECONDS of the primary, checked at
+    most every REPLICA_HEALTH_INTERVAL seconds per process and replica; with none healthy, reads stay on the
+    primary.
+"""
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Caught up (every received WAL replayed) counts as no lag, an idle primary leaves the replay timestamp behind
+LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# Database alias the reads of the current request go to, None for the primary
+read_alias = ContextVar("read_alias", default=None)
+
+
+@contextmanager
+def reading_from(alias):
+    token = read_alias.set(alias)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        # A transaction on the primary reads its own writes
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaHealth:
+    """Last health check of each replica, (healthy, time), refreshed when older than REPLICA_HEALTH_INTERVAL."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def healthy(self, alias):
+        with self.lock:
+            state = self.states.get(alias)
+        if state is not None and time.monotonic() - state[1] < settings.REPLICA_HEALTH_INTERVAL:
+            return state[0]
+        healthy = self.check(alias)
+        with self.lock:
+            self.states[alias] = (healthy, time.monotonic())
+        return healthy
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(LAG_SQL)
+                    lag = cursor.fetchone()[0]
+                else:
+                    cursor.execute("SELECT 1")
+                    lag = 0
+        except DatabaseError as e:
+            logger.warning(f"Replica {alias} unavailable: {e}")
+            return False
+        if lag is not None and lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning(f"Replica {alias} is {lag:.1f}s behind the primary")
+            return False
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
+
+
+health = ReplicaHealth()
+
+
+def choose_replica():
+    """A healthy replica drawn by weight (DATABASE_REPLICAS), None when there is none."""
+    replicas = [
+        (alias, weight) for alias, weight in settings.DATABASE_REPLICAS.items() if weight > 0 and health.healthy(alias)
+    ]
+    if not replicas:
+        return None
+    aliases, weights = zip(*replicas)
+    return random.choices(aliases, weights)[0]
+
+
+def pin_key(user_id):
+    return f"primary-pin:{user_id}"
+
+
+def pin_to_primary(user):
+    """Send `user`'s reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    if settings.DATABASE_REPLICAS and settings.READ_YOUR_WRITES_SECONDS > 0 and user.is_authenticated:
+        get_cache().set(pin_key(user.pk), True, settings.READ_YOUR_WRITES_SECONDS)
+
+
+def pinned(user):
+    return (
+        settings.READ_YOUR_WRITES_SECONDS > 0
+        and user.is_authenticated
+        and get_cache().get(pin_key(user.pk)) is not None
+    )
+
+
+class ReplicaReadMixin:
+    """For viewsets: safe requests read from a replica unless the user wrote recently, writes pin the user."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with reading_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and settings.DATABASE_REPLICAS and not pinned(request.user):
+            read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,61 @@
+from django.conf import settings
+from my_course.cache import get_cache
+
+"""
+Role resolution for permission checks and views.
+A user's group names are loaded once per request and memoized on the request, so a mentor write
+    (permission check, object permission, perform_create) runs a single group query.
+With ROLE_CACHE_TIMEOUT > 0 they are also cached across requests, keyed by user id. Signals (see signals.py)
+    forget the entry whenever the user's groups change, including through `cli.py group-user`/`reset-group`.
+    Those run in their own process: only a shared cache backend sees their invalidation, keep the
+    timeout at 0 (the default) with the local-memory cache.
+"""
+
+MENTOR = "Mentor"
+STUDENT = "Student"
+
+
+def role_cache_key(user_id):
+    return f"course-api:roles:{user_id}"
+
+
+def load_roles(user):
+    """Group names of `user`, through the shared cache when enabled."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    if getattr(user, "_role_names", None) is not None:
+        # Resolved with the token (see authentication.py)
+        return user._role_names
+    if settings.ROLE_CACHE_TIMEOUT <= 0:
+        return frozenset(user.groups.values_list("name", flat=True))
+
+    cache = get_cache()
+    key = role_cache_key(user.pk)
+    roles = cache.get(key)
+    if roles is None:
+        roles = frozenset(user.groups.values_list("name", flat=True))
+        cache.set(key, roles, settings.ROLE_CACHE_TIMEOUT)
+    return roles
+
+
+def get_roles(request):
+    """Group names of the request's user, resolved at most once per request."""
+    # Keyed by user id too: request.user can be swapped after authentication (login, force_authenticate)
+    roles = getattr(request, "_roles", None)
+    if roles is None or roles[0] != request.user.pk:
+        roles = (request.user.pk, load_roles(request.user))
+        request._roles = roles
+    return roles[1]
+
+
+def is_mentor(request):
+    return MENTOR in get_roles(request)
+
+
+def is_admin(request):
+    return bool(request.user and request.user.is_superuser)
+
+
+def forget_roles(user_ids):
+    if user_ids:
+        get_cache().delete_many([role_cache_key(user_id) for user_id in user_ids])
@@ -1,8 +1,40 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User, Group
+from django.db.models import Prefetch
 from my_course.models import Course
 
 
+def requested_fields(request, available):
+    """
+    Names of `available` kept by the comma separated ?fields= and ?omit= of a GET request, in their order;
+    None when neither is given (or on writes). Unknown names are a 400.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    # DRF requests expose query_params, plain Django requests (async views) only GET
+    params = getattr(request, 'query_params', request.GET)
+    if 'fields' not in params and 'omit' not in params:
+        return None
+    wanted = [name.strip() for name in params.get('fields', '').split(',') if name.strip()] or available
+    omitted = {name.strip() for name in params.get('omit', '').split(',') if name.strip()}
+    unknown = (set(wanted) | omitted) - set(available)
+    if unknown:
+        raise serializers.ValidationError({'fields': [f"Unknown fields: {', '.join(sorted(unknown))}"]})
+    return [name for name in available if name in wanted and name not in omitted]
+
+
+class SparseFieldsMixin:
+    """Sparse fieldsets: drops the fields left out by ?fields=/?omit= of the request in the context."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        kept = requested_fields(self.context.get('request'), list(self.fields))
+        self.sparse = kept is not None
+        if self.sparse:
+            for name in set(self.fields) - set(kept):
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     groups = serializers.StringRelatedField(many=True, read_only=True)
     
@@ -33,32 +65,93 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_username = serializers.CharField(source='user.username', read_only=True)
-    student_count = serializers.SerializerMethodField()
+    student_count = serializers.IntegerField(source='enrolled_count', read_only=True)
+    category_id = serializers.IntegerField(source='category_ref_id', read_only=True)
     is_enrolled = serializers.SerializerMethodField()
     
     class Meta:
         model = Course
         fields = [
-            'id', 'course_title', 'category', 'school_name', 'description',
+            'id', 'course_title', 'category', 'category_id', 'school_name', 'description',
             'price', 'available_until', 'author', 'post_date', 'user',
             'user_username', 'student_count', 'is_enrolled'
         ]
         read_only_fields = ['id', 'post_date', 'user']
     
-    def get_student_count(self, obj):
-        return obj.students.count()
+    # Course columns read by the fields not named after one (is_enrolled is an annotation)
+    field_columns = {
+        'category_id': ['category_ref'],
+        'user_username': ['user', 'user__username'],
+        'student_count': ['enrolled_count'],
+        'is_enrolled': [],
+    }
+    
+    def columns(self):
+        columns = []
+        for name in self.fields:
+            columns += self.field_columns.get(name, [name])
+        return columns
+    
+    def listing(self, queryset, user=None):
+        """
+        `queryset` with what the kept fields render: the owner join and the enrollment subquery only when
+        their fields are kept, and with a sparse fieldset `.only()` their columns, so large text is never read.
+        """
+        if 'user_username' in self.fields:
+            queryset = queryset.select_related('user')
+        if 'is_enrolled' in self.fields:
+            queryset = queryset.with_is_enrolled(user)
+        if self.sparse:
+            # The paginator reads the keyset columns from the last row of a page
+            queryset = queryset.only('id', 'post_date', 'enrolled_count', *self.columns())
+        return queryset
     
     def get_is_enrolled(self, obj):
+        if hasattr(obj, 'is_enrolled'):
+            return obj.is_enrolled
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return request.user in obj.students.all()
+            return obj.students.filter(pk=request.user.pk).exists()
         return False
 
 
 class CourseDetailSerializer(CourseSerializer):
-    students = UserSerializer(many=True, read_only=True)
+    """
+    Nests a preview of the first `preview_size` students (by username) next to `student_count`;
+    the whole roster is paginated at /api/courses/{id}/students/.
+    """
+    preview_size = 10
+    
+    students = UserSerializer(source='students_preview', many=True, read_only=True)
     
     class Meta(CourseSerializer.Meta):
         fields = CourseSerializer.Meta.fields + ['students']
+    
+    field_columns = {**CourseSerializer.field_columns, 'students': []}
+    
+    def listing(self, queryset, user=None):
+        """Preview students are prefetched with their groups, in two queries whatever the number of courses."""
+        queryset = super().listing(queryset, user)
+        if 'students' in self.fields:
+            # A sliced prefetch: at most preview_size students per course (a window function on Postgres)
+            students = User.objects.order_by('username', 'id').prefetch_related('groups')[:self.preview_size]
+            queryset = queryset.prefetch_related(Prefetch('students', queryset=students, to_attr='students_preview'))
+        return queryset
+
+
+class BulkEnrollmentSerializer(serializers.Serializer):
+    """Users to enroll into / unenroll from a course, by id and/or username."""
+    MAX_USERS = 10000
+
+    action = serializers.ChoiceField(choices=['enroll', 'unenroll'], default='enroll')
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=MAX_USERS)
+    usernames = serializers.ListField(child=serializers.CharField(), required=False, default=list, max_length=MAX_USERS)
+
+    def validate(self, data):
+        if not data['user_ids'] and not data['usernames']:
+            raise serializers.ValidationError("Provide user_ids and/or usernames.")
+        if len(data['user_ids']) + len(data['usernames']) > self.MAX_USERS:
+            raise serializers.ValidationError(f"At most {self.MAX_USERS} users per request.")
+        return data
@@ -0,0 +1,177 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from my_course.authentication import evict_tokens, evict_users
+from my_course.cache import bump_catalog_version
+from my_course.categories import category_key, count_courses, resolve_category
+from my_course.enrollment import count_enrollments, recount
+from my_course.fragments import forget_fragments
+from my_course.models import Course
+from my_course.roles import forget_roles
+
+"""
+Signal handlers keeping the catalog response cache and HTTP validators in sync.
+The cache version is bumped right away (reads later in the same transaction) and again on commit,
+    so a response cached by another request before the commit is not served afterwards.
+Enrollment and group changes also move `update_date` of the courses they show up in (ETag/Last-Modified).
+Enrollment changes made outside enrollment.py also maintain `enrolled_count` (see enrollment.py).
+Course saves and deletions link the course to its Category and move the course counts (see categories.py).
+`update_date` is also the stamp of the cached course fragments (see fragments.py): owner and student
+    renames move it, deletions drop the fragment.
+Group changes drop the cached roles of the users involved (see roles.py), on the spot and again on commit.
+Token deletions (logout, user deletion), user saves and group changes evict cached tokens (see authentication.py).
+"""
+
+
+# User fields shown by the course payloads: the owner's username, the nested students (UserSerializer)
+SHOWN_USER_FIELDS = {"username", "email", "first_name", "last_name"}
+
+
+def invalidate_catalog():
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+def invalidate_roles(user_ids):
+    user_ids = set(user_ids)
+    forget_roles(user_ids)
+    evict_users(user_ids)
+    transaction.on_commit(lambda: (forget_roles(user_ids), evict_users(user_ids)))
+
+
+def touch_courses(queryset):
+    # update() skips post_save on purpose: the catalog is invalidated by the caller
+    queryset.update(update_date=timezone.now())
+
+
+def changed_pks(instance, action, reverse, pk_set):
+    """
+    Primary keys on the "other" side of an m2m change: forward changes are about `instance`,
+    reverse ones about `pk_set`. A reverse clear has no pk_set, it is captured on pre_clear.
+    """
+    if not reverse:
+        return {instance.pk}
+    if action == "post_clear":
+        return getattr(instance, "_cleared_pks", set())
+    return pk_set or set()
+
+
+def remember_cleared(instance, action, reverse, related_name):
+    if action == "pre_clear" and reverse:
+        instance._cleared_pks = set(getattr(instance, related_name).values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(pre_save, sender=Course)
+def course_saving(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and "category" not in update_fields:
+        return
+    # The category the course leaves, read before its row is overwritten
+    previous = None
+    if instance.pk is not None:
+        previous = Course.objects.using(using).filter(pk=instance.pk).values_list("category_ref_id", "category").first()
+    left_id, left_text = previous or (None, "")
+    instance._left_category_id = left_id
+    if left_id is None or category_key(left_text) != category_key(instance.category):
+        instance.category_ref_id = resolve_category(instance.category, using)
+    else:
+        instance.category_ref_id = left_id
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, using, update_fields=None, **kwargs):
+    if "_left_category_id" not in instance.__dict__:
+        return
+    left_id = instance.__dict__.pop("_left_category_id")
+    if update_fields is not None and "category_ref" not in update_fields:
+        Course.objects.using(using).filter(pk=instance.pk).update(category_ref_id=instance.category_ref_id)
+    if left_id != instance.category_ref_id:
+        count_courses(left_id, -1, using)
+        count_courses(instance.category_ref_id, 1, using)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, using, **kwargs):
+    count_courses(instance.category_ref_id, -1, using)
+    forget_fragments([instance.pk])
+
+
+def count_changed(action, reverse, course_ids, pk_set):
+    # Added pks are exactly the new rows; removals name requested pks, which may not have been enrolled
+    if action == "post_add":
+        count_enrollments(course_ids, 1 if reverse else len(pk_set))
+    else:
+        recount(course_ids)
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def enrollment_changed(sender, instance, action, reverse, model, pk_set, counted=False, **kwargs):
+    remember_cleared(instance, action, reverse, "enrolled_courses")
+    if action in ("post_add", "post_remove", "post_clear"):
+        course_ids = changed_pks(instance, action, reverse, pk_set)
+        if not counted:
+            count_changed(action, reverse, course_ids, pk_set)
+        touch_courses(Course.objects.filter(pk__in=course_ids))
+        invalidate_catalog()
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Owner links are nulled and enrollments cascade in SQL, without Course signals
+    count_enrollments(Course.objects.filter(students=instance).values("pk"), -1)
+    touch_courses(Course.objects.filter(Q(user=instance) | Q(students=instance)))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Their token is gone already (token_deleted), the local tier is also swept by user id
+    evict_users([instance.pk])
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Cached tokens carry the user's fields (is_active, username...)
+    if not created:
+        evict_users([instance.pk])
+    # Courses show their owner and enrolled students; logins only save last_login or password
+    if not created and (update_fields is None or SHOWN_USER_FIELDS.intersection(update_fields)):
+        touch_courses(Course.objects.filter(Q(user=instance) | Q(students=instance)))
+        invalidate_catalog()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    evict_tokens([instance.key])
+    transaction.on_commit(lambda: evict_tokens([instance.key]))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def student_groups_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Course detail nests every enrolled student with their groups
+    remember_cleared(instance, action, reverse, "user_set")
+    if action in ("post_add", "post_remove", "post_clear"):
+        user_ids = changed_pks(instance, action, reverse, pk_set)
+        invalidate_roles(user_ids)
+        touch_courses(Course.objects.filter(students__in=user_ids))
+        invalidate_catalog()
+
+
+@receiver(post_save, sender=Group)
+def group_renamed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_roles(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Memberships cascade in SQL, without m2m signals
+    invalidate_roles(instance.user_set.values_list("pk", flat=True))
@@ -0,0 +1,38 @@
+import pytest
+from django.core.cache import caches
+from my_course.authentication import local_tokens
+from my_course.replicas import health
+from my_course.throttling import in_flight
+
+"""
+Caches outlive the per-test database rollback, start every test from empty ones.
+"""
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    local_tokens.clear()
+    yield
+
+"""
+Reads stay on the primary unless a test sends them to the replica mirrors (test_replicas.py).
+"""
+
+@pytest.fixture(autouse=True)
+def primary_reads(settings):
+    settings.DATABASE_REPLICAS = {}
+    health.clear()
+    yield
+
+"""
+Rate limits and load shedding are off unless a test sets them (test_throttling.py): bursts are other tests' subject.
+"""
+
+@pytest.fixture(autouse=True)
+def no_limits(settings):
+    settings.THROTTLE_RATES = {}
+    settings.LOAD_SHED_MAX_EXPENSIVE = settings.LOAD_SHED_MAX_IN_FLIGHT = 0
+    in_flight.clear()
+    yield
+    in_flight.clear()
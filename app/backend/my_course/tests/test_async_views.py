@@ -0,0 +1,102 @@
+import pytest
+from django.contrib.auth.models import Group
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a few courses and an enrolled student with a token.
+"""
+
+@pytest.fixture
+def courses(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    return [
+        Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Fruits" if i % 2 else "Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            user=mentor,
+            available_until="2026-01-01",
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.fixture
+def student(django_user_model, courses):
+    user = django_user_model.objects.create_user(username="student", password="useruser")
+    user.groups.add(Group.objects.create(name="Student"))
+    courses[0].students.add(user)
+    courses[3].students.add(user)
+    return user
+
+
+@pytest.fixture
+def client(student):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=student).key}")
+    return client
+
+#---------------------- PAYLOAD PARITY TEST --------------------#
+
+"""
+Testing the async endpoints answer the same payloads as the DRF ones, anonymous and authenticated.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("authenticated", [False, True])
+@pytest.mark.parametrize(
+    "url", ["courses/", "courses/?category=fruits", "courses/{pk}/", "courses/categories/"]
+)
+def test_async_payloads_match_sync(courses, student, client, authenticated, url):
+    client = client if authenticated else APIClient()
+    url = url.format(pk=courses[0].pk)
+    sync = client.get(f"/api/{url}")
+    asynchronous = client.get(f"/api/async/{url}")
+    assert asynchronous.status_code == sync.status_code == 200
+    assert asynchronous.json() == sync.json()
+
+"""
+Testing my_enrollments matches the DRF action and requires a token.
+"""
+
+@pytest.mark.django_db
+def test_async_my_enrollments(courses, client):
+    response = client.get("/api/async/courses/my_enrollments/")
+    assert response.json() == client.get("/api/courses/my_enrollments/").json()
+    assert {course["id"] for course in response.json()["results"]} == {courses[0].id, courses[3].id}
+    assert APIClient().get("/api/async/courses/my_enrollments/").status_code == 401
+
+#---------------------- PAGINATION TEST --------------------#
+
+"""
+Testing the async list follows the same keyset cursors as the DRF list.
+"""
+
+@pytest.mark.django_db
+def test_async_pagination(courses):
+    client = APIClient()
+    url = "/api/async/courses/?page_size=2"
+    ids = []
+    while url:
+        data = client.get(url).json()
+        ids += [course["id"] for course in data["results"]]
+        url = data["next"]
+    assert ids == [course.id for course in reversed(courses)]
+    assert client.get("/api/async/courses/?cursor=bananas").status_code == 404
+
+#---------------------- ERROR TEST --------------------#
+
+"""
+Testing invalid tokens, unknown courses and writes are refused.
+"""
+
+@pytest.mark.django_db
+def test_async_errors(courses):
+    client = APIClient()
+    assert client.get("/api/async/courses/0/").status_code == 404
+    assert client.post("/api/async/courses/", {}).status_code == 405
+    client.credentials(HTTP_AUTHORIZATION="Token bananas")
+    assert client.get("/api/async/courses/").status_code == 401
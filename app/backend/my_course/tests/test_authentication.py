@@ -0,0 +1,129 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from my_course import authentication
+from my_course.authentication import TokenCache, local_tokens
+
+"""
+Fixture that can be re-used if needed a student authenticated by token.
+"""
+
+@pytest.fixture
+def student(django_user_model):
+    return django_user_model.objects.create_user(username="student", password="useruser")
+
+
+@pytest.fixture
+def client(student):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=student).key}")
+    return client
+
+
+@pytest.fixture
+def local_tier(monkeypatch):
+    # Opt in to the in-process tier, off by default
+    monkeypatch.setattr(local_tokens, "ttl", 30)
+
+
+def token_queries(client, url="/api/courses/my_enrollments/"):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return sum("authtoken_token" in query["sql"] or "auth_group" in query["sql"] for query in ctx.captured_queries)
+
+#---------------------- TOKEN CACHE TEST --------------------#
+
+"""
+Testing only the first authenticated request reads the token, user and groups from the database,
+    every request does with the local tier off.
+"""
+
+@pytest.mark.django_db
+def test_token_resolved_from_cache(student, client, monkeypatch):
+    assert token_queries(client) == 2
+    assert token_queries(client) == 2
+
+    monkeypatch.setattr(local_tokens, "ttl", 30)
+    assert token_queries(client) == 2
+    assert token_queries(client) == 0
+    assert client.get("/api/users/me/").json()["username"] == "student"
+
+"""
+Testing the shared tier answers a process whose local tier is empty.
+"""
+
+@pytest.mark.django_db
+def test_shared_token_cache(student, client, settings, local_tier):
+    settings.AUTH_TOKEN_CACHE_ALIAS = "default"
+    assert token_queries(client) == 2
+    local_tokens.clear()
+    assert token_queries(client) == 0
+    assert len(local_tokens) == 1
+
+#---------------------- EVICTION TEST --------------------#
+
+"""
+Testing logout, deactivation and deletion revoke a cached token right away, in both tiers.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("shared", [False, True])
+def test_logout_evicts_token(student, client, settings, shared):
+    settings.AUTH_TOKEN_CACHE_ALIAS = "default" if shared else ""
+    token_queries(client)
+    assert client.post("/api/users/logout/").status_code == 200
+    assert client.get("/api/courses/my_enrollments/").status_code == 401
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("shared", [False, True])
+def test_inactive_or_deleted_user_evicted(student, client, settings, shared):
+    settings.AUTH_TOKEN_CACHE_ALIAS = "default" if shared else ""
+    token_queries(client)
+    student.is_active = False
+    student.save()
+    assert client.get("/api/courses/my_enrollments/").status_code == 401
+
+    student.is_active = True
+    student.save()
+    token_queries(client)
+    student.delete()
+    assert client.get("/api/courses/my_enrollments/").status_code == 401
+
+"""
+Testing a logout in one process is refused right away by another one that served the token before.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("shared", [False, True])
+def test_logout_reaches_other_processes(student, client, settings, monkeypatch, shared):
+    settings.AUTH_TOKEN_CACHE_ALIAS = "default" if shared else ""
+    processes = [TokenCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL) for _ in range(2)]
+    for process in processes:
+        monkeypatch.setattr(authentication, "local_tokens", process)
+        token_queries(client)
+
+    monkeypatch.setattr(authentication, "local_tokens", processes[0])
+    assert client.post("/api/users/logout/").status_code == 200
+    monkeypatch.setattr(authentication, "local_tokens", processes[1])
+    assert client.get("/api/courses/my_enrollments/").status_code == 401
+
+"""
+Testing the local tier is bounded and its entries expire.
+"""
+
+def test_token_cache_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(authentication.time, "monotonic", lambda: now[0])
+    cache = TokenCache(maxsize=2, ttl=30)
+    for key in "abc":
+        cache.set(key, {"user": {"id": key}})
+    assert cache.get("a") is None
+    assert cache.get("b") and cache.get("c")
+
+    now[0] += 31
+    assert cache.get("b") is None
+    assert len(cache) == 1
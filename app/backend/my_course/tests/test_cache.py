@@ -0,0 +1,110 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a course and a student.
+"""
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    return Course.objects.create(
+        course_title="Bananas",
+        category="Bananas",
+        school_name="Bananas",
+        author="Bananas",
+        user=mentor,
+        available_until="2026-01-01",
+    )
+
+
+@pytest.fixture
+def student(django_user_model):
+    user = django_user_model.objects.create_user(username="student", password="useruser")
+    user.groups.add(Group.objects.create(name="Student"))
+    return user
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), len(ctx.captured_queries)
+
+#---------------------- RESPONSE CACHE TEST --------------------#
+
+"""
+Testing anonymous list, detail and categories are served from the cache, only their validator is queried.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/courses/", "/api/courses/{pk}/", "/api/courses/categories/"])
+def test_anonymous_responses_are_cached(course, url):
+    client = APIClient()
+    url = url.format(pk=course.pk)
+    first, queries = get(client, url)
+    assert queries > 0
+    second, queries = get(client, url)
+    # The conditional GET aggregate, the local-memory cache keeps no validators
+    assert queries == 1
+    assert first == second
+
+"""
+Testing the query string is part of the cache key.
+"""
+
+@pytest.mark.django_db
+def test_filters_are_cached_separately(course):
+    client = APIClient()
+    get(client, "/api/courses/")
+    data, queries = get(client, "/api/courses/?category=Apples")
+    assert queries > 0
+    assert data["results"] == []
+
+"""
+Testing an enrollment invalidates the cached list and detail.
+"""
+
+@pytest.mark.django_db
+def test_enrollment_invalidates_cache(course, student):
+    client = APIClient()
+    get(client, "/api/courses/")
+    get(client, f"/api/courses/{course.pk}/")
+    course.students.add(student)
+    data, _ = get(client, "/api/courses/")
+    assert data["results"][0]["student_count"] == 1
+    data, _ = get(client, f"/api/courses/{course.pk}/")
+    assert [user["username"] for user in data["students"]] == ["student"]
+
+"""
+Testing a course edit and a course deletion invalidate the cache.
+"""
+
+@pytest.mark.django_db
+def test_course_changes_invalidate_cache(course):
+    client = APIClient()
+    get(client, "/api/courses/categories/")
+    course.category = "Apples"
+    course.save()
+    data, _ = get(client, "/api/courses/categories/")
+    assert [category["name"] for category in data["categories"]] == ["Apples"]
+    course.delete()
+    data, _ = get(client, "/api/courses/")
+    assert data["results"] == []
+
+"""
+Testing authenticated users always get their own fresh response.
+"""
+
+@pytest.mark.django_db
+def test_authenticated_requests_bypass_cache(course, student):
+    client = APIClient()
+    get(client, "/api/courses/")
+    client.force_authenticate(student)
+    data, queries = get(client, "/api/courses/")
+    assert queries > 0
+    assert data["results"][0]["is_enrolled"] is False
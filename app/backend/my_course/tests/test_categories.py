@@ -0,0 +1,111 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from my_course.categories import sync_categories
+from my_course.models import Category, Course
+
+"""
+Fixture that can be re-used if needed a mentor able to create courses.
+"""
+
+@pytest.fixture
+def mentor(django_user_model):
+    user = django_user_model.objects.create_user(username="mentor", password="useruser")
+    user.groups.add(Group.objects.create(name="Mentor"))
+    return user
+
+
+def create(category, **fields):
+    return Course.objects.create(
+        course_title="Bananas", category=category, school_name="Bananas", author="Bananas",
+        available_until="2026-01-01", **fields,
+    )
+
+
+def counts():
+    return dict(Category.objects.values_list("name", "course_count"))
+
+#---------------------- CATEGORY INDEX TEST --------------------#
+
+"""
+Testing spellings of a category share one Category, named after the first one, and counts follow
+    course creations, category changes and deletions.
+"""
+
+@pytest.mark.django_db
+def test_counts_follow_courses():
+    first = create("Data  Science")
+    second = create(" data science")
+    other = create("Cooking")
+    assert counts() == {"Data Science": 2, "Cooking": 1}
+    assert first.category_ref_id == second.category_ref_id
+
+    second.category = "COOKING"
+    second.save()
+    assert counts() == {"Data Science": 1, "Cooking": 2}
+    other.save()
+    assert counts() == {"Data Science": 1, "Cooking": 2}
+
+    first.delete()
+    other.delete()
+    assert counts() == {"Data Science": 0, "Cooking": 1}
+
+"""
+Testing categories are served with their counts, empty ones left out, and the list filters by category id.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["/api/courses/", "/api/async/courses/"])
+def test_categories_endpoint(prefix):
+    apples = create("Apples")
+    create("apples")
+    create("Kiwis").delete()
+    create("Bananas")
+    client = APIClient()
+
+    categories = client.get(f"{prefix}categories/").json()["categories"]
+    assert [(category["name"], category["course_count"]) for category in categories] == [("Apples", 2), ("Bananas", 1)]
+
+    response = client.get(f"{prefix}?category_id={apples.category_ref_id}").json()
+    assert {course["category_id"] for course in response["results"]} == {apples.category_ref_id}
+    assert len(response["results"]) == 2
+    assert client.get(f"{prefix}?category_id=apples").status_code == 400
+
+"""
+Testing courses created through the API are indexed.
+"""
+
+@pytest.mark.django_db
+def test_api_course_is_indexed(mentor):
+    client = APIClient()
+    client.force_authenticate(mentor)
+    response = client.post("/api/courses/", {
+        "course_title": "Kiwis", "category": "Kiwis", "school_name": "Kiwis",
+        "author": "Kiwis", "available_until": "2026-01-01",
+    }, format="json")
+    assert response.status_code == 201
+    assert response.json()["category_id"] == Category.objects.get(name="Kiwis").pk
+    assert counts() == {"Kiwis": 1}
+
+"""
+Testing sync_categories() and its command repair courses written around the ORM.
+"""
+
+@pytest.mark.django_db
+def test_sync_categories():
+    kept = create("Apples")
+    Course.objects.bulk_create([
+        Course(course_title="Bulk", category=category, school_name="Bulk", author="Bulk", available_until="2026-01-01")
+        for category in ["Kiwis", "  Kiwis ", "Apples"]
+    ])
+    Course.objects.filter(pk=kept.pk).update(category="Kiwis")
+    before = Course.objects.get(pk=kept.pk).update_date
+    assert sync_categories() == 4
+    assert counts() == {"Apples": 1, "Kiwis": 3}
+    # Relinked courses move their validators and fragment stamp
+    assert Course.objects.get(pk=kept.pk).update_date > before
+
+    Category.objects.update(course_count=0)
+    call_command("sync_categories")
+    assert counts() == {"Apples": 1, "Kiwis": 3}
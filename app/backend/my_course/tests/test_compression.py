@@ -0,0 +1,125 @@
+import gzip
+import json
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from my_course.compression import negotiate
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a catalog large enough to be compressed, and an admin API client.
+"""
+
+@pytest.fixture
+def courses(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    return [
+        Course.objects.create(
+            course_title=f"Bananas {i}", category="Bananas", school_name="Bananas", author="Bananas",
+            description="Ripe bananas " * 50, price=i, user=mentor, available_until="2026-01-01",
+        )
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    admin = django_user_model.objects.create_superuser(username="admin", password="useruser")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=admin).key}")
+    return client
+
+#---------------------- NEGOTIATION TEST --------------------#
+
+"""
+Testing the server's preference wins ties, the client's q-values win otherwise, q=0 refuses.
+"""
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ["br", "gzip"]) == expected
+
+#---------------------- RESPONSE COMPRESSION TEST --------------------#
+
+"""
+Testing large JSON responses are gzipped for clients asking for it, with the same document inside.
+"""
+
+@pytest.mark.django_db
+def test_gzip_list(courses, settings):
+    settings.COMPRESSION_ENCODINGS = ["gzip"]
+    client = APIClient()
+    plain = client.get("/api/courses/")
+    assert not plain.has_header("Content-Encoding")
+    assert "Accept-Encoding" in plain["Vary"]
+
+    response = client.get("/api/courses/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert int(response["Content-Length"]) == len(response.content) < len(plain.content)
+    assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+"""
+Testing brotli is preferred when installed.
+"""
+
+@pytest.mark.django_db
+def test_brotli_list(courses, settings):
+    brotli = pytest.importorskip("brotli")
+    settings.COMPRESSION_ENCODINGS = ["br", "gzip"]
+    client = APIClient()
+    response = client.get("/api/courses/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.content)) == client.get("/api/courses/").json()
+
+"""
+Testing small bodies and POST responses are never compressed.
+"""
+
+@pytest.mark.django_db
+def test_not_compressed(courses, settings, django_user_model):
+    settings.COMPRESSION_MIN_SIZE = 10 ** 6
+    assert not APIClient().get("/api/courses/", HTTP_ACCEPT_ENCODING="gzip").has_header("Content-Encoding")
+
+    settings.COMPRESSION_MIN_SIZE = 0
+    django_user_model.objects.create_user(username="student", password="useruser")
+    response = APIClient().post(
+        "/api/users/login/", {"username": "student", "password": "useruser"}, format="json", HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding")
+
+"""
+Testing the ETag of a compressed response is weak and still revalidates.
+"""
+
+@pytest.mark.django_db
+def test_compressed_etag(courses):
+    client = APIClient()
+    etag = client.get("/api/courses/", HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+    assert etag.startswith('W/"')
+    assert client.get("/api/courses/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+"""
+Testing streamed exports are compressed chunk by chunk and decompress to the plain export.
+"""
+
+@pytest.mark.django_db
+def test_gzip_export(courses, admin_client, settings):
+    settings.COMPRESSION_ENCODINGS = ["gzip"]
+    plain = b"".join(admin_client.get("/api/export/courses/").streaming_content)
+
+    response = admin_client.get("/api/export/courses/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.streaming
+    assert response["Content-Encoding"] == "gzip"
+    assert not response.has_header("Content-Length")
+    assert gzip.decompress(b"".join(response.streaming_content)) == plain
@@ -0,0 +1,172 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.cache import bump_catalog_version
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed two courses and a student.
+"""
+
+@pytest.fixture
+def courses(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    return [
+        Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            user=mentor,
+            available_until="2026-01-01",
+        )
+        for i in range(2)
+    ]
+
+
+@pytest.fixture
+def student(django_user_model):
+    return django_user_model.objects.create_user(username="student", password="useruser")
+
+
+def revalidate(client, url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, headers=headers)
+    return response, len(ctx.captured_queries)
+
+#---------------------- CONDITIONAL GET TEST --------------------#
+
+"""
+Testing a matching If-None-Match gets a 304 after a single query, none once validators are in a shared cache.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/courses/", "/api/courses/?category=bananas", "/api/courses/categories/"])
+def test_list_not_modified(courses, url, monkeypatch):
+    client = APIClient()
+    etag = client.get(url)["ETag"]
+    response, queries = revalidate(client, url, if_none_match=etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    # Local-memory cache: one aggregate query, no serialization
+    assert queries == 1
+
+    monkeypatch.setattr("my_course.conditional.cache_is_shared", lambda: True)
+    revalidate(client, url, if_none_match=etag)
+    response, queries = revalidate(client, url, if_none_match=etag)
+    assert response.status_code == 304
+    assert queries == 0
+
+"""
+Testing an authenticated 304 skips the serializer as well.
+"""
+
+@pytest.mark.django_db
+def test_authenticated_list_not_modified(courses, student):
+    client = APIClient()
+    client.force_authenticate(student)
+    etag = client.get("/api/courses/")["ETag"]
+    response, queries = revalidate(client, "/api/courses/", if_none_match=etag)
+    assert response.status_code == 304
+    assert queries <= 1
+
+"""
+Testing enrollments and deletions change the list ETag.
+"""
+
+@pytest.mark.django_db
+def test_list_changes_invalidate_etag(courses, student):
+    client = APIClient()
+    etag = client.get("/api/courses/")["ETag"]
+    student.enrolled_courses.add(courses[0])
+    response, _ = revalidate(client, "/api/courses/", if_none_match=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][-1]["student_count"] == 1
+
+    etag = response["ETag"]
+    courses[1].delete()
+    response, _ = revalidate(client, "/api/courses/", if_none_match=etag)
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 1
+
+"""
+Testing each user gets their own ETag since is_enrolled differs.
+"""
+
+@pytest.mark.django_db
+def test_etag_is_per_user(courses, student):
+    client = APIClient()
+    etag = client.get("/api/courses/")["ETag"]
+    client.force_authenticate(student)
+    response, _ = revalidate(client, "/api/courses/", if_none_match=etag)
+    assert response.status_code == 200
+    assert "Authorization" in response["Vary"]
+
+"""
+Testing course detail honours If-Modified-Since until the course is edited.
+"""
+
+@pytest.mark.django_db
+def test_detail_last_modified(courses):
+    client = APIClient()
+    url = f"/api/courses/{courses[0].pk}/"
+    last_modified = client.get(url)["Last-Modified"]
+    response, queries = revalidate(client, url, if_modified_since=last_modified)
+    assert response.status_code == 304
+    assert queries <= 1
+
+    # Out-of-band write, signals do not fire for update()
+    Course.objects.filter(pk=courses[0].pk).update(update_date=courses[0].update_date.replace(year=2030))
+    bump_catalog_version()
+    response, _ = revalidate(client, url, if_modified_since=last_modified)
+    assert response.status_code == 200
+
+"""
+Testing a write served by another worker, bumping the version in its own local cache, is not answered with a 304.
+"""
+
+@pytest.mark.django_db
+def test_write_on_another_worker(courses, student, monkeypatch):
+    client = APIClient()
+    client.force_authenticate(student)
+    url = f"/api/courses/{courses[0].pk}/"
+    etag = client.get(url)["ETag"]
+    assert revalidate(client, url, if_none_match=etag)[0].status_code == 304
+
+    other = LocMemCache("other-worker", {})
+    with monkeypatch.context() as patch:
+        patch.setattr("my_course.cache.get_cache", lambda: other)
+        courses[0].students.add(student)
+    response, _ = revalidate(client, url, if_none_match=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+"""
+Testing a student rename changes the ETag of the courses nesting them.
+"""
+
+@pytest.mark.django_db
+def test_detail_student_rename(courses, student):
+    courses[0].students.add(student)
+    client = APIClient()
+    url = f"/api/courses/{courses[0].pk}/"
+    etag = client.get(url)["ETag"]
+    assert revalidate(client, url, if_none_match=etag)[0].status_code == 304
+
+    student.username = "renamed"
+    student.save()
+    response, _ = revalidate(client, url, if_none_match=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+"""
+Testing an unknown course is still a 404.
+"""
+
+@pytest.mark.django_db
+def test_detail_not_found(courses):
+    assert APIClient().get("/api/courses/999999/").status_code == 404
+    assert APIClient().get("/api/courses/bananas/").status_code == 404
@@ -0,0 +1,216 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from my_course.enrollment import Enrollment
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a mentor's course and a few students.
+"""
+
+@pytest.fixture
+def mentor(django_user_model):
+    user = django_user_model.objects.create_user(username="mentor", password="useruser")
+    user.groups.add(Group.objects.create(name="Mentor"))
+    return user
+
+
+@pytest.fixture
+def course(mentor):
+    return Course.objects.create(
+        course_title="Bananas",
+        category="Bananas",
+        school_name="Bananas",
+        author="Bananas",
+        user=mentor,
+        available_until="2026-01-01",
+    )
+
+
+@pytest.fixture
+def students(django_user_model):
+    return [django_user_model.objects.create_user(username=f"student{i}") for i in range(20)]
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get_or_create(user=user)[0].key}")
+    return client
+
+
+def hammer(calls):
+    """Run every call in its own thread, all released together; each thread closes its connection."""
+    barrier = Barrier(len(calls))
+
+    def run(call):
+        try:
+            barrier.wait(timeout=30)
+            return call()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(len(calls)) as pool:
+        return list(pool.map(run, calls))
+
+#---------------------- ENROLL TEST --------------------#
+
+"""
+Testing enroll and unenroll report whether the enrollment changed, without loading the students.
+"""
+
+@pytest.mark.django_db
+def test_enroll_is_idempotent(course, students):
+    course.students.add(*students[1:])
+    client = client_for(students[0])
+    url = f"/api/courses/{course.pk}/"
+    client.get("/api/courses/my_enrollments/")  # token cached
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.post(url + "enroll/").json()["changed"] is True
+    enrollment_queries = [query["sql"] for query in ctx.captured_queries if Enrollment._meta.db_table in query["sql"]]
+    assert len(enrollment_queries) == 1 and enrollment_queries[0].startswith("INSERT")
+    assert client.post(url + "enroll/").json() == {"message": "Already enrolled", "changed": False}
+    assert course.students.count() == 20
+
+    assert client.post(url + "unenroll/").json()["changed"] is True
+    assert client.post(url + "unenroll/").json() == {"message": "Not enrolled", "changed": False}
+    assert not course.students.filter(pk=students[0].pk).exists()
+
+"""
+Testing enrollment changes still refresh the cached catalog.
+"""
+
+@pytest.mark.django_db
+def test_enroll_invalidates_catalog(course, students):
+    client = client_for(students[0])
+    assert client.get(f"/api/courses/{course.pk}/").json()["student_count"] == 0
+    client.post(f"/api/courses/{course.pk}/enroll/")
+    assert APIClient().get("/api/courses/").json()["results"][0]["student_count"] == 1
+    assert client.get(f"/api/courses/{course.pk}/").json()["is_enrolled"] is True
+
+#---------------------- CONCURRENCY TEST --------------------#
+
+"""
+Testing concurrent enrolls of one user record a single enrollment and a single change.
+"""
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_enroll_same_user(course, students):
+    url = f"/api/courses/{course.pk}/enroll/"
+    client_for(students[0])
+    responses = hammer([lambda: client_for(students[0]).post(url) for _ in range(32)])
+    assert all(response.status_code == 200 for response in responses)
+    assert sum(response.json()["changed"] for response in responses) == 1
+    assert course.students.count() == 1
+
+"""
+Testing concurrent enrolls and unenrolls of many users leave a consistent enrollment table.
+"""
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_enroll_many_users(course, students):
+    url = f"/api/courses/{course.pk}/"
+    clients = [client_for(student) for student in students]
+    responses = hammer([lambda c=c: c.post(url + "enroll/") for c in clients] * 2)
+    assert sum(response.json()["changed"] for response in responses) == len(students)
+    assert course.students.count() == len(students)
+
+    responses = hammer([lambda c=c: c.post(url + "unenroll/") for c in clients[:10]] * 2)
+    assert sum(response.json()["changed"] for response in responses) == 10
+    assert set(course.students.values_list("pk", flat=True)) == {student.pk for student in students[10:]}
+    course.refresh_from_db()
+    assert course.enrolled_count == len(students) - 10
+
+#---------------------- ENROLLED COUNT TEST --------------------#
+
+def enrolled_count(course):
+    return Course.objects.values_list("enrolled_count", flat=True).get(pk=course.pk)
+
+"""
+Testing enrolled_count follows the enrollment table through the API and through the related managers.
+"""
+
+@pytest.mark.django_db
+def test_enrolled_count(course, students):
+    client = client_for(students[0])
+    client.post(f"/api/courses/{course.pk}/enroll/")
+    client.post(f"/api/courses/{course.pk}/enroll/")
+    assert enrolled_count(course) == 1
+
+    course.students.add(*students[:5])
+    assert enrolled_count(course) == 5
+    course.students.remove(students[1], students[10])
+    assert enrolled_count(course) == 4
+    students[2].enrolled_courses.add(course)
+    students[11].enrolled_courses.add(course)
+    assert enrolled_count(course) == 5
+    students[11].enrolled_courses.clear()
+    students[3].delete()
+    assert enrolled_count(course) == 3
+    assert client.get(f"/api/courses/{course.pk}/").json()["student_count"] == 3
+
+    course.students.clear()
+    assert enrolled_count(course) == 0
+
+"""
+Testing the repair command recounts courses changed behind the ORM's back.
+"""
+
+@pytest.mark.django_db
+def test_recount_enrollments_command(course, students):
+    course.students.add(*students)
+    Enrollment.objects.filter(user__in=students[:5]).delete()
+    Course.objects.filter(pk=course.pk).update(enrolled_count=100)
+    call_command("recount_enrollments", batch_size=1)
+    assert enrolled_count(course) == 15
+
+#---------------------- BULK ENROLLMENT TEST --------------------#
+
+"""
+Testing a mentor enrolls and unenrolls users in bulk, by id and username, unknown ones reported.
+"""
+
+@pytest.mark.django_db
+def test_bulk_enrollment(mentor, course, students):
+    course.students.add(students[0])
+    client = client_for(mentor)
+    url = f"/api/courses/{course.pk}/bulk_enrollment/"
+    payload = {
+        "user_ids": [student.pk for student in students[:10]] + [10 ** 9],
+        "usernames": [student.username for student in students[5:]] + ["nobody"],
+    }
+    assert client.post(url, payload, format="json").json() == {
+        "action": "enroll",
+        "changed": 19,
+        "unchanged": 1,
+        "unknown_user_ids": [10 ** 9],
+        "unknown_usernames": ["nobody"],
+    }
+    assert course.students.count() == 20
+
+    response = client.post(url, {"action": "unenroll", "usernames": [s.username for s in students[:5]]}, format="json")
+    assert response.json()["changed"] == 5
+    assert course.students.count() == 15
+
+"""
+Testing bulk enrollment is refused to students and to mentors of other courses, and validated.
+"""
+
+@pytest.mark.django_db
+def test_bulk_enrollment_permissions(django_user_model, course, students):
+    url = f"/api/courses/{course.pk}/bulk_enrollment/"
+    payload = {"user_ids": [students[0].pk]}
+    other = django_user_model.objects.create_user(username="other")
+    other.groups.add(Group.objects.get(name="Mentor"))
+
+    assert client_for(students[0]).post(url, payload, format="json").status_code == 403
+    assert client_for(other).post(url, payload, format="json").status_code == 403
+    assert APIClient().post(url, payload, format="json").status_code == 401
+    assert client_for(course.user).post(url, {}, format="json").status_code == 400
+    assert not course.students.exists()
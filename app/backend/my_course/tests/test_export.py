@@ -0,0 +1,143 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from typer.testing import CliRunner
+from cli.cli import app
+from my_course.export import ExportStream, course_record
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a few courses, one of them without owner.
+"""
+
+@pytest.fixture
+def courses(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    courses = [
+        Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            description="Bananas, \"ripe\"\nand yellow",
+            price="9.99",
+            user=mentor if i else None,
+            available_until="2026-01-01",
+        )
+        for i in range(5)
+    ]
+    return courses
+
+
+def list_courses(*args):
+    result = CliRunner().invoke(app, ["list-courses", *args])
+    assert result.exit_code == 0, result.output
+    return result
+
+#---------------------- CLI EXPORT TEST --------------------#
+
+"""
+Testing every export format round-trips the catalog, newest first, ownerless courses included.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("format", ["json", "jsonl", "csv"])
+@pytest.mark.parametrize("compressed", [False, True])
+def test_list_courses_export(courses, tmp_path, format, compressed):
+    output = tmp_path / f"export.{format}"
+    args = ["--save", "--quiet", "--format", format, "--output", str(output), "--chunk-size", "2"]
+    list_courses(*args, *(["--gzip"] if compressed else []))
+
+    path = f"{output}.gz" if compressed else output
+    with (gzip.open(path, "rt", newline="") if compressed else open(path, newline="")) as f:
+        if format == "json":
+            rows = json.load(f)
+        elif format == "jsonl":
+            rows = [json.loads(line) for line in f]
+        else:
+            rows = list(csv.DictReader(f))
+
+    assert [int(row["id"]) for row in rows] == [course.id for course in reversed(courses)]
+    assert rows[-1]["user"] in (None, "")
+    assert rows[0]["user"] == "mentor"
+    assert rows[0]["description"] == "Bananas, \"ripe\"\nand yellow"
+
+"""
+Testing the table is still printed and an unknown format is refused.
+"""
+
+@pytest.mark.django_db
+def test_list_courses_print(courses, tmp_path):
+    assert "Bananas 4" in list_courses("--short").output
+    result = CliRunner().invoke(app, ["list-courses", "--save", "--format", "xml"])
+    assert result.exit_code == 1
+
+#---------------------- API EXPORT TEST --------------------#
+
+"""
+Fixture that can be re-used if needed an admin API client.
+"""
+
+@pytest.fixture
+def admin_client(django_user_model):
+    admin = django_user_model.objects.create_superuser(username="admin", password="useruser")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=admin).key}")
+    return client
+
+
+def streamed(response):
+    assert response.status_code == 200
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+"""
+Testing the course export streams NDJSON by default and CSV on demand, with the CLI's records.
+"""
+
+@pytest.mark.django_db
+def test_export_courses(courses, admin_client):
+    response = admin_client.get("/api/export/courses/")
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    rows = [json.loads(line) for line in streamed(response).splitlines()]
+    assert rows == [course_record(course) for course in Course.objects.order_by("id")]
+
+    response = admin_client.get("/api/export/courses/?format=csv")
+    assert response["Content-Disposition"] == 'attachment; filename="courses.csv"'
+    rows = list(csv.DictReader(io.StringIO(streamed(response))))
+    assert [int(row["id"]) for row in rows] == [course.id for course in courses]
+    assert rows[0]["user"] == "" and rows[1]["user"] == "mentor"
+
+"""
+Testing the enrollment export lists every pair, in chunks larger than one flush.
+"""
+
+@pytest.mark.django_db
+def test_export_enrollments(courses, admin_client, django_user_model, monkeypatch):
+    monkeypatch.setattr(ExportStream, "flush_rows", 3)
+    students = [django_user_model.objects.create_user(username=f"student{i}") for i in range(4)]
+    for course in courses[:2]:
+        course.students.add(*students)
+
+    response = admin_client.get("/api/export/enrollments/", HTTP_ACCEPT="text/csv")
+    chunks = list(response.streaming_content)
+    assert len(chunks) > 2
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["course_id", "user_id"]
+    assert rows[1:] == [[str(course.id), str(student.id)] for course in courses[:2] for student in students]
+
+"""
+Testing exports are refused to anyone but admins.
+"""
+
+@pytest.mark.django_db
+def test_export_admin_only(courses):
+    client = APIClient()
+    assert client.get("/api/export/courses/").status_code == 401
+    mentor = Course.objects.exclude(user=None).first().user
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=mentor).key}")
+    assert client.get("/api/export/enrollments/").status_code == 403
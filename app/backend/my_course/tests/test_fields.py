@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed three courses with long descriptions and an enrolled student.
+"""
+
+@pytest.fixture
+def student(django_user_model):
+    user = django_user_model.objects.create_user(username="student", password="useruser")
+    user.groups.add(Group.objects.create(name="Student"))
+    for i in range(3):
+        course = Course.objects.create(
+            course_title=f"Bananas {i}", category="Bananas", school_name="Bananas", author="Bananas",
+            description="Bananas " * 500, price=i, available_until="2026-01-01",
+        )
+        course.students.add(user)
+    return user
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    sql = " ".join(query["sql"] for query in ctx.captured_queries)
+    return response, sql
+
+#---------------------- SPARSE FIELDSETS TEST --------------------#
+
+"""
+Testing ?fields= keeps only the listed fields and never reads the description column, on every page.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["/api/courses/", "/api/async/courses/", "/api/courses/my_enrollments/"])
+def test_fields(student, prefix):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get_or_create(user=student)[0].key}")
+    response, sql = get(client, f"{prefix}?fields=id,course_title,price&page_size=2")
+    assert response.status_code == 200
+    assert [sorted(course) for course in response.json()["results"]] == [["course_title", "id", "price"]] * 2
+    assert '"description"' not in sql and "is_enrolled" not in sql
+
+    response, sql = get(client, response.json()["next"])
+    assert [course["course_title"] for course in response.json()["results"]] == ["Bananas 0"]
+    assert '"description"' not in sql
+
+"""
+Testing ?omit= drops fields from the list and the detail, the rest being unchanged.
+"""
+
+@pytest.mark.django_db
+def test_omit(student):
+    client = APIClient()
+    full = client.get("/api/courses/").json()["results"]
+    response, sql = get(client, "/api/courses/?omit=description,is_enrolled")
+    assert response.json()["results"] == [
+        {name: value for name, value in course.items() if name not in ("description", "is_enrolled")} for course in full
+    ]
+    assert '"description"' not in sql
+
+    course = Course.objects.first()
+    detail = client.get(f"/api/courses/{course.pk}/?omit=description&fields=id,students").json()
+    assert detail == {"id": course.pk, "students": [{
+        "id": student.pk, "username": "student", "email": "", "first_name": "", "last_name": "", "groups": ["Student"],
+    }]}
+
+"""
+Testing unknown fields are a 400, and writes ignore the parameters.
+"""
+
+@pytest.mark.django_db
+def test_unknown_fields(student):
+    client = APIClient()
+    assert client.get("/api/courses/?fields=id,secret").status_code == 400
+    assert client.get("/api/async/courses/?omit=secret").status_code == 400
+
+    mentor = student
+    mentor.groups.add(Group.objects.create(name="Mentor"))
+    client.force_authenticate(mentor)
+    response = client.post("/api/courses/?fields=id", {
+        "course_title": "Kiwis", "category": "Kiwis", "school_name": "Kiwis",
+        "author": "Kiwis", "available_until": "2026-01-01",
+    }, format="json")
+    assert response.status_code == 201
+    assert response.json()["course_title"] == "Kiwis"
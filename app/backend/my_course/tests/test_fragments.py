@@ -0,0 +1,86 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.cache import get_cache
+from my_course.fragments import fragment_key
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a mentor's courses and two students, one of them enrolled in the first course.
+"""
+
+@pytest.fixture
+def catalog(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    group = Group.objects.create(name="Student")
+    students = [django_user_model.objects.create_user(username=f"student{i}") for i in range(2)]
+    group.user_set.add(*students)
+    courses = [
+        Course.objects.create(
+            course_title=f"Bananas {i}", category="Bananas", school_name="Bananas", author="Bananas",
+            description="Ünïcode bananas " * 100, price=i, user=mentor, available_until="2026-01-01",
+        )
+        for i in range(4)
+    ]
+    courses[0].students.add(students[0])
+    return mentor, students, courses
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def get(client, url="/api/courses/"):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), " ".join(query["sql"] for query in ctx.captured_queries)
+
+#---------------------- COURSE FRAGMENT CACHE TEST --------------------#
+
+"""
+Testing assembled pages equal serialized ones, each user getting their own is_enrolled, and warm pages
+    never read full rows.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/courses/?page_size=3", "/api/courses/my_enrollments/"])
+def test_fragments_match_serializer(catalog, settings, url):
+    _, students, _ = catalog
+    settings.COURSE_FRAGMENT_CACHE_TIMEOUT = 0
+    expected = [get(client_for(student), url)[0] for student in students]
+
+    settings.COURSE_FRAGMENT_CACHE_TIMEOUT = 3600
+    assert get(client_for(students[0]), url)[0] == expected[0]
+    data, sql = get(client_for(students[1]), url)
+    assert data == expected[1]
+    assert '"description"' not in sql
+
+"""
+Testing course edits, owner renames and deletions reach the cached fragments.
+"""
+
+@pytest.mark.django_db
+def test_fragments_follow_changes(catalog):
+    mentor, students, courses = catalog
+    client = client_for(students[0])
+    get(client)
+
+    courses[1].course_title = "Kiwis"
+    courses[1].save()
+    mentor.username = "teacher"
+    mentor.save()
+    courses[2].delete()
+    courses[3].students.add(students[0])
+
+    data, _ = get(client)
+    by_id = {course["id"]: course for course in data["results"]}
+    assert by_id[courses[1].pk]["course_title"] == "Kiwis"
+    assert {course["user_username"] for course in data["results"]} == {"teacher"}
+    assert courses[2].pk not in by_id
+    assert by_id[courses[3].pk]["student_count"] == 1 and by_id[courses[3].pk]["is_enrolled"]
+    assert get_cache().get(fragment_key(courses[2].pk)) is None
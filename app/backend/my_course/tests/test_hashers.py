@@ -0,0 +1,71 @@
+import threading
+import pytest
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from rest_framework.test import APIClient
+from my_course import hashers
+
+"""
+Fixture that can be re-used if needed a user whose password was hashed with a legacy hasher,
+    and a record of the functions run on the hashing pool.
+"""
+
+@pytest.fixture
+def legacy_user(django_user_model):
+    legacy = "pbkdf2_sha1" if get_hasher().algorithm == "pbkdf2_sha256" else "pbkdf2_sha256"
+    user = django_user_model.objects.create(username="student")
+    user.password = make_password("useruser", hasher=legacy)
+    user.save()
+    return user
+
+
+@pytest.fixture
+def offloaded(monkeypatch):
+    calls = []
+    offload = hashers.offload
+
+    def spy(function, *args):
+        def run():
+            calls.append((function.__name__, threading.current_thread().name))
+            return function(*args)
+        return offload(run)
+
+    monkeypatch.setattr(hashers, "offload", spy)
+    return calls
+
+
+def login(username, password):
+    return APIClient().post("/api/users/login/", {"username": username, "password": password}, format="json")
+
+#---------------------- LOGIN HASHING TEST --------------------#
+
+"""
+Testing a legacy hash is verified on the hashing pool and upgraded to the preferred hasher on login.
+"""
+
+@pytest.mark.django_db
+def test_login_upgrades_hash(legacy_user, offloaded):
+    assert login("student", "useruser").status_code == 200
+    legacy_user.refresh_from_db()
+    assert identify_hasher(legacy_user.password).algorithm == get_hasher().algorithm
+    assert [name for name, _ in offloaded] == ["check_password", "make_password"]
+    assert all(thread.startswith("password-hash") for _, thread in offloaded)
+
+    offloaded.clear()
+    assert login("student", "useruser").status_code == 200
+    assert [name for name, _ in offloaded] == ["check_password"]
+
+"""
+Testing wrong passwords keep the stored hash, and unknown usernames pay a hash and get the same answer.
+"""
+
+@pytest.mark.django_db
+def test_login_failures(legacy_user, offloaded):
+    encoded = legacy_user.password
+    wrong = login("student", "bananas")
+    legacy_user.refresh_from_db()
+    assert legacy_user.password == encoded
+
+    unknown = login("nobody", "bananas")
+    assert wrong.status_code == unknown.status_code == 401
+    assert wrong.json() == unknown.json()
+    assert [name for name, _ in offloaded] == ["check_password", "make_password"]
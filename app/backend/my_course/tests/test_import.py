@@ -0,0 +1,132 @@
+import gzip
+import io
+import json
+import pytest
+from typer.testing import CliRunner
+from cli.cli import app
+from my_course.importer import read_json_array
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a few courses, one of them without owner.
+"""
+
+@pytest.fixture
+def courses(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    return [
+        Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            description="Bananas, \"ripe\"\nand yellow",
+            price="9.99",
+            user=mentor if i else None,
+            available_until="2026-01-01",
+        )
+        for i in range(5)
+    ]
+
+
+def invoke(*args, exit_code=0):
+    result = CliRunner().invoke(app, list(args))
+    assert result.exit_code == exit_code, result.output
+    return result
+
+
+def catalog():
+    return list(Course.objects.order_by("id").values_list("id", "course_title", "price", "user__username"))
+
+#---------------------- CLI IMPORT TEST --------------------#
+
+"""
+Testing a `list-courses --save` export imports back in every format: known ids are updated,
+    deleted ones come back with their owner, and new courses still get fresh ids.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("format", ["json", "jsonl", "csv"])
+def test_import_courses_round_trip(courses, tmp_path, format):
+    output = tmp_path / f"export.{format}"
+    invoke("list-courses", "--save", "--quiet", "--format", format, "--output", str(output))
+    expected = catalog()
+    Course.objects.filter(pk=courses[0].pk).update(course_title="Renamed")
+    Course.objects.filter(pk__in=[course.pk for course in courses[3:]]).delete()
+
+    result = invoke("import-courses", str(output), "--batch-size", "2")
+    assert "5 courses imported" in result.output
+    assert catalog() == expected
+    assert not (tmp_path / f"export.{format}.errors.jsonl").exists()
+
+    created = Course.objects.create(
+        course_title="New", category="New", school_name="New", author="New", available_until="2026-01-01",
+    )
+    assert created.id > courses[-1].id
+
+"""
+Testing invalid rows are written to the error file with their errors while the others are imported.
+"""
+
+@pytest.mark.django_db
+def test_import_courses_rejects(courses, tmp_path):
+    valid = {"course_title": "Kiwis", "category": "Kiwis", "school_name": "Kiwis", "author": "Kiwis",
+             "price": "1.50", "available_until": "2026-01-01", "user": "mentor"}
+    rows = [
+        valid,
+        {**valid, "price": "free"},
+        {**valid, "user": "nobody"},
+        {**valid, "course_title": ""},
+        {**valid, "id": "banana"},
+        {**valid, "school_name": "Kiwis school", "user": courses[1].user_id},
+    ]
+    source = tmp_path / "courses.jsonl"
+    source.write_text("".join(json.dumps(row) + "\n" for row in rows) + "{not json\n")
+
+    result = invoke("import-courses", str(source), "--errors", str(tmp_path / "rejected.jsonl"))
+    assert "2 courses imported" in result.output
+    assert "5 rows rejected" in result.output
+    assert list(Course.objects.filter(category="Kiwis").values_list("school_name", "user__username").order_by("school_name")) == [
+        ("Kiwis", "mentor"), ("Kiwis school", "mentor"),
+    ]
+
+    rejected = [json.loads(line) for line in (tmp_path / "rejected.jsonl").read_text().splitlines()]
+    assert [row["row"] for row in rejected] == [2, 3, 4, 5, 7]
+    assert list(rejected[0]["errors"]) == ["price"]
+    assert list(rejected[1]["errors"]) == ["user"]
+    assert list(rejected[2]["errors"]) == ["course_title"]
+    assert list(rejected[3]["errors"]) == ["id"]
+    assert rejected[4]["record"] == "{not json"
+
+"""
+Testing loaddata fixture entries import as is, gzipped, and an unknown format is refused.
+"""
+
+@pytest.mark.django_db
+def test_import_courses_fixture(courses, tmp_path):
+    entry = {"model": "my_course.course", "pk": courses[0].pk, "fields": {
+        "course_title": "Fixture", "category": "Bananas", "school_name": "Bananas", "author": "Bananas",
+        "description": "From a fixture", "price": "5.00", "available_until": "2027-01-01",
+        "user": courses[1].user_id, "post_date": "2025-01-01T00:00:00Z",
+    }}
+    source = tmp_path / "course.json.gz"
+    with gzip.open(source, "wt") as f:
+        json.dump([entry], f)
+
+    invoke("import-courses", str(source))
+    course = Course.objects.get(pk=courses[0].pk)
+    assert (course.course_title, course.user_id) == ("Fixture", courses[1].user_id)
+    assert course.post_date == courses[0].post_date
+    invoke("import-courses", str(tmp_path / "course.xml"), exit_code=1)
+
+"""
+Testing the JSON array reader decodes objects cut across reads.
+"""
+
+def test_read_json_array():
+    records = [{"title": f"Bananas {i}", "tags": ["a", "]", ","]} for i in range(20)]
+    stream = io.StringIO(json.dumps(records, indent=2))
+    assert list(read_json_array(stream, read_size=7)) == list(enumerate(records, 1))
+    assert list(read_json_array(io.StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(read_json_array(io.StringIO('{"title": "Bananas"}')))
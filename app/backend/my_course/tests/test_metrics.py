@@ -0,0 +1,86 @@
+import logging
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.metrics import registry
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a course, and empty metrics for every test.
+"""
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    registry.clear()
+    yield
+
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    return Course.objects.create(
+        course_title="Bananas",
+        category="Bananas",
+        school_name="Bananas",
+        author="Bananas",
+        user=mentor,
+        available_until="2026-01-01",
+    )
+
+
+def scrape(client=None, **headers):
+    response = (client or APIClient()).get("/metrics", **headers)
+    assert response.status_code == 200
+    lines = response.content.decode().splitlines()
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1]) for line in lines if not line.startswith("#")}
+
+#---------------------- METRICS TEST --------------------#
+
+"""
+Testing requests are filed under their route with their latency, SQL queries and response size.
+"""
+
+@pytest.mark.django_db
+def test_metrics_per_route(course):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/api/courses/?category=Bananas")
+    # Read now: the next request's request_started resets the connection's queries
+    queries = len(ctx.captured_queries)
+    for pk in (course.pk, course.pk + 1):
+        client.get(f"/api/courses/{pk}/")
+
+    samples = scrape(client)
+    series = 'method="GET",route="api/courses/$",status="200"'
+    assert samples[f"http_request_duration_seconds_count{{{series}}}"] == 1
+    assert samples[f'http_request_duration_seconds_bucket{{{series},le="+Inf"}}'] == 1
+    assert samples[f"http_request_db_queries_total{{{series}}}"] == queries
+    assert samples[f"http_response_size_bytes_total{{{series}}}"] == len(response.content)
+
+    detail = [key for key in samples if key.startswith("http_request_duration_seconds_count") and "courses/(?P<pk>" in key]
+    assert sorted(samples[key] for key in detail) == [1, 1]  # one 200 and one 404, ids not in the labels
+
+"""
+Testing slow requests are logged with their queries when enabled.
+"""
+
+@pytest.mark.django_db
+def test_slow_request_log(course, settings, caplog):
+    settings.METRICS_SLOW_REQUEST_MS = 0.001
+    with caplog.at_level(logging.WARNING, logger="my_course.metrics"):
+        APIClient().get(f"/api/courses/{course.pk}/")
+    assert "Slow request GET" in caplog.text
+    assert "course_list" in caplog.text
+
+"""
+Testing /metrics asks for the bearer token once one is configured.
+"""
+
+@pytest.mark.django_db
+def test_metrics_token(settings):
+    settings.METRICS_TOKEN = "bananas"
+    client = APIClient()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer apples").status_code == 401
+    scrape(client, HTTP_AUTHORIZATION="Bearer bananas")
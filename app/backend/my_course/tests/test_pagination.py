@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from my_course.models import Course
+from my_course.pagination import KeysetPagination
+
+"""
+Fixture that can be re-used if needed a catalog of courses, half of them sharing the same post date.
+"""
+
+@pytest.fixture
+def catalog(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    courses = [
+        Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            user=mentor,
+            available_until="2026-01-01",
+        )
+        for i in range(12)
+    ]
+    Course.objects.filter(pk__in=[course.pk for course in courses[:6]]).update(post_date=timezone.now())
+    return courses
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        data = client.get(url).json()
+        pages.append(data)
+        url = data["next"]
+    return pages
+
+#---------------------- KEYSET PAGINATION TEST --------------------#
+
+"""
+Testing pages follow (post_date, id) descending and cover each course exactly once, ties included.
+"""
+
+@pytest.mark.django_db
+def test_next_links_cover_catalog_once(catalog):
+    pages = walk(APIClient(), "/api/courses/?page_size=5")
+    ids = [course["id"] for page in pages for course in page["results"]]
+    expected = list(Course.objects.order_by("-post_date", "-id").values_list("id", flat=True))
+    assert [len(page["results"]) for page in pages] == [5, 5, 2]
+    assert ids == expected
+    assert pages[0]["previous"] is None
+
+"""
+Testing ?ordering=-enrolled_count pages the most popular courses first, ties broken by id.
+"""
+
+@pytest.mark.django_db
+def test_enrolled_count_ordering(catalog, django_user_model):
+    students = [django_user_model.objects.create_user(username=f"student{i}") for i in range(3)]
+    for count, course in zip([3, 1, 3, 2], catalog[:4]):
+        course.students.add(*students[:count])
+
+    pages = walk(APIClient(), "/api/courses/?page_size=5&ordering=-enrolled_count")
+    ids = [course["id"] for page in pages for course in page["results"]]
+    assert ids == list(Course.objects.order_by("-enrolled_count", "-id").values_list("id", flat=True))
+    assert ids[:4] == [catalog[2].pk, catalog[0].pk, catalog[3].pk, catalog[1].pk]
+    assert [course["student_count"] for course in pages[0]["results"]] == [3, 3, 2, 1, 0]
+
+"""
+Testing previous links walk back to the exact same page.
+"""
+
+@pytest.mark.django_db
+def test_previous_link_returns_same_page(catalog):
+    client = APIClient()
+    pages = walk(client, "/api/courses/?page_size=5")
+    back = client.get(pages[2]["previous"]).json()
+    assert back["results"] == pages[1]["results"]
+    first = client.get(back["previous"]).json()
+    assert first["results"] == pages[0]["results"]
+    assert first["previous"] is None
+
+"""
+Testing a deep page costs the same number of queries as the first one.
+"""
+
+@pytest.mark.django_db
+def test_deep_page_query_count(catalog):
+    client = APIClient()
+    # Authenticated requests skip the anonymous response cache
+    client.force_authenticate(catalog[0].user)
+    pages = walk(client, "/api/courses/?page_size=2")
+    with CaptureQueriesContext(connection) as first:
+        client.get("/api/courses/?page_size=2")
+    with CaptureQueriesContext(connection) as deep:
+        client.get(pages[-2]["next"])
+    assert len(first.captured_queries) == len(deep.captured_queries)
+    assert "OFFSET" not in deep.captured_queries[-1]["sql"]
+
+"""
+Testing a deep page seeks the (post_date, id) index from the cursor instead of filtering up to it.
+"""
+
+@pytest.mark.django_db
+def test_deep_page_index_cond(catalog):
+    pages = walk(APIClient(), "/api/courses/?page_size=2")
+    request = Request(APIRequestFactory().get(pages[-2]["next"]))
+    queryset = KeysetPagination().page_queryset(Course.objects.all(), request)
+    with connection.cursor() as cursor:
+        # A dozen rows would be read sequentially, the plan of a large catalog is wanted
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = queryset.explain()
+    assert "course_post_date_id_idx" in plan
+    assert any("Index Cond" in line and "post_date <=" in line for line in plan.splitlines())
+
+"""
+Testing a tampered cursor is rejected with a 404.
+"""
+
+@pytest.mark.django_db
+def test_invalid_cursor(catalog):
+    response = APIClient().get("/api/courses/?cursor=bananas")
+    assert response.status_code == 404
@@ -0,0 +1,103 @@
+import json
+import pytest
+from django.contrib.auth.models import Group, User
+from rest_framework.authtoken.models import Token
+from typer.testing import CliRunner
+from cli.cli import app
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a cohort CSV file: a known user, a duplicate and invalid rows.
+"""
+
+@pytest.fixture
+def cohort(tmp_path):
+    path = tmp_path / "cohort.csv"
+    path.write_text(
+        "username,email,password,first_name,last_name,groups\n"
+        "alice,alice@school.pt,alice-pass-123,Alice,A,\n"
+        "bob,bob@school.pt,,Bob,B,Student;Mentor\n"
+        "known,,,,,\n"
+        "alice,other@school.pt,other-pass,,,\n"
+        ",nobody@school.pt,,,,\n"
+        "bad name!,not-an-email,,,,\n"
+    )
+    return path
+
+
+def bulk_users(*args):
+    result = CliRunner().invoke(app, ["bulk-users", *map(str, args)])
+    assert result.exit_code == 0, result.output
+    return result
+
+#---------------------- CLI BULK USERS TEST --------------------#
+
+"""
+Testing a cohort is created with its groups and tokens, passwords hashed in worker processes,
+    and a second run changes nothing.
+"""
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("processes", [1, 2])
+def test_bulk_users(cohort, tmp_path, processes):
+    known = User.objects.create_user(username="known", password="known-pass")
+
+    result = bulk_users(cohort, "--tokens", "--processes", processes, "--batch-size", 2)
+    assert "✅ 2 users created" in result.output
+    assert "2 already there" in result.output
+    alice, bob = User.objects.get(username="alice"), User.objects.get(username="bob")
+    assert alice.check_password("alice-pass-123") and alice.email == "alice@school.pt"
+    assert not bob.has_usable_password()
+    assert list(alice.groups.values_list("name", flat=True)) == ["Student"]
+    assert set(bob.groups.values_list("name", flat=True)) == {"Student", "Mentor"}
+    assert known.check_password("known-pass")
+    assert set(Token.objects.values_list("user__username", flat=True)) == {"alice", "bob", "known"}
+
+    rejected = [json.loads(line) for line in (tmp_path / "cohort.csv.errors.jsonl").read_text().splitlines()]
+    assert [(row["row"], sorted(row["errors"])) for row in rejected] == [(6, ["username"]), (7, ["email", "username"])]
+    assert "password" not in rejected[0]["record"]
+
+    tokens = dict(Token.objects.values_list("user__username", "key"))
+    result = bulk_users(cohort, "--tokens", "--processes", processes)
+    assert "✅ 0 users created" in result.output
+    assert User.objects.count() == 3 and Group.objects.count() == 2
+    assert dict(Token.objects.values_list("user__username", "key")) == tokens
+
+"""
+Testing new memberships of known users reach the course validators, like group-user does.
+"""
+
+@pytest.mark.django_db
+def test_bulk_users_touches_courses(tmp_path):
+    student = User.objects.create_user(username="student")
+    course = Course.objects.create(
+        course_title="Bananas", category="Bananas", school_name="Bananas", author="Bananas", available_until="2026-01-01",
+    )
+    course.students.add(student)
+    before = Course.objects.get(pk=course.pk).update_date
+
+    path = tmp_path / "mentors.csv"
+    path.write_text("username\nstudent\n")
+    bulk_users(path, "--group", "Mentor", "--processes", 1)
+    assert list(student.groups.values_list("name", flat=True)) == ["Mentor"]
+    assert Course.objects.get(pk=course.pk).update_date > before
+
+"""
+Testing rows longer than the User fields are rejected alone, the rest of their batch is created.
+"""
+
+@pytest.mark.django_db
+def test_bulk_users_overlong_row(tmp_path):
+    path = tmp_path / "cohort.csv"
+    path.write_text(
+        "username,email,password,first_name,last_name\n"
+        "alice,alice@school.pt,,Alice,A\n"
+        f"long,{'a' * 250}@school.pt,,{'L' * 151},L\n"
+        "bob,bob@school.pt,,Bob,B\n"
+    )
+    result = bulk_users(path, "--processes", 1)
+    assert "✅ 2 users created" in result.output
+    assert set(User.objects.values_list("username", flat=True)) == {"alice", "bob"}
+
+    rejected = [json.loads(line) for line in (tmp_path / "cohort.csv.errors.jsonl").read_text().splitlines()]
+    assert [(row["row"], sorted(row["errors"])) for row in rejected] == [(3, ["email", "first_name"])]
@@ -0,0 +1,112 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed an API client.
+"""
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+"""
+Fixture that can be re-used if needed a mentor with enrolled students.
+"""
+
+@pytest.fixture
+def mentor(django_user_model):
+    user = django_user_model.objects.create_user(username="mentor", password="useruser")
+    user.groups.add(Group.objects.create(name="Mentor"))
+    return user
+
+
+@pytest.fixture
+def students(django_user_model):
+    group = Group.objects.create(name="Student")
+    users = [django_user_model.objects.create_user(username=f"student{i}", password="useruser") for i in range(3)]
+    for user in users:
+        user.groups.add(group)
+    return users
+
+
+def make_courses(mentor, students, count):
+    for i in range(count):
+        course = Course.objects.create(
+            course_title=f"Bananas {i}",
+            category="Bananas",
+            school_name="Bananas",
+            author="Bananas",
+            user=mentor,
+            available_until="2026-01-01",
+        )
+        course.students.add(*students)
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response
+
+#---------------------- COURSE LIST QUERY COUNT TEST --------------------#
+
+"""
+Testing the course list issues a constant number of queries whatever the number of rows.
+"""
+
+@pytest.mark.django_db
+def test_course_list_queries_do_not_scale_with_rows(api_client, mentor, students):
+    make_courses(mentor, students, 2)
+    few, _ = count_queries(api_client, "/api/courses/")
+    make_courses(mentor, students, 10)
+    many, response = count_queries(api_client, "/api/courses/")
+    assert few == many
+    assert all(course["student_count"] == 3 for course in response.json()["results"])
+
+"""
+Testing the authenticated course list reports enrollment without extra queries per row.
+"""
+
+@pytest.mark.django_db
+def test_authenticated_course_list_queries_do_not_scale_with_rows(api_client, mentor, students):
+    api_client.force_authenticate(students[0])
+    make_courses(mentor, students, 2)
+    few, _ = count_queries(api_client, "/api/courses/")
+    make_courses(mentor, students[1:], 10)
+    many, response = count_queries(api_client, "/api/courses/")
+    assert few == many
+    enrolled = [course["is_enrolled"] for course in response.json()["results"]]
+    assert enrolled.count(True) == 2
+
+"""
+Testing my enrollments counts every student of the course, not only the current user.
+"""
+
+@pytest.mark.django_db
+def test_my_enrollments_student_count(api_client, mentor, students):
+    make_courses(mentor, students, 3)
+    api_client.force_authenticate(students[0])
+    few, _ = count_queries(api_client, "/api/courses/my_enrollments/")
+    make_courses(mentor, students, 5)
+    many, response = count_queries(api_client, "/api/courses/my_enrollments/")
+    assert few == many
+    assert [course["student_count"] for course in response.json()["results"]] == [3] * 8
+    assert all(course["is_enrolled"] for course in response.json()["results"])
+
+"""
+Testing mentor courses nest their students with a constant number of queries.
+"""
+
+@pytest.mark.django_db
+def test_my_courses_queries_do_not_scale_with_rows(api_client, mentor, students):
+    api_client.force_authenticate(mentor)
+    make_courses(mentor, students, 2)
+    few, _ = count_queries(api_client, "/api/courses/my_courses/")
+    make_courses(mentor, students, 6)
+    many, response = count_queries(api_client, "/api/courses/my_courses/")
+    assert few == many
+    assert response.json()["results"][0]["students"][0]["groups"] == ["Student"]
@@ -0,0 +1,87 @@
+import datetime
+import decimal
+import io
+import uuid
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from my_course.models import Course
+from my_course.renderers import ORJSONParser, ORJSONRenderer
+from my_course.serializers import CourseDetailSerializer
+
+"""
+Fixture that can be re-used if needed a priced course with a mentor.
+"""
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    return Course.objects.create(
+        course_title="Bananas", category="Bananas", school_name="Bananas", author="Bananas",
+        description="Ünïcode bananas ", price=decimal.Decimal("9.90"), user=mentor, available_until="2026-01-01",
+    )
+
+
+PAYLOAD = {
+    "price": decimal.Decimal("9.90"),
+    "post_date": datetime.datetime(2026, 1, 1, 12, 30, 0, 123456, tzinfo=datetime.timezone.utc),
+    "offset": datetime.datetime(2026, 1, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+    "available_until": datetime.date(2026, 1, 1),
+    "at": datetime.time(8, 15),
+    "duration": datetime.timedelta(minutes=90),
+    "name": gettext_lazy("Bananas"),
+    "id": uuid.UUID(int=42),
+    "errors": [ErrorDetail("Required.", code="required")],
+    "text": "Ünïcode bananas",
+    "values": [1, 2.5, None, True, (3, 4)],
+    1: "integer key",
+}
+
+#---------------------- ORJSON RENDERER TEST --------------------#
+
+"""
+Testing orjson writes the bytes DRF's JSONRenderer writes, Decimal, dates and lazy strings included.
+"""
+
+def test_orjson_matches_drf():
+    pytest.importorskip("orjson")
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+    assert ORJSONRenderer().render(None) == JSONRenderer().render(None) == b""
+
+
+@pytest.mark.django_db
+def test_orjson_course(course):
+    pytest.importorskip("orjson")
+    data = CourseDetailSerializer(course).data
+    rendered = ORJSONRenderer().render(data)
+    assert rendered == JSONRenderer().render(data)
+    assert b'"price":"9.90"' in rendered
+
+"""
+Testing indented output is left to DRF.
+"""
+
+def test_orjson_indent():
+    media_type = "application/json; indent=2"
+    assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+#---------------------- ORJSON PARSER TEST --------------------#
+
+"""
+Testing request bodies parse as with DRF, and malformed ones are a 400.
+"""
+
+def test_orjson_parser():
+    body = '{"username": "Ünïcode", "price": 9.9, "tags": [1, null]}'.encode()
+    assert ORJSONParser().parse(io.BytesIO(body)) == {"username": "Ünïcode", "price": 9.9, "tags": [1, None]}
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(b'{"username": '))
+
+
+@pytest.mark.django_db
+def test_malformed_body():
+    response = APIClient().post("/api/users/login/", b'{"username": ', content_type="application/json")
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("JSON parse error")
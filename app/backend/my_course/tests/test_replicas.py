@@ -0,0 +1,153 @@
+import pytest
+from types import SimpleNamespace
+from django.conf import settings as django_settings
+from django.db import connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.cache import cached_for_request
+from my_course.models import Course
+from my_course.replicas import PrimaryReplicaRouter, choose_replica, health, pin_to_primary, pinned, reading_from
+
+"""
+Fixture that can be re-used if needed a course and a student. The API tests need a replica alias, a test
+    mirror of `default`: run them with POSTGRES_REPLICAS=localhost.
+"""
+
+# Read before conftest.primary_reads empties it
+CONFIGURED_REPLICAS = dict(django_settings.DATABASE_REPLICAS)
+needs_replica = pytest.mark.skipif(not CONFIGURED_REPLICAS, reason="POSTGRES_REPLICAS is not set")
+
+STUDENT = SimpleNamespace(pk=1, is_authenticated=True)
+
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    return Course.objects.create(
+        course_title="Bananas", category="Bananas", school_name="Bananas", author="Bananas",
+        user=mentor, available_until="2026-01-01",
+    )
+
+
+@pytest.fixture
+def student(django_user_model):
+    return django_user_model.objects.create_user(username="student", password="useruser")
+
+
+def queries_by_alias(client, url):
+    alias = next(iter(CONFIGURED_REPLICAS))
+    with (
+        CaptureQueriesContext(connections["default"]) as primary,
+        CaptureQueriesContext(connections[alias]) as replica,
+    ):
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(primary.captured_queries), len(replica.captured_queries)
+
+#---------------------- ROUTER TEST --------------------#
+
+"""
+Testing reads follow the request's replica, writes and migrations always go to the primary.
+"""
+
+def test_router():
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Course) == "default"
+    with reading_from("replica1"):
+        assert router.db_for_read(Course) == "replica1"
+        assert router.db_for_write(Course) == "default"
+    assert router.db_for_read(Course) == "default"
+    assert router.allow_migrate("default", "my_course")
+    assert not router.allow_migrate("replica1", "my_course")
+
+"""
+Testing replicas are drawn by weight among the healthy ones, the primary when none is.
+"""
+
+def test_choose_replica(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = {"replica1": 3, "replica2": 1, "replica3": 0}
+    monkeypatch.setattr(health, "healthy", lambda alias: True)
+    assert {choose_replica() for _ in range(200)} == {"replica1", "replica2"}
+
+    monkeypatch.setattr(health, "healthy", lambda alias: alias != "replica1")
+    assert {choose_replica() for _ in range(20)} == {"replica2"}
+
+    monkeypatch.setattr(health, "healthy", lambda alias: False)
+    assert choose_replica() is None
+
+"""
+Testing health checks are reused for REPLICA_HEALTH_INTERVAL seconds.
+"""
+
+def test_health_interval(settings, monkeypatch):
+    checks = []
+    monkeypatch.setattr(health, "check", lambda alias: checks.append(alias) or len(checks) > 1)
+    settings.REPLICA_HEALTH_INTERVAL = 60
+    assert not health.healthy("replica1")
+    assert not health.healthy("replica1")
+    assert checks == ["replica1"]
+
+    settings.REPLICA_HEALTH_INTERVAL = 0
+    assert health.healthy("replica1")
+    assert checks == ["replica1", "replica1"]
+
+"""
+Testing replica reads are not stored in the version-keyed caches, primary reads are.
+"""
+
+def test_replica_reads_not_cached():
+    request = RequestFactory().get("/api/courses/")
+    with reading_from("replica1"):
+        assert cached_for_request("list", request, lambda: "replica") == "replica"
+    assert cached_for_request("list", request, lambda: "primary") == "primary"
+    assert cached_for_request("list", request, lambda: "again") == "primary"
+
+
+@needs_replica
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_replica_responses_not_cached(course, settings, monkeypatch):
+    # Validators are cached with a shared cache only
+    monkeypatch.setattr("my_course.conditional.cache_is_shared", lambda: True)
+    settings.DATABASE_REPLICAS = CONFIGURED_REPLICAS
+    client = APIClient()
+    url = f"/api/courses/{course.id}/"
+    for _ in range(2):
+        assert queries_by_alias(client, url)[1] > 0
+
+    settings.DATABASE_REPLICAS = {}
+    queries_by_alias(client, url)
+    assert queries_by_alias(client, url) == (0, 0)
+
+#---------------------- READ YOUR WRITES TEST --------------------#
+
+"""
+Testing a write pins the user to the primary, unless the window is 0 or there are no replicas.
+"""
+
+def test_pin_to_primary(settings):
+    settings.DATABASE_REPLICAS = {"replica1": 1}
+    assert not pinned(STUDENT)
+    pin_to_primary(STUDENT)
+    assert pinned(STUDENT)
+
+    settings.READ_YOUR_WRITES_SECONDS = 0
+    assert not pinned(STUDENT)
+
+
+@needs_replica
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_catalog_reads_from_replica(course, student, settings):
+    settings.DATABASE_REPLICAS = CONFIGURED_REPLICAS
+    assert queries_by_alias(APIClient(), f"/api/courses/{course.id}/")[1] > 0
+
+    client = APIClient()
+    client.force_authenticate(student)
+    assert queries_by_alias(client, "/api/courses/my_enrollments/")[1] > 0
+    assert client.post(f"/api/courses/{course.id}/enroll/").status_code == 200
+    # The enrollment is read back from the primary
+    _, replica = queries_by_alias(client, "/api/courses/my_enrollments/")
+    assert replica == 0
+
+    settings.READ_YOUR_WRITES_SECONDS = 0
+    assert queries_by_alias(client, "/api/courses/my_enrollments/")[1] > 0
@@ -0,0 +1,109 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from cli.cli import group_user, reset_group
+from my_course.api_views import IsMentorOrReadOnly, IsOwnerMentorOrAdmin
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a mentor authenticated by token, like the frontend.
+"""
+
+@pytest.fixture
+def mentor(django_user_model):
+    user = django_user_model.objects.create_user(username="mentor", password="useruser")
+    user.groups.add(Group.objects.create(name="Mentor"))
+    return user
+
+
+@pytest.fixture
+def client(mentor):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=mentor).key}")
+    return client
+
+
+def course_payload(title="Bananas"):
+    return {
+        "course_title": title,
+        "category": "Bananas",
+        "school_name": "Bananas",
+        "author": "Bananas",
+        "description": "Bananas",
+        "available_until": "2026-01-01",
+    }
+
+
+def group_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = getattr(client, method)(url, data, format="json")
+    return response, sum("auth_group" in query["sql"] for query in ctx.captured_queries)
+
+#---------------------- PER REQUEST TEST --------------------#
+
+"""
+Testing a request resolves the user's groups once, however many checks it runs.
+"""
+
+@pytest.mark.django_db
+def test_roles_resolved_once_per_request(mentor, client):
+    response, queries = group_queries(client, "post", "/api/courses/", course_payload())
+    assert response.status_code == 201
+    assert queries == 1
+
+    course = Course.objects.get()
+    response = client.get(f"/api/courses/{course.pk}/")
+    request = response.wsgi_request
+    request.user = mentor
+    request.method = "PATCH"
+    with CaptureQueriesContext(connection) as ctx:
+        assert IsMentorOrReadOnly().has_permission(request, None)
+        assert IsOwnerMentorOrAdmin().has_object_permission(request, None, course)
+        assert IsOwnerMentorOrAdmin().has_object_permission(request, None, course)
+    assert len(ctx.captured_queries) == 1
+
+#---------------------- ROLE CACHE TEST --------------------#
+
+"""
+Testing roles are cached across requests when enabled and dropped by the CLI group commands.
+"""
+
+@pytest.mark.django_db
+def test_role_cache_invalidated_by_cli(mentor, client, settings):
+    settings.ROLE_CACHE_TIMEOUT = 60
+    assert group_queries(client, "get", "/api/courses/my_courses/")[1] == 1
+    response, queries = group_queries(client, "get", "/api/courses/my_courses/")
+    assert response.status_code == 200
+    assert queries == 0
+
+    reset_group("mentor")
+    assert client.get("/api/courses/my_courses/").status_code == 403
+    assert client.post("/api/courses/", course_payload(), format="json").status_code == 403
+
+    group_user("mentor", "Mentor")
+    assert client.get("/api/courses/my_courses/").status_code == 200
+    assert client.post("/api/courses/", course_payload(), format="json").status_code == 201
+
+"""
+Testing renaming or deleting a group drops the cached roles of its members.
+"""
+
+@pytest.mark.django_db
+def test_role_cache_invalidated_by_group_changes(mentor, client, settings):
+    settings.ROLE_CACHE_TIMEOUT = 60
+    group = Group.objects.get(name="Mentor")
+    assert client.get("/api/courses/my_courses/").status_code == 200
+
+    group.name = "Former mentor"
+    group.save()
+    assert client.get("/api/courses/my_courses/").status_code == 403
+
+    group.name = "Mentor"
+    group.save()
+    assert client.get("/api/courses/my_courses/").status_code == 200
+
+    group.delete()
+    assert client.get("/api/courses/my_courses/").status_code == 403
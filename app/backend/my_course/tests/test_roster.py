@@ -0,0 +1,79 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from my_course.enrollment import enroll_users
+from my_course.models import Course
+from my_course.serializers import CourseDetailSerializer
+
+"""
+Fixture that can be re-used if needed a mentor's course with more students than the detail preview.
+"""
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+    mentor.groups.add(Group.objects.create(name="Mentor"))
+    group = Group.objects.create(name="Student")
+    students = [django_user_model.objects.create_user(username=f"student{i:02}") for i in range(25)]
+    group.user_set.add(*students)
+    course = Course.objects.create(
+        course_title="Bananas", category="Bananas", school_name="Bananas", author="Bananas",
+        user=mentor, available_until="2026-01-01",
+    )
+    enroll_users(course, [student.pk for student in students])
+    return course
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.json(), len(ctx.captured_queries)
+
+#---------------------- COURSE ROSTER TEST --------------------#
+
+"""
+Testing the roster pages through every student by username, with their groups, in a constant number of queries.
+"""
+
+@pytest.mark.django_db
+def test_roster_pages(course):
+    client = APIClient()
+    data, first_queries = get(client, f"/api/courses/{course.pk}/students/?page_size=10")
+    usernames = [student["username"] for student in data["results"]]
+    assert data["results"][0]["groups"] == ["Student"]
+    while data["next"]:
+        data, queries = get(client, data["next"])
+        usernames += [student["username"] for student in data["results"]]
+        assert queries == first_queries
+    assert usernames == [f"student{i:02}" for i in range(25)]
+
+"""
+Testing the roster is searched by username and answers 404 for unknown courses.
+"""
+
+@pytest.mark.django_db
+def test_roster_search(course):
+    client = APIClient()
+    data, _ = get(client, f"/api/courses/{course.pk}/students/?search=DENT1")
+    assert [student["username"] for student in data["results"]] == [f"student1{i}" for i in range(10)]
+    assert client.get(f"/api/courses/{course.pk + 1}/students/").status_code == 404
+
+"""
+Testing detail and mentor courses nest a capped preview, counting every student.
+"""
+
+@pytest.mark.django_db
+def test_detail_preview_is_capped(course):
+    client = APIClient()
+    data, _ = get(client, f"/api/courses/{course.pk}/")
+    assert data["student_count"] == 25
+    assert [student["username"] for student in data["students"]] == [
+        f"student{i:02}" for i in range(CourseDetailSerializer.preview_size)
+    ]
+
+    client.force_authenticate(course.user)
+    data, _ = get(client, "/api/courses/my_courses/")
+    assert len(data["results"][0]["students"]) == CourseDetailSerializer.preview_size
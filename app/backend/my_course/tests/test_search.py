@@ -0,0 +1,78 @@
+import pytest
+from rest_framework.test import APIClient
+from my_course.models import Course
+
+"""
+Fixture that can be re-used if needed a small catalog to search in.
+"""
+
+@pytest.fixture
+def catalog(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor", password="useruser")
+
+    def create(title, category="Bananas", description="Course description coming soon!"):
+        return Course.objects.create(
+            course_title=title,
+            category=category,
+            school_name="Bananas School",
+            author="Bananas",
+            description=description,
+            user=mentor,
+            available_until="2026-01-01",
+        )
+
+    return {
+        "title": create("Python for data analysis", category="Data"),
+        "description": create("Intro to programming", category="DATA", description="We use Python all along."),
+        "other": create("Baking bread", category="Cooking"),
+        "ties": [create(f"Kitchen basics {i}", category="Cooking") for i in range(5)],
+    }
+
+#---------------------- CATEGORY FILTER TEST --------------------#
+
+"""
+Testing the category filter is case insensitive.
+"""
+
+@pytest.mark.django_db
+def test_category_filter_is_case_insensitive(catalog):
+    response = APIClient().get("/api/courses/?category=data")
+    ids = {course["id"] for course in response.json()["results"]}
+    assert ids == {catalog["title"].id, catalog["description"].id}
+
+#---------------------- SEARCH TEST --------------------#
+
+"""
+Testing search ranks a title match above a description match and skips unrelated courses.
+"""
+
+@pytest.mark.django_db
+def test_search_ranked_by_relevance(catalog):
+    response = APIClient().get("/api/courses/?q=python")
+    ids = [course["id"] for course in response.json()["results"]]
+    assert ids == [catalog["title"].id, catalog["description"].id]
+
+"""
+Testing search understands stemming and combines with the category filter.
+"""
+
+@pytest.mark.django_db
+def test_search_with_category(catalog):
+    response = APIClient().get("/api/courses/?q=programs&category=Data")
+    assert [course["id"] for course in response.json()["results"]] == [catalog["description"].id]
+
+"""
+Testing search results with equal ranks paginate without duplicates or gaps.
+"""
+
+@pytest.mark.django_db
+def test_search_pagination_with_ties(catalog):
+    client = APIClient()
+    url = "/api/courses/?q=kitchen&page_size=2"
+    ids = []
+    while url:
+        data = client.get(url).json()
+        ids += [course["id"] for course in data["results"]]
+        url = data["next"]
+    assert sorted(ids) == sorted(course.id for course in catalog["ties"])
+    assert len(ids) == len(set(ids))
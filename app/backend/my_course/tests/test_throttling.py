@@ -0,0 +1,151 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.db import connection
+from rest_framework.test import APIClient
+from my_course import throttling
+from my_course.cache import get_cache
+from my_course.models import Course
+from my_course.throttling import in_flight, parse_rate, take_counted_token
+
+"""
+Fixture that can be re-used if needed a course and two students.
+"""
+
+@pytest.fixture
+def course(django_user_model):
+    mentor = django_user_model.objects.create_user(username="mentor")
+    return Course.objects.create(
+        course_title="Bananas", category="Bananas", school_name="Bananas", author="Bananas",
+        user=mentor, available_until="2026-01-01",
+    )
+
+
+@pytest.fixture
+def students(django_user_model):
+    return [django_user_model.objects.create_user(username=f"student{i}") for i in range(2)]
+
+
+def login(ip="10.0.0.1"):
+    return APIClient(REMOTE_ADDR=ip).post(
+        "/api/users/login/", {"username": "nobody", "password": "bananas"}, format="json"
+    )
+
+#---------------------- RATE LIMIT TEST --------------------#
+
+"""
+Testing rates read as a bucket capacity and a refill per second.
+"""
+
+@pytest.mark.parametrize("rate, expected", [("20/min", (20, 20 / 60)), ("5/s", (5, 5)), ("100/day", (100, 100 / 86400))])
+def test_parse_rate(rate, expected):
+    assert parse_rate(rate) == expected
+
+"""
+Testing a login burst from one IP is cut at the bucket size with a Retry-After, other IPs unaffected.
+"""
+
+@pytest.mark.django_db
+def test_login_burst(settings):
+    settings.THROTTLE_RATES = {"login": "3/min"}
+    assert [login().status_code for _ in range(3)] == [401] * 3
+    refused = login()
+    assert refused.status_code == 429
+    assert 1 <= int(refused["Retry-After"]) <= 60
+    assert login("10.0.0.2").status_code == 401
+
+"""
+Testing enroll buckets are per user, and an empty rate is no limit.
+"""
+
+@pytest.mark.django_db
+def test_enroll_per_user(settings, course, students):
+    settings.THROTTLE_RATES = {"enroll": "2/min"}
+    clients = []
+    for student in students:
+        client = APIClient()
+        client.force_authenticate(student)
+        clients.append(client)
+    url = f"/api/courses/{course.pk}/enroll/"
+    assert [clients[0].post(url).status_code for _ in range(3)] == [200, 200, 429]
+    assert clients[1].post(url).status_code == 200
+
+    settings.THROTTLE_RATES = {"enroll": ""}
+    assert all(clients[0].post(url).status_code == 200 for _ in range(5))
+
+"""
+Testing the counted bucket refills with time.
+"""
+
+def test_counted_bucket_refills(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(throttling.time, "time", lambda: now[0])
+    cache = get_cache()
+    capacity, rate = parse_rate("2/min")
+    assert take_counted_token(cache, "bucket", capacity, rate) == 0
+    assert take_counted_token(cache, "bucket", capacity, rate) == 0
+    assert take_counted_token(cache, "bucket", capacity, rate) > 0
+
+    now[0] += 120
+    assert take_counted_token(cache, "bucket", capacity, rate) == 0
+
+#---------------------- LOAD SHEDDING TEST --------------------#
+
+"""
+Testing a login rush past LOAD_SHED_MAX_EXPENSIVE gets fast 503s while the catalog is still served.
+"""
+
+@pytest.mark.django_db(transaction=True)
+def test_login_rush_is_shed(settings, course, monkeypatch):
+    settings.LOAD_SHED_MAX_EXPENSIVE = 2
+    release = threading.Event()
+    monkeypatch.setattr("my_course.api_views.dummy_hash", lambda password: release.wait(timeout=30))
+
+    def slow_login(ip):
+        try:
+            return login(ip).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(2) as pool:
+        hashing = [pool.submit(slow_login, f"10.0.1.{i}") for i in range(2)]
+        deadline = time.monotonic() + 10
+        while in_flight.expensive < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        try:
+            started = time.monotonic()
+            shed = login("10.0.1.9")
+            assert shed.status_code == 503
+            assert shed["Retry-After"] == str(settings.LOAD_SHED_RETRY_AFTER)
+            assert time.monotonic() - started < 1
+            assert APIClient().get("/api/courses/").status_code == 200
+        finally:
+            release.set()
+        assert [future.result() for future in hashing] == [401, 401]
+    assert in_flight.expensive == 0 and login().status_code == 401
+
+"""
+Testing a request holds one expensive slot however many times it enters.
+"""
+
+def test_expensive_slot_held_once(settings):
+    settings.LOAD_SHED_MAX_EXPENSIVE = 2
+    request = SimpleNamespace()
+    assert in_flight.enter() and in_flight.enter_expensive(request) and in_flight.enter_expensive(request)
+    assert in_flight.expensive == 1
+    in_flight.leave(request)
+    assert in_flight.requests == in_flight.expensive == 0
+
+"""
+Testing past LOAD_SHED_MAX_IN_FLIGHT any request is shed.
+"""
+
+@pytest.mark.django_db
+def test_in_flight_limit(settings, monkeypatch):
+    settings.LOAD_SHED_MAX_IN_FLIGHT = 4
+    monkeypatch.setattr(in_flight, "requests", 4)
+    response = APIClient().get("/api/courses/")
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Server overloaded, retry later."}
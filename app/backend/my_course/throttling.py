@@ -0,0 +1,217 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+from my_course.cache import get_cache
+import threading
+import time
+
+"""
+Abuse and overload protection for the expensive endpoints: login and signup (password hashing), enroll.
+Rate limits: a token bucket per endpoint scope and client (user when authenticated, IP otherwise), sized by
+    THROTTLE_RATES: "20/min" holds 20 requests and refills at 20 a minute. An empty bucket is a 429 with
+    Retry-After (DRF's Throttled). Buckets live in the course cache so every worker shares them:
+    - Redis: the bucket is updated by one Lua script, atomic, timed by the Redis clock;
+    - other caches: cache.incr() counters over a sliding window as long as one full refill, an approximation
+      of the bucket that needs nothing but an atomic increment. Refused requests count too.
+Load shedding: LoadSheddingMiddleware counts the requests in flight in the process. Past
+    LOAD_SHED_MAX_EXPENSIVE concurrent login/signup/enroll (actions marked with @shed_under_load), or past
+    LOAD_SHED_MAX_IN_FLIGHT requests of any kind, it answers 503 with Retry-After at once, before sessions,
+    authentication or the database: a rush on the expensive actions queues no work behind the catalog reads.
+"""
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or capacity
+tokens = math.min(capacity, tokens + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+def parse_rate(rate):
+    """(capacity, tokens per second) of "<capacity>/<period>", period s, m, h or d (or sec, min, hour, day)."""
+    capacity, _, period = rate.partition("/")
+    capacity = int(capacity)
+    return capacity, capacity / PERIODS[period.strip()[0]]
+
+
+def take_redis_token(cache, key, capacity, rate):
+    # RedisCache keeps its client private; the script runs on the server owning the key
+    client = cache._cache.get_client(key, write=True)
+    script = client.register_script(TOKEN_BUCKET_SCRIPT)
+    return float(script(keys=[cache.make_and_validate_key(key)], args=[capacity, rate]))
+
+
+def take_counted_token(cache, key, capacity, rate):
+    window = capacity / rate
+    now = time.time()
+    slot, elapsed = divmod(now / window, 1)
+    current = f"{key}:{int(slot)}"
+    cache.add(current, 0, int(window * 2) + 1)
+    try:
+        used = cache.incr(current)
+    except ValueError:  # Expired between add() and incr()
+        cache.set(current, 1, int(window * 2) + 1)
+        used = 1
+    # The previous window's share still inside the sliding window
+    used += cache.get(f"{key}:{int(slot) - 1}", 0) * (1 - elapsed)
+    return 0.0 if used <= capacity else (used - capacity) / rate
+
+
+def take_token(key, capacity, rate):
+    """Take a token from the bucket `key`: 0 when granted, else the seconds until one is available."""
+    cache = get_cache()
+    if isinstance(cache, RedisCache):
+        return take_redis_token(cache, key, capacity, rate)
+    return take_counted_token(cache, key, capacity, rate)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """DRF throttle with one bucket per `scope` and client, THROTTLE_RATES[scope] (empty or missing: no limit)."""
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def client(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        # X-Forwarded-For is read at the depth of NUM_PROXIES
+        return f"ip:{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        capacity, per_second = parse_rate(rate)
+        self.wait_seconds = take_token(f"throttle:{self.scope}:{self.client(request)}", capacity, per_second)
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginThrottle(TokenBucketThrottle):
+    scope = "login"
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = "signup"
+
+
+class EnrollThrottle(TokenBucketThrottle):
+    scope = "enroll"
+
+
+def shed_under_load(action):
+    """Mark a viewset action as expensive: LoadSheddingMiddleware caps how many run at once."""
+    action.shed_under_load = True
+    return action
+
+
+def is_expensive(request, view_func):
+    # Viewset views carry their class and {method: action} (ViewSetMixin.as_view)
+    actions = getattr(view_func, "actions", None)
+    name = actions.get(request.method.lower()) if actions else None
+    return bool(name) and getattr(getattr(getattr(view_func, "cls", None), name, None), "shed_under_load", False)
+
+
+class InFlight:
+    """Requests being served by this process, all of them and the expensive ones, under a lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.expensive = 0
+
+    def enter(self):
+        limit = settings.LOAD_SHED_MAX_IN_FLIGHT
+        with self.lock:
+            if 0 < limit <= self.requests:
+                return False
+            self.requests += 1
+            return True
+
+    def enter_expensive(self, request):
+        # process_view can run more than once for a request, it holds one slot
+        if getattr(request, "expensive_slot", False):
+            return True
+        limit = settings.LOAD_SHED_MAX_EXPENSIVE
+        with self.lock:
+            if 0 < limit <= self.expensive:
+                return False
+            self.expensive += 1
+        request.expensive_slot = True
+        return True
+
+    def leave(self, request):
+        with self.lock:
+            self.requests -= 1
+            if getattr(request, "expensive_slot", False):
+                self.expensive -= 1
+
+    def clear(self):
+        with self.lock:
+            self.requests = self.expensive = 0
+
+
+in_flight = InFlight()
+
+
+def overloaded():
+    response = JsonResponse({"detail": "Server overloaded, retry later."}, status=503)
+    response["Retry-After"] = str(settings.LOAD_SHED_RETRY_AFTER)
+    return response
+
+
+class LoadSheddingMiddleware:
+    """Sync and async capable; under ASGI process_view is a coroutine too, the check never hops threads."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not in_flight.enter():
+            return overloaded()
+        try:
+            return self.get_response(request)
+        finally:
+            in_flight.leave(request)
+
+    async def __acall__(self, request):
+        if not in_flight.enter():
+            return overloaded()
+        try:
+            return await self.get_response(request)
+        finally:
+            in_flight.leave(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_expensive(request, view_func) and not in_flight.enter_expensive(request):
+            return overloaded()
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if is_expensive(request, view_func) and not in_flight.enter_expensive(request):
+            return overloaded()
+        return None
@@ -1,7 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken import views as auth_views
-from my_course.api_views import UserViewSet, CourseViewSet
+from my_course.api_views import UserViewSet, CourseViewSet, ExportViewSet
+from my_course import async_views
+from my_course.metrics import metrics_view
 
 """
 DRF Router for API endpoints.
@@ -10,8 +12,14 @@ DRF Router for API endpoints.
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'courses', CourseViewSet, basename='course')
+router.register(r'export', ExportViewSet, basename='export')
 
 urlpatterns = [
+    path('api/async/courses/', async_views.course_list, name='async-course-list'),
+    path('api/async/courses/categories/', async_views.course_categories, name='async-course-categories'),
+    path('api/async/courses/my_enrollments/', async_views.my_enrollments, name='async-course-my-enrollments'),
+    path('api/async/courses/<int:pk>/', async_views.course_detail, name='async-course-detail'),
     path('api/', include(router.urls)),
     path('api-token-auth/', auth_views.obtain_auth_token, name='api-token-auth'),
+    path('metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,6 +1,31 @@
 // API base URL
 const API_BASE_URL = '/api';
 
+// Validators and bodies of GET responses, replayed when the backend answers 304 Not Modified
+function readCachedResponse(endpoint) {
+    try {
+        return JSON.parse(sessionStorage.getItem(`api:${endpoint}`));
+    } catch (error) {
+        return null;
+    }
+}
+
+function storeCachedResponse(endpoint, response, text) {
+    const etag = response.headers.get('ETag');
+    if (!etag) {
+        return;
+    }
+    try {
+        sessionStorage.setItem(`api:${endpoint}`, JSON.stringify({
+            etag: etag,
+            lastModified: response.headers.get('Last-Modified'),
+            body: text,
+        }));
+    } catch (error) {
+        // Storage full or disabled: conditional requests are only an optimisation
+    }
+}
+
 // Generic API call function
 async function apiCall(endpoint, method = 'GET', data = null) {
     const options = {
@@ -19,8 +44,20 @@ async function apiCall(endpoint, method = 'GET', data = null) {
         options.body = JSON.stringify(data);
     }
     
+    const cached = method === 'GET' ? readCachedResponse(endpoint) : null;
+    if (cached) {
+        options.headers['If-None-Match'] = cached.etag;
+        if (cached.lastModified) {
+            options.headers['If-Modified-Since'] = cached.lastModified;
+        }
+    }
+    
     const response = await fetch(`${API_BASE_URL}${endpoint}`, options);
     
+    if (response.status === 304 && cached) {
+        return cached.body ? JSON.parse(cached.body) : null;
+    }
+    
     if (!response.ok) {
         if (response.status === 401) {
             localStorage.removeItem('token');
@@ -32,6 +69,9 @@ async function apiCall(endpoint, method = 'GET', data = null) {
     
     // Handle empty responses
     const text = await response.text();
+    if (method === 'GET') {
+        storeCachedResponse(endpoint, response, text);
+    }
     if (!text) {
         return null;
     }
@@ -39,9 +79,24 @@ async function apiCall(endpoint, method = 'GET', data = null) {
     return JSON.parse(text);
 }
 
+// Fetch every page of a paginated list endpoint by following `next` links
+async function apiList(endpoint) {
+    let page = await apiCall(endpoint);
+    if (Array.isArray(page)) {
+        return page;
+    }
+    const results = [...page.results];
+    while (page.next) {
+        const next = new URL(page.next, window.location.origin);
+        page = await apiCall(next.pathname.replace(API_BASE_URL, '') + next.search);
+        results.push(...page.results);
+    }
+    return results;
+}
+
 // Get all courses
 async function getCourses() {
-    return apiCall('/courses/');
+    return apiList('/courses/');
 }
 
 // Get single course
@@ -76,12 +131,12 @@ async function unenrollCourse(courseId) {
 
 // Get my enrollments
 async function getMyEnrollments() {
-    return apiCall('/courses/my_enrollments/');
+    return apiList('/courses/my_enrollments/');
 }
 
 // Get my courses (mentor)
 async function getMyCourses() {
-    return apiCall('/courses/my_courses/');
+    return apiList('/courses/my_courses/');
 }
 
 // Get categories
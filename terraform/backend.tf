@@ -1,3 +1,13 @@
+locals {
+  # Without a shared cache each pod only sees its own catalog invalidations, their cached responses must age out fast
+  backend_cache_shared = var.backend_cache_url != ""
+  backend_course_cache_timeout = (
+    local.backend_cache_shared || var.backend_replicas <= 1
+    ? var.backend_course_cache_timeout
+    : min(var.backend_course_cache_timeout, var.backend_unshared_cache_timeout)
+  )
+}
+
 resource "kubernetes_deployment_v1" "backend" {
   depends_on = [
   kubernetes_job_v1.backend_bootstrap
@@ -57,6 +67,31 @@ resource "kubernetes_deployment_v1" "backend" {
             value = tostring(var.postgres_db_port)
           }
 
+          env {
+            name  = "POSTGRES_REPLICAS"
+            value = var.postgres_replica_hosts
+          }
+
+          env {
+            name  = "DJANGO_CACHE_BACKEND"
+            value = local.backend_cache_shared ? "django.core.cache.backends.redis.RedisCache" : "django.core.cache.backends.locmem.LocMemCache"
+          }
+
+          env {
+            name  = "DJANGO_CACHE_LOCATION"
+            value = local.backend_cache_shared ? var.backend_cache_url : "learning-hub"
+          }
+
+          env {
+            name  = "COURSE_CACHE_TIMEOUT"
+            value = tostring(local.backend_course_cache_timeout)
+          }
+
+          env {
+            name  = "API_NUM_PROXIES"
+            value = tostring(var.backend_num_proxies)
+          }
+
           env {
             name  = "POSTGRES_DB"
             value = var.postgres_db_name
@@ -156,6 +156,13 @@ variable "postgres_db_host" {
     nullable = false
 }
 
+variable "postgres_replica_hosts" {
+    description = "Read replicas of PostgreSQL as host[:port], comma separated; empty reads from the primary only"
+    type = string
+    default = ""
+    nullable = false
+}
+
 variable "database_replicas" {
     description = "Number of replicas for database service"
     type = number
@@ -179,6 +186,34 @@ variable "backend_replicas" {
     nullable = false
 }
 
+variable "backend_cache_url" {
+    description = "Shared cache of the backend pods as a Redis URL (redis://host:6379/0; the image needs the redis package). Empty keeps a local-memory cache per pod: a catalog write invalidates the cached anonymous responses of the pod serving it only, the other pods serve theirs until backend_unshared_cache_timeout"
+    type = string
+    default = ""
+    nullable = false
+}
+
+variable "backend_course_cache_timeout" {
+    description = "Seconds the backend caches anonymous course responses with a shared cache (backend_cache_url) or a single pod"
+    type = number
+    default = 600
+    nullable = false
+}
+
+variable "backend_unshared_cache_timeout" {
+    description = "Cap on the anonymous course response cache with several pods and no backend_cache_url: how long other pods may serve a catalog older than the last write"
+    type = number
+    default = 10
+    nullable = false
+}
+
+variable "backend_num_proxies" {
+    description = "Reverse proxies in front of the backend (frontend nginx, ingress); the API reads the client IP from X-Forwarded-For at this depth"
+    type = number
+    default = 1
+    nullable = false
+}
+
 variable "backend_django_debug" {
     description = "Django debug mode for backend service"
     type = string